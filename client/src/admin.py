@@ -10,13 +10,17 @@ WARNING: These operations can be destructive. Use with caution.
 import argparse
 import sys
 import logging
-from typing import NoReturn
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NoReturn, Tuple
 
 from src.config import load_config
 from src.queue_client import QueueClient, QueueClientError
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent status requests for multi-queue checks.
+STATUS_FETCH_WORKERS = 16
+
 
 class AdminCLI:
     """Administrative command-line interface for queue service operations."""
@@ -47,9 +51,11 @@ class AdminCLI:
             force: If True, skip confirmation prompt
         """
         if not force:
-            print("⚠️  WARNING: This will permanently delete ALL queues, tasks, and results!")
-            print("⚠️  This operation CANNOT be undone!")
-            print()
+            sys.stdout.write(
+                "⚠️  WARNING: This will permanently delete ALL queues, tasks, and results!\n"
+                "⚠️  This operation CANNOT be undone!\n"
+                "\n"
+            )
             confirmation = input("Type 'DELETE ALL' to confirm: ")
 
             if confirmation != "DELETE ALL":
@@ -63,11 +69,14 @@ class AdminCLI:
             message = response.get('message', 'All queues cleared')
             queues_cleared = response.get('queuesCleared', 0)
 
-            print()
-            print("✅ Success!")
-            print(f"   {message}")
-            print(f"   Queues cleared: {queues_cleared}")
-            print()
+            lines = [
+                "",
+                "✅ Success!",
+                f"   {message}",
+                f"   Queues cleared: {queues_cleared}",
+                "",
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
 
             logger.info("Cleared %d queues successfully", queues_cleared)
 
@@ -89,55 +98,13 @@ class AdminCLI:
             logger.info("Fetching status for queue %s...", queue_id)
             status = self.queue_client.get_queue_status(queue_id)
 
-            pending = status.get('pendingTaskCount', 0)
-            completed = status.get('completedResultCount', 0)
-            has_pending = status.get('hasPendingTasks', False)
-
-            # Calculate progress
-            total = pending + completed
-            if total > 0:
-                progress_pct = (completed / total) * 100
-            else:
-                progress_pct = 0
-
-            # Determine status emoji and text
-            if pending == 0 and completed > 0:
-                status_emoji = "✅"
-                status_text = "Complete"
-            elif has_pending:
-                status_emoji = "🔄"
-                status_text = "In Progress"
-            else:
-                status_emoji = "⏸️"
-                status_text = "Idle"
-
-            # Print formatted status
-            print()
-            print("=" * 60)
-            print(f"Queue Status: {queue_id}")
-            print("=" * 60)
-            print()
-            print(f"  Status:           {status_emoji}  {status_text}")
-            print(f"  Pending Tasks:    {pending}")
-            print(f"  Completed Results: {completed}")
-            
-            if total > 0:
-                print(f"  Progress:         {progress_pct:.1f}% ({completed}/{total})")
-                # Progress bar
-                bar_width = 40
-                filled = int(bar_width * completed / total)
-                bar = "█" * filled + "░" * (bar_width - filled)
-                print(f"                    [{bar}]")
-            
-            print()
-            print("=" * 60)
-            print()
+            sys.stdout.write(self._format_status(queue_id, status))
 
             logger.info(
                 "Queue %s status: pending=%d completed=%d",
                 queue_id,
-                pending,
-                completed,
+                status.get('pendingTaskCount', 0),
+                status.get('completedResultCount', 0),
             )
 
         except QueueClientError as exc:
@@ -145,6 +112,118 @@ class AdminCLI:
             logger.error("Failed to get queue status: %s", exc)
             sys.exit(1)
 
+    def check_statuses(self, queue_ids: List[str]) -> None:
+        """
+        Check the status of several queues at once.
+
+        Status requests are issued concurrently over the shared client session
+        and rendered as a compact one-line-per-queue table. Exits with code 1
+        if any queue could not be checked.
+
+        Args:
+            queue_ids: IDs of the queues to check
+        """
+        logger.info("Fetching status for %d queues...", len(queue_ids))
+
+        def fetch(queue_id: str):
+            try:
+                return self.queue_client.get_queue_status(queue_id)
+            except QueueClientError as exc:
+                return exc
+
+        max_workers = max(1, min(len(queue_ids), STATUS_FETCH_WORKERS))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(fetch, queue_ids))
+
+        width = max(len("Queue"), *(len(queue_id) for queue_id in queue_ids))
+        lines = [
+            "",
+            f"{'Queue':<{width}}  {'Status':<15}  {'Pending':>7}  {'Completed':>9}  {'Progress':>8}",
+            "-" * (width + 47),
+        ]
+        failures = 0
+        for queue_id, outcome in zip(queue_ids, outcomes):
+            if isinstance(outcome, QueueClientError):
+                failures += 1
+                lines.append(f"{queue_id:<{width}}  ❌ Error: {outcome}")
+                logger.error("Failed to get status for queue %s: %s", queue_id, outcome)
+                continue
+
+            pending = outcome.get('pendingTaskCount', 0)
+            completed = outcome.get('completedResultCount', 0)
+            total = pending + completed
+            progress_pct = (completed / total) * 100 if total > 0 else 0
+            status_emoji, status_text = self._status_label(outcome)
+            lines.append(
+                f"{queue_id:<{width}}  {status_emoji}  {status_text:<11}  {pending:>7}  "
+                f"{completed:>9}  {progress_pct:>7.1f}%"
+            )
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
+
+        if failures:
+            sys.exit(1)
+
+    @staticmethod
+    def _status_label(status: dict) -> Tuple[str, str]:
+        """Return the (emoji, text) label describing a queue status payload."""
+        pending = status.get('pendingTaskCount', 0)
+        completed = status.get('completedResultCount', 0)
+        if pending == 0 and completed > 0:
+            return "✅", "Complete"
+        if status.get('hasPendingTasks', False):
+            return "🔄", "In Progress"
+        return "⏸️", "Idle"
+
+    @staticmethod
+    def _format_status(queue_id: str, status: dict) -> str:
+        """
+        Render a queue status report as a single string.
+
+        Building the report up front lets callers emit it with one write
+        instead of a print per line.
+
+        Args:
+            queue_id: ID of the queue the status belongs to
+            status: Status payload returned by the queue service
+
+        Returns:
+            Formatted report, newline-terminated
+        """
+        pending = status.get('pendingTaskCount', 0)
+        completed = status.get('completedResultCount', 0)
+
+        # Calculate progress
+        total = pending + completed
+        if total > 0:
+            progress_pct = (completed / total) * 100
+        else:
+            progress_pct = 0
+
+        status_emoji, status_text = AdminCLI._status_label(status)
+
+        lines = [
+            "",
+            "=" * 60,
+            f"Queue Status: {queue_id}",
+            "=" * 60,
+            "",
+            f"  Status:           {status_emoji}  {status_text}",
+            f"  Pending Tasks:    {pending}",
+            f"  Completed Results: {completed}",
+        ]
+
+        if total > 0:
+            lines.append(f"  Progress:         {progress_pct:.1f}% ({completed}/{total})")
+            # Progress bar
+            bar_width = 40
+            filled = int(bar_width * completed / total)
+            bar = "█" * filled + "░" * (bar_width - filled)
+            lines.append(f"                    [{bar}]")
+
+        lines.extend(["", "=" * 60, ""])
+        return "\n".join(lines) + "\n"
+
 
 def _build_arg_parser() -> argparse.ArgumentParser:
     """Create the CLI argument parser for admin operations."""
@@ -156,6 +235,9 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     # Check queue status
     python -m src.admin status <queue-id>
 
+    # Check several queues at once
+    python -m src.admin status <queue-id> <queue-id> ...
+
     # Clear all queues (with confirmation prompt)
     python -m src.admin clear
 
@@ -176,12 +258,15 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     status_parser = subparsers.add_parser(
         'status',
         help='Check queue status',
-        description='Display the status of a queue including pending tasks and completed results.',
+        description='Display the status of one or more queues including pending tasks '
+                    'and completed results.',
     )
     status_parser.add_argument(
-        'queue_id',
+        'queue_ids',
         type=str,
-        help='ID of the queue to check',
+        nargs='+',
+        metavar='queue_id',
+        help='ID of the queue to check (pass several for a summary table)',
     )
     status_parser.add_argument(
         '--config',
@@ -217,7 +302,7 @@ def main() -> NoReturn:
     CLI entry point for admin operations.
 
     Usage:
-        python -m src.admin status <queue-id> [--config PATH]
+        python -m src.admin status <queue-id> [<queue-id> ...] [--config PATH]
         python -m src.admin clear [--force] [--config PATH]
     """
     logging.basicConfig(
@@ -228,11 +313,15 @@ def main() -> NoReturn:
     parser = _build_arg_parser()
     args = parser.parse_args()
 
+    admin_cli = None
     try:
         admin_cli = AdminCLI(config_path=args.config)
 
         if args.command == 'status':
-            admin_cli.check_status(queue_id=args.queue_id)
+            if len(args.queue_ids) == 1:
+                admin_cli.check_status(queue_id=args.queue_ids[0])
+            else:
+                admin_cli.check_statuses(queue_ids=args.queue_ids)
         elif args.command == 'clear':
             admin_cli.clear_all_queues(force=args.force)
 
@@ -252,6 +341,10 @@ def main() -> NoReturn:
         print(f"\n❌ Unexpected error: {exc}\n", file=sys.stderr)
         sys.exit(1)
 
+    finally:
+        if admin_cli is not None:
+            admin_cli.queue_client.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,33 +5,80 @@ Purpose: Load and validate configuration from YAML file
 
 """
 
+import functools
 import os
-import yaml
+import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
 
+# PyYAML takes ~15ms to import, so it is loaded on first use rather than at
+# import time; entry points that exit early (e.g. ``--help``) never pay for it.
+_yaml = None
+_YamlLoader = None
 
-@dataclass
+
+def _get_yaml():
+    """
+    Import PyYAML on first call and return ``(yaml_module, loader_class)``.
+    
+    Prefers the libyaml-backed C loader, falling back to the pure-Python one
+    when PyYAML was built without libyaml.
+    """
+    global _yaml, _YamlLoader
+    if _yaml is None:
+        import yaml
+        try:
+            from yaml import CSafeLoader as loader
+        except ImportError:  # pragma: no cover - depends on PyYAML build
+            from yaml import SafeLoader as loader
+        _YamlLoader = loader
+        _yaml = yaml
+    return _yaml, _YamlLoader
+
+# Supported LLM providers, in the order they are listed in error messages.
+_PROVIDER_NAMES = ("openrouter", "mock")
+_VALID_PROVIDERS = frozenset(_PROVIDER_NAMES)
+
+# Page image formats PDFProcessor can render for the vision model.
+_IMAGE_FORMATS = ("jpeg", "png")
+
+# Matches the queue service's cap on how long a batch dequeue may wait.
+_MAX_DEQUEUE_WAIT_MS = 30000
+
+# Matches ${VAR_NAME} environment variable references in config strings.
+_ENV_VAR_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+
+@dataclass(frozen=True, slots=True)
 class QueueServiceConfig:
     """
     Configuration for the Queue Service API.
     
     Attributes:
         base_url: Base URL of the queue service (e.g., "http://localhost:8080")
+        parallel_fetch: Maximum number of concurrent result requests
+        compress_requests: Gzip large request bodies (the service must
+            accept ``Content-Encoding: gzip``)
     """
     base_url: str
+    parallel_fetch: int = 16
+    compress_requests: bool = False
     
     def __post_init__(self):
         """Validate queue service configuration."""
         if not self.base_url:
             raise ValueError("Queue service base_url cannot be empty")
         
-        # Remove trailing slash for consistency
-        self.base_url = self.base_url.rstrip('/')
+        if self.parallel_fetch <= 0:
+            raise ValueError("parallel_fetch must be greater than 0")
+        
+        # Remove trailing slash for consistency (frozen, so bypass __setattr__)
+        object.__setattr__(self, 'base_url', self.base_url.rstrip('/'))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StorageConfig:
     """
     Configuration for file storage paths.
@@ -41,24 +88,47 @@ class StorageConfig:
         pages_dir: Directory for extracted page images
         results_dir: Directory for worker result JSON files
         metadata_dir: Directory for job metadata files
+        image_dpi: Resolution used when rasterizing PDF pages
+        image_format: Page image format, "jpeg" or "png"
+        max_image_edge: Cap on the longest side of a rendered page in pixels;
+            pages that would be larger at image_dpi are scaled down to it and
+            smaller ones keep image_dpi. None disables the cap
     """
     pdf_dir: str
     pages_dir: str
     results_dir: str
     metadata_dir: str
+    image_dpi: int = 150
+    image_format: str = "jpeg"
+    max_image_edge: Optional[int] = 1024
     
     def __post_init__(self):
-        """Validate and create storage directories."""
+        """
+        Validate storage directory paths.
+        
+        Directories are not created here; each component creates the
+        directory it writes to on first use.
+        """
         # Ensure all paths are defined
         if not all([self.pdf_dir, self.pages_dir, self.results_dir, self.metadata_dir]):
             raise ValueError("All storage directory paths must be defined")
         
-        # Create directories if they don't exist
-        for dir_path in [self.pdf_dir, self.pages_dir, self.results_dir, self.metadata_dir]:
-            Path(dir_path).mkdir(parents=True, exist_ok=True)
+        if self.image_dpi <= 0:
+            raise ValueError(f"image_dpi must be positive, got {self.image_dpi}")
+        
+        if self.max_image_edge is not None and self.max_image_edge <= 0:
+            raise ValueError(
+                f"max_image_edge must be positive or null, got {self.max_image_edge}"
+            )
+        
+        if self.image_format not in _IMAGE_FORMATS:
+            raise ValueError(
+                f"Invalid image_format '{self.image_format}'. "
+                f"Must be one of: {', '.join(_IMAGE_FORMATS)}"
+            )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     """
     Configuration for LLM service.
@@ -68,20 +138,23 @@ class LLMConfig:
         api_key: API key for the LLM service (not needed for ``"mock"``)
         model: Model name string understood by OpenRouter
         max_questions_per_page: Maximum number of quiz questions to generate per page
+        cache_dir: Directory for cached OpenRouter responses (``None`` disables caching)
+        structured_output: Request schema-constrained JSON from models that support it
     """
     provider: str
     api_key: Optional[str]
     model: str
     max_questions_per_page: int
+    cache_dir: Optional[str] = None
+    structured_output: bool = False
     
     def __post_init__(self):
         """Validate LLM configuration."""
         # Validate provider
-        valid_providers = ["openrouter", "mock"]
-        if self.provider not in valid_providers:
+        if self.provider not in _VALID_PROVIDERS:
             raise ValueError(
                 f"Invalid LLM provider: {self.provider}. "
-                f"Must be one of: {', '.join(valid_providers)}"
+                f"Must be one of: {', '.join(_PROVIDER_NAMES)}"
             )
         
         # Validate API key for non-mock providers. We allow ``None`` here so
@@ -101,7 +174,7 @@ class LLMConfig:
             raise ValueError("max_questions_per_page must be greater than 0")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WorkerConfig:
     """
     Configuration for worker behavior.
@@ -110,10 +183,16 @@ class WorkerConfig:
         poll_interval: Seconds to wait between queue polls when empty
         max_retries: Maximum number of retries for failed tasks
         retry_backoff: Multiplier for exponential backoff (seconds)
+        dequeue_batch_size: Maximum tasks pulled per dequeue request; pages
+            pulled together are sent to the LLM in batched requests
+        dequeue_wait_ms: How long the service may hold an empty dequeue
+            request waiting for a task (0 disables long polling)
     """
     poll_interval: float
     max_retries: int
     retry_backoff: float
+    dequeue_batch_size: int = 4
+    dequeue_wait_ms: int = 5000
     
     def __post_init__(self):
         """Validate worker configuration."""
@@ -125,9 +204,18 @@ class WorkerConfig:
         
         if self.retry_backoff <= 0:
             raise ValueError("retry_backoff must be greater than 0")
+        
+        if self.dequeue_batch_size <= 0:
+            raise ValueError("dequeue_batch_size must be greater than 0")
+        
+        if not 0 <= self.dequeue_wait_ms <= _MAX_DEQUEUE_WAIT_MS:
+            raise ValueError(
+                f"dequeue_wait_ms must be between 0 and {_MAX_DEQUEUE_WAIT_MS}, "
+                f"got {self.dequeue_wait_ms}"
+            )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AnkiConfig:
     """
     Configuration for Anki deck output.
@@ -146,12 +234,9 @@ class AnkiConfig:
         
         if not self.output_dir:
             raise ValueError("Anki output_dir cannot be empty")
-        
-        # Create output directory if it doesn't exist
-        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """
     Main configuration object containing all subsystem configurations.
@@ -178,8 +263,14 @@ def load_config(config_path: str = "config.yaml") -> Config:
     1. Loads the YAML file
     2. Supports environment variable substitution (e.g., ${OPENAI_API_KEY})
     3. Validates all configuration values
-    4. Creates necessary directories
-    5. Returns a validated Config object
+    4. Returns a validated Config object
+    
+    Storage and output directories are created lazily by the components
+    that write to them, not here.
+    
+    Results are cached per resolved path and invalidated when the file's
+    modification time or size changes, or when an environment variable it
+    references changes, so repeated calls are cheap.
     
     Args:
         config_path: Path to the configuration YAML file
@@ -205,48 +296,98 @@ def load_config(config_path: str = "config.yaml") -> Config:
             f"Please create a config.yaml file in the current directory."
         )
     
-    # Load YAML file
+    # Config is effectively immutable per process, so reuse the parsed result
+    # until the file changes on disk. The values of the variables it
+    # references are part of the key, so changing one rebuilds the Config.
+    stat = config_file.stat()
+    file_key = (str(config_file.resolve()), stat.st_mtime_ns, stat.st_size)
+    _, env_names = _read_config_cached(*file_key)
+    env_values = tuple(os.environ.get(name) for name in env_names)
+    return _load_config_cached(*file_key, env_values)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config_cached(
+    config_path: str, mtime_ns: int, size: int
+) -> Tuple[dict, Tuple[str, ...]]:
+    """
+    Parse the YAML at ``config_path``, before environment substitution.
+    
+    Returns the raw configuration and the names of the environment variables
+    it references. ``mtime_ns`` and ``size`` are only part of the cache key.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    yaml, yaml_loader = _get_yaml()
+    with open(config_path, 'r') as f:
+        text = f.read()
     try:
-        with open(config_file, 'r') as f:
-            raw_config = yaml.safe_load(f)
+        raw_config = yaml.load(text, Loader=yaml_loader)
     except yaml.YAMLError as e:
         raise ValueError(f"Failed to parse YAML configuration: {e}")
     
     if not raw_config:
         raise ValueError("Configuration file is empty")
     
-    # Substitute environment variables
+    return raw_config, tuple(sorted(set(_ENV_VAR_PATTERN.findall(text))))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(
+    config_path: str, mtime_ns: int, size: int, env_values: Tuple[Optional[str], ...]
+) -> Config:
+    """
+    Build and validate the Config for the file at ``config_path``.
+    
+    ``mtime_ns``, ``size`` and ``env_values`` (the current values of the
+    variables the file references) are not used directly; they are part of
+    the cache key so that editing the file or changing one of those
+    variables invalidates the cached Config. The returned object is shared
+    between callers and must not be mutated.
+    """
+    raw_config, _ = _read_config_cached(config_path, mtime_ns, size)
+    
+    # Substitute environment variables (returns a new tree; the cached raw
+    # config is left untouched)
     raw_config = _substitute_env_vars(raw_config)
     
     try:
         # Build configuration objects
         queue_service = QueueServiceConfig(
-            base_url=raw_config['queue_service']['base_url']
+            base_url=_intern(raw_config['queue_service']['base_url']),
+            parallel_fetch=raw_config['queue_service'].get('parallel_fetch', 16),
+            compress_requests=bool(raw_config['queue_service'].get('compress_requests', False))
         )
         
         storage = StorageConfig(
-            pdf_dir=raw_config['storage']['pdf_dir'],
-            pages_dir=raw_config['storage']['pages_dir'],
-            results_dir=raw_config['storage']['results_dir'],
-            metadata_dir=raw_config['storage']['metadata_dir']
+            pdf_dir=_intern(raw_config['storage']['pdf_dir']),
+            pages_dir=_intern(raw_config['storage']['pages_dir']),
+            results_dir=_intern(raw_config['storage']['results_dir']),
+            metadata_dir=_intern(raw_config['storage']['metadata_dir']),
+            image_dpi=raw_config['storage'].get('image_dpi', 150),
+            image_format=_intern(raw_config['storage'].get('image_format', 'jpeg')),
+            max_image_edge=raw_config['storage'].get('max_image_edge', 1024)
         )
         
         llm = LLMConfig(
-            provider=raw_config['llm']['provider'],
+            provider=_intern(raw_config['llm']['provider']),
             api_key=raw_config['llm'].get('api_key'),  # Optional for mock mode
-            model=raw_config['llm']['model'],
-            max_questions_per_page=raw_config['llm']['max_questions_per_page']
+            model=_intern(raw_config['llm']['model']),
+            max_questions_per_page=raw_config['llm']['max_questions_per_page'],
+            cache_dir=_intern(raw_config['llm'].get('cache_dir')),
+            structured_output=bool(raw_config['llm'].get('structured_output', False))
         )
         
         worker = WorkerConfig(
             poll_interval=raw_config['worker']['poll_interval'],
             max_retries=raw_config['worker']['max_retries'],
-            retry_backoff=raw_config['worker']['retry_backoff']
+            retry_backoff=raw_config['worker']['retry_backoff'],
+            dequeue_batch_size=raw_config['worker'].get('dequeue_batch_size', 4),
+            dequeue_wait_ms=raw_config['worker'].get('dequeue_wait_ms', 5000)
         )
         
         anki = AnkiConfig(
-            deck_name=raw_config['anki']['deck_name'],
-            output_dir=raw_config['anki']['output_dir']
+            deck_name=_intern(raw_config['anki']['deck_name']),
+            output_dir=_intern(raw_config['anki']['output_dir'])
         )
         
         # Create main config object
@@ -269,12 +410,30 @@ def load_config(config_path: str = "config.yaml") -> Config:
         raise ValueError(f"Invalid configuration value: {e}")
 
 
+def _intern(value: Any) -> Any:
+    """
+    Intern string config values so that equal strings share one object.
+    
+    Values shared across many workers then also share memory, and comparisons
+    against interned constants (e.g. provider == "mock") can short-circuit on
+    identity. Non-string values (such as None) are returned unchanged.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 def _substitute_env_vars(config_dict: dict) -> dict:
     """
-    Recursively substitute environment variables in configuration.
+    Substitute environment variables throughout a parsed configuration.
+    
+    Supports ${VAR_NAME} syntax for environment variable substitution in any
+    string value, including strings nested in lists. A value that consists
+    solely of one reference becomes the variable's value, or None if it is
+    not set (so optional settings such as api_key read as missing). References
+    embedded in a longer string are replaced in place; unset ones are left as
+    written.
     
-    Supports ${VAR_NAME} syntax for environment variable substitution.
-    If the environment variable is not set, keeps the original value.
+    The tree is walked iteratively with an explicit stack rather than by
+    recursion.
     
     Args:
         config_dict: Configuration dictionary
@@ -283,30 +442,51 @@ def _substitute_env_vars(config_dict: dict) -> dict:
         dict: Configuration with environment variables substituted
     
     Example:
-        Input: {"api_key": "${OPENAI_API_KEY}"}
-        Output: {"api_key": "sk-..."}
+        Input: {"api_key": "${OPENAI_API_KEY}", "url": "http://${HOST}:8080"}
+        Output: {"api_key": "sk-...", "url": "http://localhost:8080"}
     """
-    if not isinstance(config_dict, dict):
-        if isinstance(config_dict, str) and config_dict.startswith('${') and config_dict.endswith('}'):
-            # Extract environment variable name
-            env_var = config_dict[2:-1]
-            # Return environment variable value or None if not set
-            return os.environ.get(env_var)
+    # Bind the lookup once per walk rather than resolving os.environ.get for
+    # every reference.
+    env_get = os.environ.get
+    
+    if isinstance(config_dict, str):
+        return _substitute_env_string(config_dict, env_get)
+    if not isinstance(config_dict, (dict, list)):
         return config_dict
     
-    result = {}
-    for key, value in config_dict.items():
-        if isinstance(value, dict):
-            result[key] = _substitute_env_vars(value)
-        elif isinstance(value, str) and value.startswith('${') and value.endswith('}'):
-            # Extract environment variable name
-            env_var = value[2:-1]
-            # Return environment variable value or None if not set
-            result[key] = os.environ.get(env_var)
-        elif isinstance(value, list):
-            result[key] = [_substitute_env_vars(item) if isinstance(item, dict) else item 
-                          for item in value]
-        else:
-            result[key] = value
+    result = {} if isinstance(config_dict, dict) else [None] * len(config_dict)
+    stack = [(config_dict, result)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, str):
+                target[key] = _substitute_env_string(value, env_get)
+            elif isinstance(value, dict):
+                target[key] = {}
+                stack.append((value, target[key]))
+            elif isinstance(value, list):
+                target[key] = [None] * len(value)
+                stack.append((value, target[key]))
+            else:
+                target[key] = value
     
     return result
+
+
+def _substitute_env_string(
+    value: str,
+    env_get: Callable[..., Optional[str]],
+) -> Optional[str]:
+    """Expand ${VAR_NAME} references in a single configuration string."""
+    if '${' not in value:
+        return value
+    
+    whole = _ENV_VAR_PATTERN.fullmatch(value)
+    if whole:
+        return env_get(whole.group(1))
+    
+    return _ENV_VAR_PATTERN.sub(
+        lambda match: env_get(match.group(1), match.group(0)),
+        value,
+    )
@@ -0,0 +1,72 @@
+"""
+Fast JSON Helpers
+
+Purpose: Parse and serialize JSON with ``orjson`` when it is installed,
+falling back to the standard library ``json`` module otherwise.
+
+``loads`` accepts ``bytes`` or ``str``. Passing the raw bytes of a file lets
+``orjson`` skip the separate UTF-8 decode step. Malformed input raises
+``json.JSONDecodeError`` on both paths, since ``orjson.JSONDecodeError``
+subclasses it.
+
+``dumps`` returns compact UTF-8 ``bytes`` ready to be sent as a request body,
+or two-space indented output for files meant to be read by people.
+
+``load_path`` reads a JSON file. Large files are memory-mapped and handed to
+``orjson`` directly, avoiding the extra copy of reading them into a buffer.
+Where supported, the kernel is told the file will be read sequentially so it
+can read ahead aggressively.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+# Below this size a plain read is cheaper than setting up a mapping.
+MMAP_THRESHOLD_BYTES = 64 * 1024
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes, compact unless ``indent`` is set."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def load_path(path: Union[str, Path]) -> Any:
+    """Deserialize the JSON document stored at ``path``."""
+    with Path(path).open("rb") as f:
+        fd = f.fileno()
+        if hasattr(os, "posix_fadvise"):
+            # One-shot front-to-back read: ask the kernel for full read-ahead.
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        if (
+            orjson is None
+            or os.name == "nt"
+            or os.fstat(fd).st_size < MMAP_THRESHOLD_BYTES
+        ):
+            return loads(f.read())
+
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # The view must be released before the mapping can be closed.
+            with memoryview(mm) as view:
+                return orjson.loads(view)
@@ -15,17 +15,180 @@ Providers
 from __future__ import annotations
 
 import base64
+import functools
+import hashlib
 import json
 import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
+from typing import ClassVar, Dict, List, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src import fast_json
+
+try:
+    # SIMD (SSSE3/AVX2) base64 encoder; the stdlib codec is used when absent.
+    import pybase64 as _base64
+except ImportError:  # pragma: no cover - depends on installed extras
+    _base64 = base64
 
 logger = logging.getLogger(__name__)
 
 
+# Deterministic question/answer templates used by the mock provider. They use
+# %-formatting keyed on the page number, which is cheaper per call than
+# str.format.
+_MOCK_QA_TEMPLATES = (
+    (
+        "What is the main idea presented on page %(page)d?",
+        "The main idea on page %(page)d is a placeholder concept used for testing.",
+    ),
+    (
+        "Name one important term introduced on page %(page)d.",
+        "An example term from page %(page)d is 'Test Concept %(page)d'.",
+    ),
+    (
+        "How could a student apply the concept from page %(page)d in practice?",
+        "A student could apply the concept from page %(page)d by using it in a mock study scenario.",
+    ),
+)
+
+
+_SUPPORTED_PROVIDERS = frozenset(("openrouter", "mock"))
+
+# Prompt text for _create_prompt; only the page number varies between calls.
+_PROMPT_PREFIX = (
+    "You are a helpful teaching assistant generating flashcard-style "
+    "quiz questions from a single textbook page. "
+)
+_PROMPT_TAIL_FMT = (
+    "Focus on the key concepts on page %d and produce clear, "
+    "concise question and answer pairs."
+)
+
+
+_DEFAULT_MODEL = "google/gemma-3-27b-it:free"
+_OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Keep-alive connections held open to OpenRouter; also the default fan-out of
+# generate_quiz_from_images so every concurrent request has a warm connection.
+_MAX_CONCURRENT_REQUESTS = 8
+# (connect, read) seconds: fail fast on an unreachable host, but leave vision
+# models time to answer.
+_REQUEST_TIMEOUT = (10.0, 60.0)
+
+# Chat messages sent to OpenRouter; only the user instructions vary per call.
+_OPENROUTER_SYSTEM_MESSAGE = (
+    "You are a helpful teaching assistant generating flashcard-style quiz "
+    "questions from textbook pages. "
+    "Return ONLY a JSON array of objects, each with 'question' and "
+    "'answer' string fields. Do not include any extra commentary."
+)
+_OPENROUTER_USER_FMT = (
+    "Generate up to %(max_questions)d concise question/answer pairs "
+    "based on this textbook page (page %(page)d). "
+    "Focus on key concepts, definitions, and how they are applied. "
+    "Again, respond ONLY with JSON."
+)
+
+
+_JSON_OBJECT_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Strict structured-output schema. The root must be an object, so the pairs
+# live under "qa_pairs", one of the wrapper keys the parser already accepts.
+_QA_SCHEMA_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "quiz",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "qa_pairs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "question": {"type": "string"},
+                            "answer": {"type": "string"},
+                        },
+                        "required": ["question", "answer"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["qa_pairs"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Multi-page variant of _OPENROUTER_USER_FMT; each image is preceded by a
+# "Page N:" label so the model can attribute its answers.
+_OPENROUTER_BATCH_USER_FMT = (
+    "Generate up to %(max_questions)d concise question/answer pairs for EACH "
+    "of the following textbook pages (pages %(pages)s). "
+    "Focus on key concepts, definitions, and how they are applied. "
+    "Give every object an integer 'page' field naming the page it is about. "
+    "Again, respond ONLY with JSON."
+)
+
+# Pages per request for generate_quiz_from_images_batched.
+_DEFAULT_PAGES_PER_REQUEST = 4
+
+_BATCH_QA_SCHEMA_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "quiz_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "qa_pairs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "question": {"type": "string"},
+                            "answer": {"type": "string"},
+                        },
+                        "required": ["page", "question", "answer"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["qa_pairs"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Prompts depend only on small integers, so every distinct one a process will
+# ever need fits in a modest cache.
+_PROMPT_CACHE_SIZE = 2048
+
+
+@functools.lru_cache(maxsize=_PROMPT_CACHE_SIZE)
+def _build_prompt(page_num: int) -> str:
+    return _PROMPT_PREFIX + (_PROMPT_TAIL_FMT % page_num)
+
+
+@functools.lru_cache(maxsize=_PROMPT_CACHE_SIZE)
+def _build_openrouter_user_instructions(max_questions: int, page_num: int) -> str:
+    return _OPENROUTER_USER_FMT % {"max_questions": max_questions, "page": page_num}
+
+
 class LLMServiceError(Exception):
     """Raised when the LLM service fails to generate quiz questions."""
 
@@ -42,8 +205,10 @@ class LLMServiceConfig:
 
     provider: str = "openrouter"
     api_key: str | None = None
-    model: str = "google/gemma-3-27b-it:free"
+    model: str = _DEFAULT_MODEL
     max_questions: int = 3
+    cache_dir: str | None = None
+    structured_output: bool = False
 
 
 class LLMService:
@@ -55,6 +220,8 @@ class LLMService:
     .. code-block:: python
 
         service = LLMService(provider=\"mock\", api_key=None, model=\"mock\")
+        # or share one instance per configuration:
+        service = LLMService.get_instance(LLMServiceConfig(provider=\"mock\"))
         qa_pairs = service.generate_quiz_from_image(\"page_1.png\", page_num=1)
 
     The return value is always a list of dictionaries with ``question`` and
@@ -68,12 +235,20 @@ class LLMService:
         ]
     """
 
+    # Shared instances handed out by get_instance, keyed on their settings.
+    _instances: ClassVar[
+        Dict[Tuple[str, str, str | None, int, str | None, bool], "LLMService"]
+    ] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(
         self,
         provider: str = "openrouter",
         api_key: str | None = None,
-        model: str = "google/gemma-3-27b-it:free",
+        model: str = _DEFAULT_MODEL,
         max_questions: int = 3,
+        cache_dir: str | None = None,
+        structured_output: bool = False,
     ) -> None:
         """
         Initialize the LLM service.
@@ -89,6 +264,12 @@ class LLMService:
                 invalid the service will automatically fall back to mock mode.
             model: Model name to use (provider specific).
             max_questions: Maximum number of questions to generate per page.
+            cache_dir: Directory for cached OpenRouter responses, keyed on the
+                page image contents. ``None`` (default) disables caching.
+            structured_output: Ask OpenRouter for schema-constrained JSON
+                (``response_format`` type ``json_schema``). Only enable this
+                for models that support structured outputs; otherwise the
+                plain ``json_object`` mode is used.
 
         Raises:
             ValueError: If an unsupported provider is supplied.
@@ -97,8 +278,17 @@ class LLMService:
         self.api_key = api_key
         self.model = model
         self.max_questions = max(1, int(max_questions))
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self.structured_output = bool(structured_output)
+
+        # Some providers (notably the Google-backed Gemma 3 API) do not yet
+        # support separate system / developer messages and will return a 400
+        # if we send them. For those models the system instructions are folded
+        # into the user message so the prompt is still respected.
+        self._request_model = self.model or _DEFAULT_MODEL
+        self._fold_system = "google/gemma-3" in self._request_model.lower()
 
-        if self.provider not in {"openrouter", "mock"}:
+        if self.provider not in _SUPPORTED_PROVIDERS:
             # Fail fast so that misconfiguration is obvious and does not
             # silently fall back to a different provider.
             raise ValueError(
@@ -106,6 +296,42 @@ class LLMService:
                 "Supported providers are: 'openrouter', 'mock'."
             )
 
+        # One pooled keep-alive session per service so consecutive pages reuse
+        # the TLS connection to OpenRouter instead of re-handshaking each call.
+        # All traffic goes to a single host, so there is one pool sized to the
+        # request concurrency; pool_block makes extra callers wait for a warm
+        # connection rather than open (and then discard) a new one.
+        # Rate limits and transient 5xx responses are retried with backoff;
+        # once retries run out the last response is handled as usual.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=_MAX_CONCURRENT_REQUESTS,
+            pool_block=True,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("https://", adapter)
+        self._session.headers.update(
+            {
+                "Accept": "application/json",
+                # Bodies are pre-serialized with fast_json, so requests does
+                # not set this for us.
+                "Content-Type": "application/json",
+                # These headers are recommended by OpenRouter for attribution,
+                # but they are not strictly required for correctness.
+                "HTTP-Referer": "http://localhost",
+                "X-Title": "PDF Quiz Generator",
+            }
+        )
+        if self.api_key:
+            self._session.headers["Authorization"] = f"Bearer {self.api_key}"
+
         logger.debug(
             "Initialized LLMService provider=%s model=%s max_questions=%s",
             self.provider,
@@ -113,6 +339,58 @@ class LLMService:
             self.max_questions,
         )
 
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self._session.close()
+
+    def __enter__(self) -> LLMService:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @classmethod
+    def get_instance(cls, cfg: LLMServiceConfig) -> LLMService:
+        """
+        Return a shared service for ``cfg``, creating it on first use.
+
+        The service holds no per-call state, so every caller with the same
+        provider, model, API key, question limit, cache directory and output
+        mode can reuse one instance.
+        Creation is guarded by a lock so concurrent callers get the same
+        object.
+
+        Args:
+            cfg: Settings for the service.
+
+        Returns:
+            The cached :class:`LLMService` for these settings.
+
+        Raises:
+            ValueError: If an unsupported provider is supplied.
+        """
+        key = (
+            cfg.provider.lower().strip(),
+            cfg.model,
+            cfg.api_key,
+            int(cfg.max_questions),
+            cfg.cache_dir,
+            bool(cfg.structured_output),
+        )
+        with cls._instances_lock:
+            service = cls._instances.get(key)
+            if service is None:
+                service = cls(
+                    provider=cfg.provider,
+                    api_key=cfg.api_key,
+                    model=cfg.model,
+                    max_questions=cfg.max_questions,
+                    cache_dir=cfg.cache_dir,
+                    structured_output=cfg.structured_output,
+                )
+                cls._instances[key] = service
+        return service
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -136,8 +414,25 @@ class LLMService:
             LLMServiceError: If question generation fails.
         """
         path = Path(image_path)
-        if not path.is_file():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        prompt = self._create_prompt(page_num)
+
+        # EAFP: let the stat/open inside _encode_image detect a missing file
+        # instead of paying for a separate is_file() check.
+        try:
+            cache_key = None
+            if self._cache_dir is not None and self.provider == "openrouter":
+                cache_key = self._response_cache_key(path, prompt)
+                cached = self._load_cached_response(cache_key)
+                if cached is not None:
+                    logger.info(
+                        "Using cached quiz questions page=%s image=%s",
+                        page_num,
+                        path.name,
+                    )
+                    return cached
+            image_data_uri = self._encode_image(path)
+        except (FileNotFoundError, IsADirectoryError):
+            raise FileNotFoundError(f"Image file not found: {image_path}") from None
 
         logger.info(
             "Generating quiz questions provider=%s page=%s image=%s",
@@ -147,13 +442,12 @@ class LLMService:
         )
 
         try:
-            image_b64 = self._encode_image(path)
-            prompt = self._create_prompt(page_num)
-
             if self.provider == "mock":
-                return self._call_mock(image_b64, prompt, page_num)
+                return self._call_mock(image_data_uri, prompt, page_num)
             if self.provider == "openrouter":
-                return self._call_openrouter(image_b64, prompt, page_num)
+                return self._call_openrouter(
+                    image_data_uri, prompt, page_num, cache_key=cache_key
+                )
 
             # Defensive: __init__ should already have validated provider.
             raise LLMServiceError(f"Unsupported provider at runtime: {self.provider}")
@@ -164,20 +458,198 @@ class LLMService:
             logger.exception("Unexpected error in LLMService: %s", exc)
             raise LLMServiceError(f"Unexpected error while generating quiz: {exc}") from exc
 
+    def generate_quiz_from_images(
+        self,
+        pages: Sequence[Tuple[str, int]],
+        max_workers: int = _MAX_CONCURRENT_REQUESTS,
+        return_exceptions: bool = False,
+    ) -> List[List[Dict[str, str]] | Exception]:
+        """
+        Generate quiz questions for several page images concurrently.
+
+        Requests are IO-bound, so up to ``max_workers`` pages are sent at once
+        over the shared session; the pool size also bounds how many requests
+        are in flight against the provider's rate limit.
+
+        Args:
+            pages: ``(image_path, page_num)`` pairs.
+            max_workers: Maximum number of concurrent requests.
+            return_exceptions: Return a failed page's exception in its slot
+                instead of raising it, so the other pages' answers are kept.
+
+        Returns:
+            One question/answer list per entry in ``pages``, in the same order
+            (or the page's exception, with ``return_exceptions``).
+
+        Raises:
+            FileNotFoundError: If an image does not exist.
+            LLMServiceError: If question generation fails for any page.
+        """
+        if not pages:
+            return []
+
+        workers = max(1, min(max_workers, len(pages)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.generate_quiz_from_image, image_path, page_num)
+                for image_path, page_num in pages
+            ]
+            if return_exceptions:
+                return [future.exception() or future.result() for future in futures]
+            return [future.result() for future in futures]
+
+    def generate_quiz_from_images_batched(
+        self,
+        pages: Sequence[Tuple[str, int]],
+        batch_size: int = _DEFAULT_PAGES_PER_REQUEST,
+        max_workers: int = _MAX_CONCURRENT_REQUESTS,
+        return_exceptions: bool = False,
+    ) -> List[List[Dict[str, str]] | Exception]:
+        """
+        Generate quiz questions for several pages, sending up to ``batch_size``
+        page images in each OpenRouter request.
+
+        Batching amortizes the per-request round trip and prompt prefill over
+        several pages. The model is asked to label each pair with its page
+        number; any page that comes back without valid pairs, or a batch whose
+        request or reply fails, is retried one page at a time via
+        :meth:`generate_quiz_from_image`. Cached pages are never re-sent.
+
+        The mock provider, a missing API key or ``batch_size <= 1`` use
+        :meth:`generate_quiz_from_images` unchanged.
+
+        Args:
+            pages: ``(image_path, page_num)`` pairs.
+            batch_size: Maximum number of pages per request.
+            max_workers: Maximum number of concurrent batch requests.
+            return_exceptions: Return a failed page's exception in its slot
+                instead of raising it, so the other pages' answers are kept.
+
+        Returns:
+            One question/answer list per entry in ``pages``, in the same order
+            (or the page's exception, with ``return_exceptions``).
+
+        Raises:
+            FileNotFoundError: If an image does not exist.
+            LLMServiceError: If question generation fails for any page.
+        """
+        if not pages:
+            return []
+        if self.provider != "openrouter" or not self.api_key or batch_size <= 1:
+            return self.generate_quiz_from_images(
+                pages, max_workers=max_workers, return_exceptions=return_exceptions
+            )
+
+        batches = [pages[i : i + batch_size] for i in range(0, len(pages), batch_size)]
+        workers = max(1, min(max_workers, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._generate_batch, batch, return_exceptions)
+                for batch in batches
+            ]
+            results: List[List[Dict[str, str]] | Exception] = []
+            for batch, future in zip(batches, futures):
+                exc = future.exception() if return_exceptions else None
+                if exc is not None:
+                    results.extend([exc] * len(batch))
+                else:
+                    results.extend(future.result())
+            return results
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
     @staticmethod
     def _encode_image(path: Path) -> str:
         """
-        Read an image file and return a base64-encoded string.
+        Read an image file and return it as a base64 ``data:`` URI.
+
+        This matches the ``image_url`` format required by vision-capable LLM
+        APIs and is convenient to test in isolation.
+
+        URIs are cached by (path, mtime, size) so that retries for the same
+        page do not re-read, re-encode or re-concatenate the image.
+        """
+        stat = path.stat()
+        return _encode_image_data_uri(str(path), stat.st_mtime_ns, stat.st_size)
 
-        This matches the format typically required by vision-capable LLM APIs
-        and is convenient to test in isolation.
+    def _response_cache_key(self, path: Path, prompt: str) -> str:
         """
-        with path.open("rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode("ascii")
+        Return the response-cache key for ``path`` sent with ``prompt``.
+
+        The key covers the image bytes and everything else that shapes the
+        reply: model, question limit and prompt (which names the page).
+        """
+        stat = path.stat()
+        image_digest = _image_sha256(str(path), stat.st_mtime_ns, stat.st_size)
+        key_source = "\0".join((image_digest, self.model, str(self.max_questions), prompt))
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def _response_cache_path(self, cache_key: str) -> Path:
+        # Two-character fan-out keeps any one directory small.
+        return self._cache_dir / cache_key[:2] / f"{cache_key}.json"
+
+    def _load_cached_response(self, cache_key: str) -> List[Dict[str, str]] | None:
+        """Return cached Q&A pairs for ``cache_key``, or None on a miss."""
+        cache_path = self._response_cache_path(cache_key)
+        try:
+            if time.time() - cache_path.stat().st_mtime > _RESPONSE_CACHE_TTL_SECONDS:
+                return None
+            qa_pairs = fast_json.load_path(cache_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable response cache entry %s: %s", cache_path, exc)
+            return None
+        # Entries are only ever written by _store_cached_response, but a stale
+        # format or a hand-edited file must not leak into results.
+        if not isinstance(qa_pairs, list) or not all(
+            isinstance(pair, dict)
+            and isinstance(pair.get("question"), str)
+            and isinstance(pair.get("answer"), str)
+            for pair in qa_pairs
+        ):
+            logger.warning("Ignoring malformed response cache entry %s", cache_path)
+            return None
+        return qa_pairs
+
+    def _store_cached_response(self, cache_key: str, qa_pairs: List[Dict[str, str]]) -> None:
+        """Write ``qa_pairs`` to the response cache; failures are only logged."""
+        cache_path = self._response_cache_path(cache_key)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and swap it in so concurrent workers never
+            # read a partially written entry.
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(fast_json.dumps(qa_pairs))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as exc:
+            logger.warning("Could not write response cache entry %s: %s", cache_path, exc)
+
+    def _build_messages(
+        self, user_instructions: str, image_parts: Sequence[Dict[str, object]]
+    ) -> List[Dict[str, object]]:
+        """Return the chat ``messages`` list for the given image content parts."""
+        if self._fold_system:
+            combined_instructions = f"{_OPENROUTER_SYSTEM_MESSAGE} {user_instructions}"
+            return [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": combined_instructions}, *image_parts],
+                }
+            ]
+        return [
+            {"role": "system", "content": _OPENROUTER_SYSTEM_MESSAGE},
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": user_instructions}, *image_parts],
+            },
+        ]
 
     @staticmethod
     def _create_prompt(page_num: int) -> str:
@@ -188,16 +660,11 @@ class LLMService:
         a real model, we keep this to match the shape expected by future
         providers.
         """
-        return (
-            "You are a helpful teaching assistant generating flashcard-style "
-            "quiz questions from a single textbook page. "
-            f"Focus on the key concepts on page {page_num} and produce clear, "
-            "concise question and answer pairs."
-        )
+        return _build_prompt(page_num)
 
     def _call_mock(
         self,
-        image_b64: str,  # noqa: ARG002 - kept for future parity with real calls
+        image_data_uri: str,  # noqa: ARG002 - kept for future parity with real calls
         prompt: str,  # noqa: ARG002 - kept for future parity with real calls
         page_num: int,
     ) -> List[Dict[str, str]]:
@@ -210,32 +677,12 @@ class LLMService:
         """
         # Construct a small, deterministic question set based on page number.
         # This keeps tests predictable while still resembling real data.
-        questions: List[Dict[str, str]] = []
-
-        templates = [
-            (
-                "What is the main idea presented on page {page}?",
-                "The main idea on page {page} is a placeholder concept used for testing.",
-            ),
-            (
-                "Name one important term introduced on page {page}.",
-                "An example term from page {page} is 'Test Concept {page}'.",
-            ),
-            (
-                "How could a student apply the concept from page {page} in practice?",
-                "A student could apply the concept from page {page} by using it in a mock study scenario.",
-            ),
+        values = {"page": page_num}
+        questions: List[Dict[str, str]] = [
+            {"question": q_template % values, "answer": a_template % values}
+            for q_template, a_template in _MOCK_QA_TEMPLATES[: self.max_questions]
         ]
 
-        for idx in range(min(self.max_questions, len(templates))):
-            q_template, a_template = templates[idx]
-            questions.append(
-                {
-                    "question": q_template.format(page=page_num),
-                    "answer": a_template.format(page=page_num),
-                }
-            )
-
         if not questions:
             # This should never happen given our defaults, but we guard against
             # it to keep downstream code simple.
@@ -246,11 +693,129 @@ class LLMService:
         )
         return questions
 
+    def _generate_batch(
+        self, batch: Sequence[Tuple[str, int]], return_exceptions: bool = False
+    ) -> List[List[Dict[str, str]] | Exception]:
+        """Answer one batch of pages, falling back to single-page requests."""
+        results: List[List[Dict[str, str]] | Exception | None] = [None] * len(batch)
+        pending: List[Tuple[int, Path, int, str | None]] = []
+        for index, (image_path, page_num) in enumerate(batch):
+            path = Path(image_path)
+            cache_key = None
+            try:
+                if self._cache_dir is not None:
+                    cache_key = self._response_cache_key(path, self._create_prompt(page_num))
+                    results[index] = self._load_cached_response(cache_key)
+                else:
+                    path.stat()
+            except (FileNotFoundError, IsADirectoryError):
+                error = FileNotFoundError(f"Image file not found: {image_path}")
+                if not return_exceptions:
+                    raise error from None
+                # Keep a missing page out of the shared request.
+                results[index] = error
+                continue
+            if results[index] is None:
+                pending.append((index, path, page_num, cache_key))
+
+        if len(pending) > 1:
+            try:
+                answered = self._call_openrouter_batch(
+                    [(path, page_num) for _, path, page_num, _ in pending]
+                )
+            except (LLMServiceError, FileNotFoundError) as exc:
+                logger.warning(
+                    "Batched OpenRouter request for pages %s failed (%s); "
+                    "retrying page by page.",
+                    [page_num for _, _, page_num, _ in pending],
+                    exc,
+                )
+                answered = {}
+            for index, _, page_num, cache_key in pending:
+                qa_pairs = answered.get(page_num)
+                if qa_pairs is not None:
+                    results[index] = qa_pairs
+                    if cache_key is not None:
+                        self._store_cached_response(cache_key, qa_pairs)
+
+        for index, (image_path, page_num) in enumerate(batch):
+            if results[index] is None:
+                try:
+                    results[index] = self.generate_quiz_from_image(image_path, page_num)
+                except Exception as exc:
+                    if not return_exceptions:
+                        raise
+                    results[index] = exc
+        return results  # type: ignore[return-value]
+
+    def _call_openrouter_batch(
+        self, pages: Sequence[Tuple[Path, int]]
+    ) -> Dict[int, List[Dict[str, str]]]:
+        """
+        Send several page images in one OpenRouter request.
+
+        Returns the valid pairs grouped by page number. Unlike
+        :meth:`_call_openrouter` this never falls back to the mock provider;
+        any failure raises :class:`LLMServiceError` so the caller can retry
+        the pages individually.
+        """
+        image_parts: List[Dict[str, object]] = []
+        for path, page_num in pages:
+            try:
+                image_data_uri = self._encode_image(path)
+            except (FileNotFoundError, IsADirectoryError):
+                raise FileNotFoundError(f"Image file not found: {path}") from None
+            image_parts.append({"type": "text", "text": f"Page {page_num}:"})
+            image_parts.append({"type": "image_url", "image_url": {"url": image_data_uri}})
+
+        user_instructions = _OPENROUTER_BATCH_USER_FMT % {
+            "max_questions": self.max_questions,
+            "pages": ", ".join(str(page_num) for _, page_num in pages),
+        }
+        payload = {
+            "model": self._request_model,
+            "messages": self._build_messages(user_instructions, image_parts),
+            "response_format": (
+                _BATCH_QA_SCHEMA_RESPONSE_FORMAT
+                if self.structured_output
+                else _JSON_OBJECT_RESPONSE_FORMAT
+            ),
+        }
+
+        logger.info(
+            "Generating quiz questions provider=%s pages=%s (batched)",
+            self.provider,
+            [page_num for _, page_num in pages],
+        )
+        try:
+            response = self._session.post(
+                _OPENROUTER_URL,
+                data=fast_json.dumps(payload),
+                timeout=_REQUEST_TIMEOUT,
+            )
+        except requests.RequestException as exc:  # pragma: no cover - network
+            raise LLMServiceError(f"OpenRouter request failed: {exc}") from exc
+
+        if not response.ok:
+            raise LLMServiceError(
+                f"OpenRouter API error: {response.status_code} {response.text[:200]}"
+            )
+
+        try:
+            data = fast_json.loads(response.content)
+        except ValueError as exc:  # pragma: no cover - defensive
+            raise LLMServiceError(
+                f"OpenRouter returned non-JSON response: {exc}"
+            ) from exc
+
+        return _parse_batched_qa_pairs(_extract_content_text(data), self.structured_output)
+
     def _call_openrouter(
         self,
-        image_b64: str,
+        image_data_uri: str,
         prompt: str,
         page_num: int,
+        cache_key: str | None = None,
     ) -> List[Dict[str, str]]:
         """
         Call the OpenRouter chat completions API to generate Q&A pairs.
@@ -262,80 +827,28 @@ class LLMService:
               logs an error and falls back to :meth:`_call_mock`.
             - For other HTTP errors or unexpected response formats, raises
               :class:`LLMServiceError`.
+            - On success, stores the parsed pairs in the response cache under
+              ``cache_key`` when one is given.
         """
         if not self.api_key:
             logger.warning(
                 "No OpenRouter API key configured; falling back to mock provider."
             )
-            return self._call_mock(image_b64, prompt, page_num)
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            # These headers are recommended by OpenRouter for attribution,
-            # but they are not strictly required for correctness.
-            "HTTP-Referer": "http://localhost",
-            "X-Title": "PDF Quiz Generator",
-        }
+            return self._call_mock(image_data_uri, prompt, page_num)
 
         # Compose a chat-style request. We instruct the model to return ONLY a
         # JSON array of {question, answer} objects so that the parsing helper
         # can be reused.
-        system_message = (
-            "You are a helpful teaching assistant generating flashcard-style quiz "
-            "questions from textbook pages. "
-            "Return ONLY a JSON array of objects, each with 'question' and "
-            "'answer' string fields. Do not include any extra commentary."
-        )
-        user_instructions = (
-            f"Generate up to {self.max_questions} concise question/answer pairs "
-            f"based on this textbook page (page {page_num}). "
-            "Focus on key concepts, definitions, and how they are applied. "
-            "Again, respond ONLY with JSON."
+        user_instructions = _build_openrouter_user_instructions(
+            self.max_questions, page_num
         )
 
-        # Some providers (notably the Google-backed Gemma 3 API) do not yet
-        # support separate system / developer messages and will return a 400
-        # if we send them. For those models we fold the system instructions
-        # into the user message so the prompt is still respected.
-        model_name = (self.model or "google/gemma-3-27b-it:free").lower()
-        if "google/gemma-3" in model_name:
-            combined_instructions = f"{system_message} {user_instructions}"
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": combined_instructions},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{image_b64}",
-                            },
-                        },
-                    ],
-                }
-            ]
-        else:
-            messages = [
-                {"role": "system", "content": system_message},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": user_instructions},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{image_b64}",
-                            },
-                        },
-                    ],
-                },
-            ]
-
         payload = {
-            "model": self.model or "google/gemma-3-27b-it:free",
-            "messages": messages,
+            "model": self._request_model,
+            "messages": self._build_messages(
+                user_instructions,
+                ({"type": "image_url", "image_url": {"url": image_data_uri}},),
+            ),
         }
 
         # Prefer structured / JSON-formatted output when supported by the model.
@@ -349,20 +862,25 @@ class LLMService:
         # For models that ignore or do not support this parameter, behaviour
         # falls back to the regular text response and our parser remains
         # defensive.
-        payload["response_format"] = {"type": "json_object"}
+        #
+        # With ``structured_output`` enabled, models that support it are
+        # constrained to the Q&A JSON schema instead, so the reply can be
+        # decoded directly.
+        payload["response_format"] = (
+            _QA_SCHEMA_RESPONSE_FORMAT if self.structured_output else _JSON_OBJECT_RESPONSE_FORMAT
+        )
 
         try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60,
+            response = self._session.post(
+                _OPENROUTER_URL,
+                data=fast_json.dumps(payload),
+                timeout=_REQUEST_TIMEOUT,
             )
         except requests.RequestException as exc:  # pragma: no cover - network
             logger.error(
                 "OpenRouter request failed (%s); falling back to mock provider.", exc
             )
-            return self._call_mock(image_b64, prompt, page_num)
+            return self._call_mock(image_data_uri, prompt, page_num)
 
         if response.status_code in (401, 403):
             logger.error(
@@ -370,7 +888,7 @@ class LLMService:
                 "falling back to mock provider.",
                 response.status_code,
             )
-            return self._call_mock(image_b64, prompt, page_num)
+            return self._call_mock(image_data_uri, prompt, page_num)
 
         if not response.ok:
             # For non-auth HTTP errors we surface an explicit error so that
@@ -380,30 +898,72 @@ class LLMService:
             )
 
         try:
-            data = response.json()
+            data = fast_json.loads(response.content)
         except ValueError as exc:  # pragma: no cover - defensive
             raise LLMServiceError(
                 f"OpenRouter returned non-JSON response: {exc}"
             ) from exc
 
-        try:
-            content = data["choices"][0]["message"]["content"]
-        except (KeyError, IndexError, TypeError) as exc:
-            raise LLMServiceError(
-                f"Unexpected OpenRouter response structure: {exc}"
-            ) from exc
+        content_text = _extract_content_text(data)
 
-        # Depending on the model, content may be a string or a list of parts.
-        if isinstance(content, list):
-            text_parts = []
-            for part in content:
-                if isinstance(part, dict) and part.get("type") == "text":
-                    text_parts.append(part.get("text", ""))
-            content_text = "\n".join(text_parts)
+        if self.structured_output:
+            qa_pairs = _parse_structured_qa_pairs(content_text)
         else:
-            content_text = str(content)
+            qa_pairs = _parse_qa_pairs_from_json(content_text)
+        if cache_key is not None:
+            # Only genuine API answers are cached, never the mock fallbacks.
+            self._store_cached_response(cache_key, qa_pairs)
+        return qa_pairs
+
+
+# Page images can be several MB once base64-encoded, and retries hit the same
+# page back to back, so a small cache is enough.
+_ENCODED_IMAGE_CACHE_SIZE = 8
+
+# The MIME type follows the file extension written by PDFProcessor; anything
+# unrecognised is sent as PNG, the historical page format.
+_DATA_URI_PREFIXES = {
+    ".jpg": "data:image/jpeg;base64,",
+    ".jpeg": "data:image/jpeg;base64,",
+}
+_DATA_URI_PREFIX = "data:image/png;base64,"
 
-        return _parse_qa_pairs_from_json(content_text)
+# Cached OpenRouter answers are reused for this long before the page is sent
+# to the model again.
+_RESPONSE_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+@functools.lru_cache(maxsize=_ENCODED_IMAGE_CACHE_SIZE)
+def _image_sha256(path: str, mtime_ns: int, size: int) -> str:  # noqa: ARG001
+    """Hex SHA-256 of the file at ``path``; ``mtime_ns``/``size`` key the cache."""
+    if size == 0:
+        return hashlib.sha256().hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return hashlib.sha256(mm).hexdigest()
+
+
+@functools.lru_cache(maxsize=_ENCODED_IMAGE_CACHE_SIZE)
+def _encode_image_data_uri(path: str, mtime_ns: int, size: int) -> str:  # noqa: ARG001
+    """
+    Build the base64 ``data:`` URI for ``path``; ``mtime_ns``/``size`` key the cache.
+
+    The file is memory-mapped and encoded straight from the mapping, so no
+    intermediate ``bytes`` copy of the raw image is made.
+    """
+    prefix = _DATA_URI_PREFIXES.get(os.path.splitext(path)[1].lower(), _DATA_URI_PREFIX)
+    if size == 0:
+        return prefix
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return prefix + _base64.b64encode(mm).decode("ascii")
+
+
+# Either the contents of a ```-fenced block (optionally with a language hint)
+# or, for unfenced replies, the span from the first opening bracket/brace to
+# the last closing one.
+_JSON_BODY_RE = re.compile(
+    r"```[\w-]*[ \t]*\n?(?P<body>.*?)\s*```|(?P<bare>[\[{].*[\]}])",
+    re.DOTALL,
+)
 
 
 def _parse_qa_pairs_from_json(text: str) -> List[Dict[str, str]]:
@@ -413,54 +973,35 @@ def _parse_qa_pairs_from_json(text: str) -> List[Dict[str, str]]:
     This is not used by the mock provider but is kept as a small, focused
     helper that can be reused when real LLM providers are introduced.
     """
-
-    # Normalise and defensively extract JSON from common wrappers such as
-    # Markdown code fences or explanatory text that some models still add
-    # around the JSON, even when asked not to.
-    raw = text.strip()
-
-    # Strip Markdown ``` fences (optionally with a language hint).
-    if raw.startswith("```"):
-        lines = raw.splitlines()
-        if lines and lines[0].lstrip().startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].lstrip().startswith("```"):
-            lines = lines[:-1]
-        raw = "\n".join(lines).strip()
+    return _valid_qa_pairs(_extract_qa_items(text))
+
+
+def _extract_qa_items(text: str) -> List[object]:
+    """Decode ``text`` defensively and return the list of Q&A item objects."""
+    # Defensively extract JSON from common wrappers such as Markdown code
+    # fences or explanatory text that some models still add around the JSON,
+    # even when asked not to. One precompiled search replaces the manual
+    # fence stripping and bracket slicing.
+    match = _JSON_BODY_RE.search(text)
+    if match is not None:
+        body = match.group("body")
+        raw = match.group("bare") if body is None else body
+    else:
+        raw = text.strip()
 
     data: List[Dict[str, str]] | Dict[str, object]
-
-    # If the cleaned string does not start with a typical JSON delimiter,
-    # attempt to slice out the first top-level array as a best effort before
-    # falling back to a direct load.
-    if not (raw.startswith("[") or raw.startswith("{")):
-        start = raw.find("[")
-        end = raw.rfind("]")
-        if start != -1 and end != -1 and start < end:
-            candidate = raw[start : end + 1]
-            try:
-                data = json.loads(candidate)
-            except json.JSONDecodeError:
-                # Fall back to loading the entire string below so that the
-                # caller still receives a clear, debuggable error if parsing
-                # ultimately fails.
-                try:
-                    data = json.loads(raw)
-                except json.JSONDecodeError as exc:  # pragma: no cover - defensive
-                    raise LLMServiceError(
-                        f"Failed to decode LLM JSON response: {exc}"
-                    ) from exc
-        else:
-            try:
-                data = json.loads(raw)
-            except json.JSONDecodeError as exc:  # pragma: no cover - defensive
-                raise LLMServiceError(
-                    f"Failed to decode LLM JSON response: {exc}"
-                ) from exc
-    else:
+    try:
+        data = fast_json.loads(raw)
+    except json.JSONDecodeError as exc:
+        # Braces in the surrounding prose can stretch the bare span past the
+        # JSON itself; fall back to the first '[' ... last ']' slice.
+        start = text.find("[")
+        end = text.rfind("]")
+        if start == -1 or end <= start:
+            raise LLMServiceError(f"Failed to decode LLM JSON response: {exc}") from exc
         try:
-            data = json.loads(raw)
-        except json.JSONDecodeError as exc:  # pragma: no cover - defensive
+            data = fast_json.loads(text[start : end + 1])
+        except json.JSONDecodeError:
             raise LLMServiceError(f"Failed to decode LLM JSON response: {exc}") from exc
 
     # At this point ``data`` is valid JSON. Historically we asked the model to
@@ -500,14 +1041,97 @@ def _parse_qa_pairs_from_json(text: str) -> List[Dict[str, str]]:
     else:
         raise LLMServiceError("Expected a list of Q&A dictionaries from LLM")
 
-    results: List[Dict[str, str]] = []
+    return items
+
+
+def _parse_batched_qa_pairs(
+    text: str, structured: bool
+) -> Dict[int, List[Dict[str, str]]]:
+    """
+    Group the pairs of a multi-page reply by their ``page`` field.
+
+    Items without a usable page number are dropped; pages that end up with no
+    valid pairs are simply absent from the result.
+    """
+    items: object = None
+    if structured:
+        try:
+            items = fast_json.loads(text)["qa_pairs"]
+        except (ValueError, TypeError, KeyError):
+            items = None
+    if not isinstance(items, list):
+        items = _extract_qa_items(text)
+
+    by_page: Dict[int, List[object]] = {}
     for item in items:
         if not isinstance(item, dict):
             continue
-        question = item.get("question")
-        answer = item.get("answer")
-        if isinstance(question, str) and isinstance(answer, str):
-            results.append({"question": question, "answer": answer})
+        try:
+            page_num = int(item.get("page"))
+        except (TypeError, ValueError):
+            continue
+        by_page.setdefault(page_num, []).append(item)
+
+    grouped: Dict[int, List[Dict[str, str]]] = {}
+    for page_num, page_items in by_page.items():
+        try:
+            grouped[page_num] = _valid_qa_pairs(page_items)
+        except LLMServiceError:
+            continue
+    return grouped
+
+
+def _extract_content_text(data: object) -> str:
+    """Return the assistant message text from a chat completions response."""
+    try:
+        content = data["choices"][0]["message"]["content"]  # type: ignore[index]
+    except (KeyError, IndexError, TypeError) as exc:
+        raise LLMServiceError(
+            f"Unexpected OpenRouter response structure: {exc}"
+        ) from exc
+
+    # Depending on the model, content may be a string or a list of parts.
+    if isinstance(content, list):
+        text_parts = []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "text":
+                text_parts.append(part.get("text", ""))
+        return "\n".join(text_parts)
+    return str(content)
+
+
+def _parse_structured_qa_pairs(text: str) -> List[Dict[str, str]]:
+    """
+    Parse a reply produced under the ``quiz`` JSON schema.
+
+    Schema-constrained replies are a bare ``{"qa_pairs": [...]}`` document, so
+    a single decode and key lookup is enough. Providers that silently ignore
+    ``response_format`` are handled by falling back to the defensive parser.
+    """
+    try:
+        data = fast_json.loads(text)
+        items = data["qa_pairs"]
+    except (ValueError, TypeError, KeyError):
+        return _parse_qa_pairs_from_json(text)
+    if not isinstance(items, list):
+        return _parse_qa_pairs_from_json(text)
+    return _valid_qa_pairs(items)
+
+
+def _valid_qa_pairs(items: List[object]) -> List[Dict[str, str]]:
+    """Return the well-formed ``{question, answer}`` pairs from ``items``."""
+    # Keep only well-formed pairs. A single comprehension with a local ``str``
+    # avoids per-item method lookups for ``append``.
+    _str = str
+    results: List[Dict[str, str]] = [
+        {"question": question, "answer": answer}
+        for item in items
+        if isinstance(item, dict)
+        for question in (item.get("question"),)
+        if isinstance(question, _str)
+        for answer in (item.get("answer"),)
+        if isinstance(answer, _str)
+    ]
 
     if not results:
         raise LLMServiceError("No valid question/answer pairs found in LLM response")
@@ -1,35 +1,164 @@
+import os
+import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List
-from pdf2image import convert_from_path
-from pypdf import PdfReader 
-from PIL import Image
+from typing import Iterator, List, Optional, Tuple
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFInfoNotInstalledError
+from pypdf import PdfReader
+
+_PAGE_COUNT_CACHE_SIZE = 32
+
+# Vision models downscale their input to well under 150 DPI, so anything
+# larger is only upload and encode overhead.
+DEFAULT_DPI = 150
+DEFAULT_IMAGE_FORMAT = "jpeg"
+# Vision models tile their input at 512-896 px, so a longer edge than this
+# only adds base64 bytes and input tokens. Pages that already fit at the
+# configured DPI are left alone rather than upscaled.
+DEFAULT_MAX_IMAGE_EDGE = 1024
+# PDF page sizes are in points, 1/72 inch.
+_POINTS_PER_INCH = 72
+# "Page    3 size: 612 x 792 pts (letter)" lines of pdfinfo -f/-l output.
+_PDFINFO_PAGE_SIZE_RE = re.compile(r"^Page\s+(\d+) size$")
+_PDFINFO_DIMENSIONS_RE = re.compile(r"([\d.]+) x ([\d.]+)")
+_JPEG_OPTIONS = {"quality": 85, "progressive": True, "optimize": True}
+_FILE_EXTENSIONS = {"jpeg": "jpg", "png": "png"}
+
+
+@lru_cache(maxsize=_PAGE_COUNT_CACHE_SIZE)
+def _page_count(pdf_path: str, mtime_ns: int, size: int) -> int:
+    # pdfinfo only reads the trailer and page tree root; fall back to pypdf
+    # when poppler is not installed. mtime/size are part of the key so an
+    # overwritten file is re-read.
+    try:
+        return int(pdfinfo_from_path(pdf_path)["Pages"])
+    except PDFInfoNotInstalledError:
+        return len(PdfReader(pdf_path).pages)
+
+
+@lru_cache(maxsize=_PAGE_COUNT_CACHE_SIZE)
+def _page_long_sides(pdf_path: str, mtime_ns: int, size: int) -> Tuple[float, ...]:
+    # Longest side of every page in points, in page order. Same cache key and
+    # pdfinfo-then-pypdf fallback as _page_count.
+    page_count = _page_count(pdf_path, mtime_ns, size)
+    try:
+        info = pdfinfo_from_path(pdf_path, first_page=1, last_page=page_count)
+    except PDFInfoNotInstalledError:
+        info = {}
+    sides = {}
+    for key, value in info.items():
+        page_match = _PDFINFO_PAGE_SIZE_RE.match(key)
+        dims_match = _PDFINFO_DIMENSIONS_RE.search(value) if page_match else None
+        if dims_match:
+            sides[int(page_match.group(1))] = max(map(float, dims_match.groups()))
+    if len(sides) == page_count:
+        return tuple(sides[page_num] for page_num in range(1, page_count + 1))
+    # poppler renders the crop box, which defaults to the media box.
+    return tuple(
+        float(max(page.cropbox.width, page.cropbox.height))
+        for page in PdfReader(pdf_path).pages
+    )
+
 
 class PDFProcessor:
-    def __init__(self, pages_output_dir: str):
+    def __init__(
+        self,
+        pages_output_dir: str,
+        dpi: int = DEFAULT_DPI,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        max_image_edge: Optional[int] = DEFAULT_MAX_IMAGE_EDGE,
+    ):
         self.pages_output_dir = Path(pages_output_dir)
+        self.dpi = dpi
+        self.image_format = image_format
+        self.max_image_edge = max_image_edge
+        self._extension = _FILE_EXTENSIONS[image_format]
         self.pages_output_dir.mkdir(parents=True, exist_ok=True)
 
     def validate_pdf(self, pdf_path: str) -> bool:
         try:
-            PdfReader(pdf_path)
+            self.get_pdf_page_count(pdf_path)
             return True
         except Exception:
             return False
 
     def get_pdf_page_count(self, pdf_path: str) -> int:
-        reader = PdfReader(pdf_path)
-        return len(reader.pages)
+        stat = os.stat(pdf_path)
+        return _page_count(os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
 
     def split_pdf_to_images(self, pdf_path: str, pdf_id: str) -> List[str]:
-        output_paths = []
-        images = convert_from_path(pdf_path)
-        for index in range(1, len(images) + 1):
-            page = images[index - 1]
-            filename = f"{pdf_id}_page_{index}.png"
-            out_path = self.pages_output_dir / filename
-            page.save(out_path, format="PNG")
-            output_paths.append(str(out_path))
-        return output_paths
+        return [page_path for _, page_path in self.iter_pdf_pages(pdf_path, pdf_id)]
+
+    def iter_pdf_pages(self, pdf_path: str, pdf_id: str) -> Iterator[Tuple[int, str]]:
+        # Yields (page_num, image_path) in page order as soon as each page is
+        # written, so callers can hand page 1 off while later pages render.
+        # Each page is rasterized by its own single-threaded poppler process, so
+        # a thread pool is enough to keep every core busy.
+        page_count = self.get_pdf_page_count(pdf_path)
+        # Page sizes cost an extra pdfinfo run, so they are only read when a
+        # max_image_edge cap could apply.
+        if self.max_image_edge is None:
+            scales: List[Optional[int]] = [None] * page_count
+        else:
+            scales = [self._scale_to(side) for side in self._page_long_sides(pdf_path)]
+        workers = max(1, min(page_count, os.cpu_count() or 1))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(
+                    self._render_page,
+                    pdf_path,
+                    pdf_id,
+                    page_num,
+                    scales[page_num - 1],
+                )
+                for page_num in range(1, page_count + 1)
+            ]
+            for page_num, future in enumerate(futures, start=1):
+                yield page_num, future.result()
+        finally:
+            # Don't keep rendering pages nobody will consume if the caller
+            # stops early or a page fails.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _page_long_sides(self, pdf_path: str) -> Tuple[float, ...]:
+        stat = os.stat(pdf_path)
+        return _page_long_sides(os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
 
+    def _scale_to(self, long_side_pts: float) -> Optional[int]:
+        # poppler's -scale-to sets the long edge to exactly N px (and ignores
+        # the DPI), so it is only used to shrink pages that would come out
+        # larger than max_image_edge; smaller pages render at self.dpi.
+        if self.max_image_edge is None:
+            return None
+        if long_side_pts * self.dpi / _POINTS_PER_INCH <= self.max_image_edge:
+            return None
+        return self.max_image_edge
 
+    def _render_page(
+        self, pdf_path: str, pdf_id: str, page_num: int, scale_to: Optional[int] = None
+    ) -> str:
+        # poppler writes the image straight to its final name (-singlefile),
+        # already scaled down to scale_to (-scale-to) when given, so there is
+        # no PIL decode/resize/re-encode round-trip.
+        # Zero-padded so a plain lexical sort of the pages directory matches
+        # page order.
+        output_file = f"{pdf_id}_page_{page_num:04d}"
+        convert_from_path(
+            pdf_path,
+            dpi=self.dpi,
+            first_page=page_num,
+            last_page=page_num,
+            fmt=self.image_format,
+            jpegopt=_JPEG_OPTIONS if self.image_format == "jpeg" else None,
+            size=scale_to,
+            output_folder=str(self.pages_output_dir),
+            output_file=output_file,
+            single_file=True,
+            paths_only=True,
+            thread_count=1,
+        )
+        return str(self.pages_output_dir / f"{output_file}.{self._extension}")
@@ -1,17 +1,42 @@
 import uuid
-import json
+import os
 import sys
+import tempfile
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
 # Import dependencies (adjust paths as needed based on project structure)
+from src import fast_json
 from src.config import load_config, Config
-from src.queue_client import QueueClient
+from src.queue_client import QueueClient, UnsupportedEndpointError
 from src.pdf_processor import PDFProcessor
 
 
+# Maps queue_id -> pdf_id for every saved job so the aggregator can resolve a
+# queue without scanning all metadata files.
+METADATA_INDEX_FILENAME = "_index.json"
+
+# Held while the index is read, updated and replaced, so producers finishing
+# at the same time do not drop each other's entries.
+METADATA_INDEX_LOCK_FILENAME = "_index.json.lock"
+
+# Rendered pages are enqueued this many at a time through the bulk endpoint.
+# Small enough that workers still get the first pages while later ones render.
+ENQUEUE_BATCH_SIZE = 16
+
+# Requests kept in flight when the service has no bulk endpoint and tasks
+# are enqueued one at a time. Stays below QueueClient's connection pool size.
+ENQUEUE_CONCURRENCY = 8
+
+
 class PDFProducer:
     """
     PDFProducer handles PDF processing and task submission to the queue service.
@@ -32,17 +57,25 @@ class PDFProducer:
         
         # Initialize queue client with service URL from config
         self.queue_client = QueueClient(
-            base_url=self.config.queue_service.base_url
+            base_url=self.config.queue_service.base_url,
+            compress_requests=self.config.queue_service.compress_requests
         )
         
         # Initialize PDF processor with output directory from config
         self.pdf_processor = PDFProcessor(
-            pages_output_dir=self.config.storage.pages_dir
+            pages_output_dir=self.config.storage.pages_dir,
+            dpi=self.config.storage.image_dpi,
+            image_format=self.config.storage.image_format,
+            max_image_edge=self.config.storage.max_image_edge
         )
         
         # Ensure metadata directory exists
         self.metadata_dir = Path(self.config.storage.metadata_dir)
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Cleared the first time the service turns out not to offer bulk
+        # enqueue; tasks are then submitted one request at a time.
+        self._bulk_enqueue_supported = True
     
     def process_pdf(self, pdf_path: str, queue_name: str = None) -> str:
         """
@@ -52,9 +85,14 @@ class PDFProducer:
         1. Validates the PDF exists and is valid
         2. Generates a unique PDF ID
         3. Creates a queue in the task queue service
-        4. Splits the PDF into individual page images
-        5. Submits one task per page to the queue
-        6. Saves metadata for later aggregation
+        4. Renders the PDF into page images, submitting one task per page
+           to the queue as soon as that page's image is written
+        5. Saves metadata for later aggregation
+        
+        Tasks are enqueued while later pages still render. If rendering or
+        submission fails partway through, metadata covering the tasks that
+        were already enqueued is saved with ``"complete": false`` before the
+        error is re-raised, so the aggregator can still resolve the queue.
         
         Args:
             pdf_path: Path to the PDF file to process
@@ -80,8 +118,9 @@ class PDFProducer:
         total_pages = self.pdf_processor.get_pdf_page_count(str(pdf_file))
         print(f"PDF has {total_pages} pages")
         
-        # Step 2: Generate unique PDF ID
-        pdf_id = str(uuid.uuid4())
+        # Step 2: Generate unique PDF ID (32 hex chars, no dashes; only used
+        # client-side in file names and task params)
+        pdf_id = uuid.uuid4().hex
         
         # Step 3: Create queue via queue service API
         queue_name = queue_name or f"pdf-{pdf_id[:8]}"
@@ -89,96 +128,186 @@ class PDFProducer:
         queue_id = self.queue_client.create_queue(queue_name)
         print(f"Queue created with ID: {queue_id}")
         
-        # Step 4: Split PDF into page images
-        print(f"Converting PDF to images...")
+        # Step 4: Render pages and submit each one as soon as its image is on
+        # disk, so workers can start on page 1 while later pages still render.
+        print(f"Converting PDF to images and submitting tasks...")
+        task_ids = []
         try:
-            image_paths = self.pdf_processor.split_pdf_to_images(
-                pdf_path=str(pdf_file),
-                pdf_id=pdf_id
-            )
-        except Exception as e:
-            raise RuntimeError(f"Failed to convert PDF to images: {e}")
+            self._render_and_submit(pdf_file, pdf_id, queue_id, total_pages, task_ids)
+        except Exception:
+            if task_ids:
+                # These tasks are already in the queue; record them so the
+                # aggregator can still find the queue and collect them.
+                metadata_path = self._save_metadata(
+                    pdf_id=pdf_id,
+                    queue_id=queue_id,
+                    task_ids=task_ids,
+                    total_pages=total_pages,
+                    pdf_name=pdf_file.name,
+                    complete=False
+                )
+                print(f"Partial metadata for {len(task_ids)} submitted tasks saved to: "
+                      f"{metadata_path}")
+            raise
         
-        print(f"Generated {len(image_paths)} page images")
-
-        # Step 4.5: Validate conversion was complete and all images exist
-        print(f"Validating image files...")
+        print(f"✓ Submitted {len(task_ids)} tasks successfully")
+        
+        # Step 5: Save metadata for aggregator
+        metadata_path = self._save_metadata(
+            pdf_id=pdf_id,
+            queue_id=queue_id,
+            task_ids=task_ids,
+            total_pages=total_pages,
+            pdf_name=pdf_file.name
+        )
+        print(f"Metadata saved to: {metadata_path}")
+        
+        # Step 6: Return queue_id
+        return queue_id
+    
+    def _render_and_submit(
+        self,
+        pdf_file: Path,
+        pdf_id: str,
+        queue_id: str,
+        total_pages: int,
+        task_ids: List[str]
+    ) -> None:
+        """
+        Render every page and enqueue one task per page, appending task IDs
+        to ``task_ids`` as they are submitted.
+        
+        Raises:
+            RuntimeError: If rendering, image validation or submission fails;
+                ``task_ids`` then holds the tasks submitted before the failure
+        """
+        pending_tasks = []
+        
+        # Fields shared by every page's task, built once outside the loop.
+        # The PDF's name is recorded once in the job metadata rather than
+        # repeated in every task, since workers never read it.
+        base_params = {
+            "job": "generate_quiz",  # Job type identifier
+            "pdf_id": pdf_id
+        }
         
-        # Check 1: Verify we got the expected number of images
-        if len(image_paths) != total_pages:
+        for page_num, page_path in self._iter_rendered_pages(pdf_file, pdf_id):
+            # Validate the image exists before any worker is pointed at it
+            if not Path(page_path).exists():
+                raise RuntimeError(
+                    f"Image validation failed: page {page_num} of {total_pages} "
+                    f"is missing: {page_path}\n"
+                    f"PDF conversion failed. {len(task_ids)}/{total_pages} tasks were "
+                    f"submitted to queue {queue_id} before the failure."
+                )
+            
+            # Create task parameters
+            task_params = base_params.copy()
+            task_params["page_num"] = page_num
+            task_params["page_path"] = page_path
+            
+            # Priority = page number (earlier pages = higher priority)
+            pending_tasks.append((task_params, page_num))
+            if len(pending_tasks) >= ENQUEUE_BATCH_SIZE:
+                self._submit_tasks(queue_id, pending_tasks, task_ids, total_pages)
+                pending_tasks = []
+        
+        # Verify we got one image for every page before the last submission
+        rendered_pages = len(task_ids) + len(pending_tasks)
+        if rendered_pages != total_pages:
             raise RuntimeError(
                 f"PDF conversion incomplete: expected {total_pages} pages, "
-                f"but only {len(image_paths)} images were created. "
+                f"but only {rendered_pages} images were created. "
                 f"The PDF may be corrupted or conversion failed partway through."
             )
         
-        # Check 2: Verify each image file actually exists
-        missing_pages = []
-        for page_num, page_path in enumerate(image_paths, start=1):
-            if not Path(page_path).exists():
-                missing_pages.append((page_num, page_path))
-        
-        if missing_pages:
-            error_msg = f"Image validation failed: {len(missing_pages)} page(s) missing:\n"
-            # Show first 5 missing pages
-            for page_num, page_path in missing_pages[:5]:
-                error_msg += f"  - Page {page_num}: {page_path}\n"
-            if len(missing_pages) > 5:
-                error_msg += f"  ... and {len(missing_pages) - 5} more missing pages\n"
-            error_msg += "\nPDF conversion failed. No tasks will be submitted."
-            raise RuntimeError(error_msg)
-        
-        print(f" All {len(image_paths)} images validated successfully")
+        self._submit_tasks(queue_id, pending_tasks, task_ids, total_pages)
+    
+    def _submit_tasks(
+        self,
+        queue_id: str,
+        tasks: List[Tuple[dict, int]],
+        task_ids: List[str],
+        total_pages: int
+    ) -> None:
+        """
+        Enqueue ``tasks`` (params, priority pairs) and append their IDs to ``task_ids``.
         
+        Uses the bulk endpoint when the service offers it and falls back to
+        one request per task otherwise, with up to ENQUEUE_CONCURRENCY
+        requests in flight. Task IDs are appended in page order either way.
         
-        # Step 5: Submit tasks to queue
-        print(f"Submitting tasks to queue...")
-        task_ids = []
+        Raises:
+            RuntimeError: If submission fails; the message reports how many
+                tasks were submitted before the failure
+        """
+        if not tasks:
+            return
         
-        for page_num, page_path in enumerate(image_paths, start=1):
-            # Create task parameters
-            task_params = {
-                "job": "generate_quiz",  # Job type identifier
-                "pdf_id": pdf_id,
-                "page_num": page_num,
-                "page_path": page_path,
-                "pdf_name": pdf_file.name
-            }
-            
-            # Submit task with priority (earlier pages = higher priority)
+        if self._bulk_enqueue_supported:
             try:
-                task_id = self.queue_client.enqueue_task(
+                task_ids.extend(self.queue_client.enqueue_tasks_bulk(queue_id, tasks))
+            except UnsupportedEndpointError:
+                self._bulk_enqueue_supported = False
+            except Exception as e:
+                first_page, last_page = tasks[0][1], tasks[-1][1]
+                raise RuntimeError(
+                    f"Failed to submit tasks for pages {first_page}-{last_page} "
+                    f"after validation: {e}. "
+                    f"Successfully submitted {len(task_ids)}/{total_pages} tasks before failure."
+                ) from e
+            else:
+                print(f"  Submitted {len(task_ids)}/{total_pages} tasks")
+                return
+        
+        workers = min(ENQUEUE_CONCURRENCY, len(tasks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.queue_client.enqueue_task,
                     queue_id=queue_id,
                     params=task_params,
                     priority=page_num
                 )
-                task_ids.append(task_id)
+                for task_params, page_num in tasks
+            ]
+            for index, ((task_params, page_num), future) in enumerate(zip(tasks, futures)):
+                try:
+                    task_ids.append(future.result())
+                except Exception as e:
+                    for pending in futures:
+                        pending.cancel()
+                    submitted = len(task_ids)
+                    # Requests already in flight may still succeed; keep their
+                    # IDs so partial metadata covers every enqueued task.
+                    task_ids.extend(
+                        later.result() for later in futures[index + 1:]
+                        if not later.cancelled() and later.exception() is None
+                    )
+                    # Task submission failure is critical once the page is rendered
+                    raise RuntimeError(
+                        f"Failed to submit task for page {page_num} after validation: {e}. "
+                        f"Successfully submitted {submitted}/{total_pages} tasks before failure."
+                    ) from e
                 
                 # Progress indicator
                 if page_num % 10 == 0 or page_num == total_pages:
                     print(f"  Submitted {page_num}/{total_pages} tasks")
-                    
-            except Exception as e:
-                # Task submission failure is critical after validation passes
-                raise RuntimeError(
-                    f"Failed to submit task for page {page_num} after validation: {e}. "
-                    f"Successfully submitted {len(task_ids)}/{total_pages} tasks before failure."
-                ) from e
-        
-        print(f"✓ Submitted {len(task_ids)} tasks successfully")
-        
-        # Step 6: Save metadata for aggregator
-        metadata_path = self._save_metadata(
-            pdf_id=pdf_id,
-            queue_id=queue_id,
-            task_ids=task_ids,
-            total_pages=total_pages,
-            pdf_name=pdf_file.name
-        )
-        print(f"Metadata saved to: {metadata_path}")
+    
+    def _iter_rendered_pages(self, pdf_file: Path, pdf_id: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_num, image_path) pairs as PDFProcessor renders them.
         
-        # Step 7: Return queue_id
-        return queue_id
+        Rendering errors are re-raised as RuntimeError; errors raised by the
+        caller's loop body are not affected.
+        """
+        try:
+            yield from self.pdf_processor.iter_pdf_pages(
+                pdf_path=str(pdf_file),
+                pdf_id=pdf_id
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to convert PDF to images: {e}") from e
     
     def _save_metadata(
         self, 
@@ -186,7 +315,8 @@ class PDFProducer:
         queue_id: str, 
         task_ids: List[str], 
         total_pages: int,
-        pdf_name: str
+        pdf_name: str,
+        complete: bool = True
     ) -> Path:
         """
         Save job metadata for aggregator to use later.
@@ -197,6 +327,8 @@ class PDFProducer:
             task_ids: List of all task IDs submitted
             total_pages: Total number of pages in the PDF
             pdf_name: Original PDF filename
+            complete: False when submission stopped partway, so
+                ``task_ids`` covers only some of the pages
         
         Returns:
             Path: Path to the saved metadata file
@@ -207,17 +339,66 @@ class PDFProducer:
             "pdf_name": pdf_name,
             "total_pages": total_pages,
             "task_ids": task_ids,
+            "complete": complete,
             "created_at": datetime.now().isoformat()
         }
         
         # Save to metadata directory
         metadata_path = self.metadata_dir / f"{pdf_id}_metadata.json"
         
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # Serialized in one pass and written with a single write() call
+        metadata_path.write_bytes(fast_json.dumps(metadata, indent=True))
+        
+        self._update_metadata_index(queue_id, pdf_id)
         
         return metadata_path
     
+    def _update_metadata_index(self, queue_id: str, pdf_id: str) -> None:
+        """
+        Record queue_id -> pdf_id in the metadata index.
+        
+        The index is rewritten to a temporary file and renamed into place so
+        readers never observe a partially written file. Writers take an
+        exclusive lock on a sibling lock file (where ``fcntl`` is available)
+        for the whole read-modify-write, so concurrent producers do not
+        overwrite each other's entries. An unreadable index is rebuilt from
+        this entry; the aggregator falls back to scanning metadata files for
+        any queue the index does not know about.
+        
+        Args:
+            queue_id: Queue ID where tasks were submitted
+            pdf_id: Unique PDF identifier
+        """
+        index_path = self.metadata_dir / METADATA_INDEX_FILENAME
+        
+        with open(self.metadata_dir / METADATA_INDEX_LOCK_FILENAME, 'a') as lock_file:
+            if fcntl is not None:
+                # Released when the lock file is closed.
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            
+            try:
+                index = fast_json.load_path(index_path)
+                if not isinstance(index, dict):
+                    index = {}
+            except (OSError, ValueError):
+                index = {}
+            
+            index[queue_id] = pdf_id
+            
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.metadata_dir, prefix=".index-", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(fast_json.dumps(index))
+                # mkstemp creates the file 0600; keep the index readable like
+                # the metadata files it points at.
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, index_path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+    
     def _validate_pdf_path(self, pdf_path: str) -> Path:
         """
         Validate that PDF file exists.
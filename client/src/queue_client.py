@@ -7,9 +7,16 @@ Class: QueueClient
     
     Fields:
         - base_url: str (e.g., "http://localhost:8080")
+        - status_ttl_ms: int (0 disables status caching)
+        - compress_requests: bool (gzip request bodies of 4 KB or more)
     Methods:
-        - __init__(base_url: str)
-            Initialize the client with queue service URL
+        - __init__(base_url: str, status_ttl_ms: int = 0, compress_requests: bool = False)
+            Initialize the client with queue service URL and pooled
+            keep-alive HTTP sessions (dequeue calls get one without retries
+            after the request was sent)
+        
+        - close() -> None
+            Close the pooled HTTP sessions (also on leaving a ``with`` block)
         
         - create_queue(name: str) -> UUID
             POST /queue
@@ -19,11 +26,22 @@ Class: QueueClient
             POST /queue/{id}/task
             Submit a task to the queue, return task ID
         
+        - enqueue_tasks_bulk(queue_id: UUID, tasks: list, chunk_size: int) -> list
+            POST /queue/{id}/tasks:batch
+            Submit many (params, priority) tasks in one request per chunk,
+            return task IDs in submission order
+            Raises UnsupportedEndpointError if the service has no batch endpoint
+        
         - dequeue_task(queue_id: UUID) -> Optional[dict]
             GET /queue/{id}/task
             Dequeue next highest priority task
             Returns None if queue is empty (HTTP 204)
         
+        - dequeue_tasks(queue_id: UUID, max_tasks: int, wait_ms: int) -> list
+            GET /queue/{id}/tasks?max=N&waitMs=W
+            Dequeue up to max_tasks tasks, long-polling up to wait_ms if empty
+            Raises UnsupportedEndpointError if the service has no batch dequeue
+        
         - submit_result(queue_id: UUID, task_id: UUID, output: str, status: str) -> None
             POST /queue/{id}/result
             Submit a result for a completed task
@@ -38,13 +56,24 @@ Class: QueueClient
             GET /queue/{id}/status
             Get queue status (pending tasks, completed results)
             Returns: {pendingTaskCount, completedResultCount, hasPendingTasks}
+            Responses are reused for status_ttl_ms when caching is enabled
+        
+        - stream_completion(queue_id: UUID) -> Iterator[dict]
+            GET /queue/{id}/events (text/event-stream)
+            Yield queue status dicts as the service pushes them
+            Raises UnsupportedEndpointError if the service has no event stream
+        
+        - get_results_batch(queue_id: UUID, task_ids: list, page_size: int) -> dict
+            POST /queue/{id}/results:batchGet
+            Fetch many results in one request per page of task IDs
+            Returns: {results: [...], missing: [...]}
         
         - _handle_error(response: Response) -> None
             Helper method for error handling
 
 Dependencies:
     - requests
-    - json
+    - fast_json (orjson when installed)
     - uuid
 
 Testing:
@@ -54,10 +83,24 @@ Testing:
 
     AI assistance used for: Preliminary structure/design, error handling patterns.
 """
-import json
-from typing import Optional, Dict, Any
+import gzip
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src import fast_json
+
+# Request bodies are serialized with fast_json and sent as raw bytes, so
+# requests does not run its own json.dumps over them a second time.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_GZIP_JSON_HEADERS = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+# Smaller bodies fit in a packet or two; compressing them only costs CPU.
+_GZIP_MIN_BYTES = 4096
 
 
 class QueueClientError(Exception):
@@ -72,15 +115,92 @@ class InvalidRequestError(QueueClientError):
     """Raised when request is invalid (HTTP 400)."""
 
 
+class UnsupportedEndpointError(QueueClientError):
+    """Raised when the service does not offer an optional endpoint (HTTP 404/405/501)."""
+
+
+# Error statuses shared by the queue-scoped endpoints, mapped to the exception
+# they raise and its message template (filled with the queue ID for 404 and
+# the service's error message for 400).
+_STATUS_ERRORS = {
+    400: (InvalidRequestError, "Invalid: %s"),
+    404: (QueueNotFoundError, "Queue not found: %s"),
+}
+
+
+def _pooled_session(retries: Retry) -> requests.Session:
+    """Create a keep-alive session whose HTTP(S) adapter applies ``retries``."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 class QueueClient:
     """Client for Queue Service REST API."""
 
-    def __init__(self, base_url: str):
-        """Initialize client with service URL."""
+    def __init__(self, base_url: str, status_ttl_ms: int = 0, compress_requests: bool = False):
+        """
+        Initialize client with service URL.
+
+        status_ttl_ms > 0 lets get_queue_status reuse a response for that
+        long. Leave it at 0 where fresh counts matter (e.g. completion checks).
+
+        compress_requests gzips request bodies of at least 4 KB (e.g. bulk
+        enqueue). Only enable it against services that accept
+        ``Content-Encoding: gzip`` request bodies.
+        """
         if not base_url:
             raise ValueError("base_url cannot be empty")
         self.base_url = base_url.rstrip('/')
         self.timeout = 30
+        self.stream_read_timeout = 120
+        self.status_ttl_ms = status_ttl_ms
+        self.compress_requests = compress_requests
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._status_cache_lock = threading.Lock()
+
+        # One keep-alive session for every call so repeated requests reuse
+        # pooled TCP connections instead of reconnecting each time. Read
+        # errors are never retried: the request may already have been
+        # handled. 502/503/504 are retried for idempotent methods only.
+        self._session = _pooled_session(
+            Retry(total=3, read=0, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        # Dequeue GETs mark tasks IN_PROGRESS and the service has no lease
+        # expiry, so a retry after the server acted would strand tasks (and
+        # repeat the long-poll wait). Only refused connections are retried.
+        self._dequeue_session = _pooled_session(
+            Retry(total=3, read=0, status=0, backoff_factor=0.1)
+        )
+
+    def _post_json(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """POST ``payload`` as a JSON body through the pooled session."""
+        body = fast_json.dumps(payload)
+        headers = _JSON_HEADERS
+        if self.compress_requests and len(body) >= _GZIP_MIN_BYTES:
+            # Level 1: JSON still shrinks several-fold at a fraction of the CPU.
+            body = gzip.compress(body, compresslevel=1)
+            headers = _GZIP_JSON_HEADERS
+        return self._session.post(url, data=body, headers=headers, timeout=self.timeout)
+
+    def close(self) -> None:
+        """Close the pooled HTTP sessions."""
+        self._session.close()
+        self._dequeue_session.close()
+
+    def __enter__(self) -> "QueueClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __del__(self):
+        for name in ("_session", "_dequeue_session"):
+            session = getattr(self, name, None)
+            if session is not None:
+                session.close()
 
     def create_queue(self, name: str) -> str:
         """Create queue. Returns queue ID."""
@@ -88,63 +208,118 @@ class QueueClient:
         payload = {"name": name}
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self._post_json(url, payload)
             if response.status_code == 400:
                 raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
             response.raise_for_status()
-            return response.json()['id']
+            return self._parse_json(response)['id']
         except requests.RequestException as e:
             raise QueueClientError(f"Failed to create queue: {e}") from e
 
     def enqueue_task(self, queue_id: str, params: Dict[str, Any], priority: int) -> str:
         """Submit task to queue. Returns task ID."""
         url = f"{self.base_url}/queue/{queue_id}/task"
-        payload = {"params": json.dumps(params), "priority": priority}
+        payload = {"params": fast_json.dumps(params).decode("utf-8"), "priority": priority}
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
-            if response.status_code == 404:
-                raise QueueNotFoundError(f"Queue not found: {queue_id}")
-            if response.status_code == 400:
-                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
-            response.raise_for_status()
-            return response.json()['id']
+            response = self._post_json(url, payload)
+            self._raise_for_status(response, queue_id)
+            return self._parse_json(response)['id']
         except requests.RequestException as e:
             if isinstance(e, (QueueNotFoundError, InvalidRequestError)):
                 raise
             raise QueueClientError(f"Failed to enqueue: {e}") from e
 
+    def enqueue_tasks_bulk(
+        self,
+        queue_id: str,
+        tasks: List[Tuple[Dict[str, Any], int]],
+        chunk_size: int = 128,
+    ) -> List[str]:
+        """
+        Submit many tasks, one request per ``chunk_size`` (params, priority) pairs.
+
+        Returns the task IDs in the order the tasks were given. Chunks are sent
+        in order, so if one fails every earlier chunk has already been
+        enqueued. Raises UnsupportedEndpointError if the service has no batch
+        endpoint.
+        """
+        url = f"{self.base_url}/queue/{queue_id}/tasks:batch"
+        task_ids: List[str] = []
+
+        for start in range(0, len(tasks), chunk_size):
+            payload = {
+                "tasks": [
+                    {"params": fast_json.dumps(params).decode("utf-8"), "priority": priority}
+                    for params, priority in tasks[start:start + chunk_size]
+                ]
+            }
+            try:
+                response = self._post_json(url, payload)
+                if response.status_code in (404, 405, 501):
+                    raise UnsupportedEndpointError(
+                        f"Batch enqueue unavailable for queue {queue_id} "
+                        f"(HTTP {response.status_code})"
+                    )
+                self._raise_for_status(response, queue_id)
+                task_ids.extend(self._parse_json(response)['taskIds'])
+            except requests.RequestException as e:
+                raise QueueClientError(f"Failed to enqueue tasks: {e}") from e
+
+        return task_ids
+
     def dequeue_task(self, queue_id: str) -> Optional[Dict[str, Any]]:
         """Get next task from queue. Returns None if empty."""
         url = f"{self.base_url}/queue/{queue_id}/task"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self._dequeue_session.get(url, timeout=self.timeout)
             if response.status_code == 204:
                 return None
-            if response.status_code == 404:
-                raise QueueNotFoundError(f"Queue not found: {queue_id}")
-            if response.status_code == 400:
-                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
-            response.raise_for_status()
-            return response.json()
+            self._raise_for_status(response, queue_id)
+            return self._parse_json(response)
         except requests.RequestException as e:
             if isinstance(e, (QueueNotFoundError, InvalidRequestError)):
                 raise
             raise QueueClientError(f"Failed to dequeue: {e}") from e
 
+    def dequeue_tasks(
+        self, queue_id: str, max_tasks: int = 1, wait_ms: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Get up to ``max_tasks`` tasks in one request.
+
+        If the queue is empty the service holds the request for up to
+        ``wait_ms`` milliseconds waiting for a task, so an idle worker is
+        woken as soon as work arrives instead of on its next poll. Returns an
+        empty list if nothing arrived in time. Raises UnsupportedEndpointError
+        if the service has no batch dequeue endpoint.
+        """
+        url = f"{self.base_url}/queue/{queue_id}/tasks"
+        params = {"max": max_tasks, "waitMs": wait_ms}
+        # The read timeout has to outlast the server-side wait.
+        timeout = (self.timeout, self.timeout + wait_ms / 1000)
+
+        try:
+            response = self._dequeue_session.get(url, params=params, timeout=timeout)
+            if response.status_code in (404, 405, 501):
+                raise UnsupportedEndpointError(
+                    f"Batch dequeue unavailable for queue {queue_id} "
+                    f"(HTTP {response.status_code})"
+                )
+            self._raise_for_status(response, queue_id)
+            return self._parse_json(response)
+        except requests.RequestException as e:
+            raise QueueClientError(f"Failed to dequeue tasks: {e}") from e
+
     def submit_result(self, queue_id: str, task_id: str, output: str, status: str) -> None:
         """Submit result for completed task. Status: SUCCESS or FAILURE."""
         url = f"{self.base_url}/queue/{queue_id}/result"
         payload = {"taskId": task_id, "output": output, "status": status}
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
-            if response.status_code == 404:
-                raise QueueNotFoundError(f"Queue not found: {queue_id}")
-            if response.status_code == 400:
-                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
-            response.raise_for_status()
+            response = self._post_json(url, payload)
+            self._raise_for_status(response, queue_id)
         except requests.RequestException as e:
             if isinstance(e, (QueueNotFoundError, InvalidRequestError)):
                 raise
@@ -155,35 +330,120 @@ class QueueClient:
         url = f"{self.base_url}/queue/{queue_id}/result/{task_id}"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self._session.get(url, timeout=self.timeout)
             if response.status_code == 404:
                 return None
-            if response.status_code == 400:
-                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
-            response.raise_for_status()
-            return response.json()
+            self._raise_for_status(response, queue_id)
+            return self._parse_json(response)
         except requests.RequestException as e:
             if isinstance(e, (QueueNotFoundError, InvalidRequestError)):
                 raise
             raise QueueClientError(f"Failed to get result: {e}") from e
 
+    def get_results_batch(
+        self, queue_id: str, task_ids: List[str], page_size: int = 100
+    ) -> Dict[str, List[Any]]:
+        """
+        Get results for many tasks, one request per ``page_size`` task IDs.
+
+        Returns {"results": [...], "missing": [...]} merged across pages, where
+        ``missing`` lists task IDs that have no stored result. Raises
+        UnsupportedEndpointError if the service has no batch endpoint.
+        """
+        url = f"{self.base_url}/queue/{queue_id}/results:batchGet"
+        merged: Dict[str, List[Any]] = {"results": [], "missing": []}
+
+        for start in range(0, len(task_ids), page_size):
+            payload = {"taskIds": task_ids[start:start + page_size]}
+            try:
+                response = self._post_json(url, payload)
+                if response.status_code in (404, 405, 501):
+                    raise UnsupportedEndpointError(
+                        f"Batch results unavailable for queue {queue_id} "
+                        f"(HTTP {response.status_code})"
+                    )
+                self._raise_for_status(response, queue_id)
+                data = self._parse_json(response)
+            except requests.RequestException as e:
+                raise QueueClientError(f"Failed to get results: {e}") from e
+
+            merged["results"].extend(data.get("results") or [])
+            merged["missing"].extend(data.get("missing") or [])
+
+        return merged
+
     def get_queue_status(self, queue_id: str) -> Dict[str, Any]:
-        """Get queue status with task counts."""
+        """Get queue status with task counts (cached for status_ttl_ms if enabled)."""
+        if self.status_ttl_ms > 0:
+            with self._status_cache_lock:
+                cached = self._status_cache.get(queue_id)
+            if cached and (time.monotonic() - cached[0]) * 1000 < self.status_ttl_ms:
+                return dict(cached[1])
+
         url = f"{self.base_url}/queue/{queue_id}/status"
 
         try:
-            response = requests.get(url, timeout=self.timeout)
-            if response.status_code == 404:
-                raise QueueNotFoundError(f"Queue not found: {queue_id}")
-            if response.status_code == 400:
-                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
-            response.raise_for_status()
-            return response.json()
+            response = self._session.get(url, timeout=self.timeout)
+            self._raise_for_status(response, queue_id)
+            status = self._parse_json(response)
         except requests.RequestException as e:
             if isinstance(e, (QueueNotFoundError, InvalidRequestError)):
                 raise
             raise QueueClientError(f"Failed to get status: {e}") from e
 
+        if self.status_ttl_ms > 0:
+            # Stamp after the response arrives so slow requests don't shorten the TTL.
+            with self._status_cache_lock:
+                self._status_cache[queue_id] = (time.monotonic(), dict(status))
+        return status
+
+    def stream_completion(self, queue_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Subscribe to queue status events. Yields each status dict as it arrives.
+
+        The service sends the current status on subscribe and again after every
+        submitted result, so callers can wait for completion without polling.
+        A 404/405/501 response means the event stream is unavailable (older
+        service or unknown queue) and raises UnsupportedEndpointError.
+        """
+        url = f"{self.base_url}/queue/{queue_id}/events"
+        headers = {"Accept": "text/event-stream"}
+
+        try:
+            response = self._session.get(
+                url,
+                headers=headers,
+                stream=True,
+                timeout=(self.timeout, self.stream_read_timeout),
+            )
+        except requests.RequestException as e:
+            raise QueueClientError(f"Failed to open event stream: {e}") from e
+
+        with response:
+            if response.status_code in (404, 405, 501):
+                raise UnsupportedEndpointError(
+                    f"Event stream unavailable for queue {queue_id} "
+                    f"(HTTP {response.status_code})"
+                )
+            if response.status_code == 400:
+                raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
+
+            try:
+                response.raise_for_status()
+                data_lines = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        if line.startswith("data:"):
+                            data_lines.append(line[5:].lstrip())
+                        continue
+                    # A blank line terminates one event.
+                    if data_lines:
+                        payload = "\n".join(data_lines)
+                        data_lines = []
+                        yield fast_json.loads(payload)
+            except (requests.RequestException, ValueError) as e:
+                raise QueueClientError(f"Event stream failed: {e}") from e
+
     def clear_all_queues(self) -> Dict[str, Any]:
         """
         Clear all queues from the service (DESTRUCTIVE - admin only).
@@ -198,18 +458,42 @@ class QueueClient:
         url = f"{self.base_url}/queue/admin/clear"
 
         try:
-            response = requests.delete(url, timeout=self.timeout)
+            response = self._session.delete(url, timeout=self.timeout)
             if response.status_code == 400:
                 raise InvalidRequestError(f"Invalid: {self._extract_error(response)}")
             response.raise_for_status()
-            return response.json()
+            return self._parse_json(response)
         except requests.RequestException as e:
             raise QueueClientError(f"Failed to clear queues: {e}") from e
 
+    def _raise_for_status(self, response: requests.Response, queue_id: str) -> None:
+        """Raise the mapped QueueClient error for 400/404, else requests' HTTPError."""
+        mapped = _STATUS_ERRORS.get(response.status_code)
+        if mapped is not None:
+            exc_type, template = mapped
+            detail = self._extract_error(response) if exc_type is InvalidRequestError else queue_id
+            raise exc_type(template % detail)
+        response.raise_for_status()
+
+    @staticmethod
+    def _parse_json(response: requests.Response) -> Any:
+        """
+        Decode a JSON response body with fast_json (orjson when installed).
+
+        A body that is not JSON (e.g. a proxy's HTML error page sent with
+        200) raises QueueClientError, like other failed calls.
+        """
+        try:
+            return fast_json.loads(response.content)
+        except ValueError as e:
+            raise QueueClientError(
+                f"Invalid JSON in response (HTTP {response.status_code}): {e}"
+            ) from e
+
     def _extract_error(self, response: requests.Response) -> str:
         """Extract error message from response."""
         try:
-            data = response.json()
+            data = self._parse_json(response)
             return data.get('message', data.get('error', response.text))
-        except (json.JSONDecodeError, ValueError):
+        except QueueClientError:
             return response.text or response.reason
\ No newline at end of file
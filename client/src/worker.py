@@ -13,19 +13,29 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
+from src import fast_json
 from src.config import Config, load_config
-from src.llm_service import LLMService, LLMServiceError
-from src.queue_client import QueueClient, QueueClientError
+from src.llm_service import LLMService, LLMServiceConfig, LLMServiceError
+from src.queue_client import QueueClient, QueueClientError, UnsupportedEndpointError
 
 logger = logging.getLogger(__name__)
 
+# Result submissions that may be in flight while the worker generates the
+# next page. Each waits on one HTTP round-trip, so a few threads suffice.
+_SUBMIT_WORKERS = 4
+
 
 class QuizWorker:
     """
@@ -33,7 +43,8 @@ class QuizWorker:
 
     Each worker instance:
 
-    - Polls ``GET /queue/{id}/task`` for new tasks.
+    - Long-polls ``GET /queue/{id}/tasks`` for new tasks, falling back to
+      polling ``GET /queue/{id}/task`` on services without batch dequeue.
     - For each task, reads the page image path from the task params.
     - Uses :class:`LLMService` to generate quiz questions.
     - Writes the questions to a JSON file in the configured results directory.
@@ -53,11 +64,15 @@ class QuizWorker:
 
         self.config: Config = load_config(config_path)
         self.queue_client = QueueClient(self.config.queue_service.base_url)
-        self.llm_service = LLMService(
-            provider=self.config.llm.provider,
-            api_key=self.config.llm.api_key,
-            model=self.config.llm.model,
-            max_questions=self.config.llm.max_questions_per_page,
+        self.llm_service = LLMService.get_instance(
+            LLMServiceConfig(
+                provider=self.config.llm.provider,
+                api_key=self.config.llm.api_key,
+                model=self.config.llm.model,
+                max_questions=self.config.llm.max_questions_per_page,
+                cache_dir=self.config.llm.cache_dir,
+                structured_output=self.config.llm.structured_output,
+            )
         )
 
         self.results_dir = Path(self.config.storage.results_dir)
@@ -66,6 +81,18 @@ class QuizWorker:
         self.poll_interval = self.config.worker.poll_interval
         self.max_retries = self.config.worker.max_retries
         self.retry_backoff = self.config.worker.retry_backoff
+        self.dequeue_batch_size = self.config.worker.dequeue_batch_size
+        self.dequeue_wait_ms = self.config.worker.dequeue_wait_ms
+        # Background threads that report SUCCESS results while this thread
+        # moves on to the next page.
+        self._submit_pool = ThreadPoolExecutor(
+            max_workers=_SUBMIT_WORKERS, thread_name_prefix=f"{self.worker_id}-submit"
+        )
+        # Set on shutdown to stop every consumer thread started by run().
+        self._stop = threading.Event()
+        # Cleared the first time the service turns out not to offer batch
+        # dequeue; the worker then polls one task at a time.
+        self._batch_dequeue_supported = True
 
         logger.info(
             "Initialized %s for queue_id=%s (results_dir=%s, provider=%s)",
@@ -78,51 +105,162 @@ class QuizWorker:
     # ------------------------------------------------------------------
     # Main loop
     # ------------------------------------------------------------------
-    def run(self) -> None:
+    def run(self, concurrency: int = 1) -> None:
         """
         Main worker loop.
 
-        Continuously polls the queue for new tasks until interrupted. When a
-        task is received, it is processed immediately; when the queue is empty,
-        the worker waits ``poll_interval`` seconds before polling again.
+        Continuously polls the queue for new tasks until interrupted. Tasks
+        are pulled up to ``dequeue_batch_size`` at a time and processed in
+        order. An empty poll is held open by the service for up to
+        ``dequeue_wait_ms``; without long polling the worker instead waits
+        ``poll_interval`` seconds before polling again.
+
+        With ``concurrency > 1``, that many consumer threads poll the same
+        queue, sharing this worker's HTTP sessions, LLM service and result
+        submission pool. Page work is IO-bound (LLM and queue service
+        round-trips), so threads scale like separate worker processes
+        without duplicating their memory.
         """
-        logger.info("%s starting main loop", self.worker_id)
-        is_idle = False  # Track idle state
+        logger.info("%s starting main loop (concurrency=%d)", self.worker_id, concurrency)
+        consumers = [
+            threading.Thread(
+                target=self._consume,
+                name=f"{self.worker_id}-{n}",
+                daemon=True,
+            )
+            for n in range(1, concurrency)
+        ]
+        for consumer in consumers:
+            consumer.start()
         
         try:
-            while True:
-                try:
-                    task = self.queue_client.dequeue_task(self.queue_id)
-                except QueueClientError as exc:
-                    logger.error(
-                        "%s failed to dequeue task from queue %s: %s",
-                        self.worker_id,
-                        self.queue_id,
-                        exc,
-                    )
-                    time.sleep(self.poll_interval)
-                    continue
-
-                if task is None:
-                    # Only log when transitioning to idle state
-                    if not is_idle:
-                        logger.info("Waiting for tasks... (no tasks available)")
-                        is_idle = True
-                    time.sleep(self.poll_interval)
-                    continue
-
-                # Back to working state
-                if is_idle:
-                    logger.info("Task received, resuming processing")
-                    is_idle = False
-                
-                self._process_task(task)
+            self._consume()
         except KeyboardInterrupt:
             logger.info("%s received KeyboardInterrupt, shutting down cleanly", self.worker_id)
+        finally:
+            self._stop.set()
+            for consumer in consumers:
+                consumer.join()
+            # Let in-flight result submissions finish before exiting.
+            self._submit_pool.shutdown(wait=True)
+            self.queue_client.close()
+
+    def _consume(self) -> None:
+        """Poll and process tasks until :attr:`_stop` is set."""
+        is_idle = False  # Track idle state
+        
+        while not self._stop.is_set():
+            try:
+                tasks = self._dequeue_tasks()
+            except QueueClientError as exc:
+                logger.error(
+                    "%s failed to dequeue task from queue %s: %s",
+                    self.worker_id,
+                    self.queue_id,
+                    exc,
+                )
+                self._stop.wait(self.poll_interval)
+                continue
+
+            if not tasks:
+                # Only log when transitioning to idle state
+                if not is_idle:
+                    logger.info("Waiting for tasks... (no tasks available)")
+                    is_idle = True
+                # A long poll has already waited server-side
+                if not (self._batch_dequeue_supported and self.dequeue_wait_ms > 0):
+                    self._stop.wait(self.poll_interval)
+                continue
+
+            # Back to working state
+            if is_idle:
+                logger.info("Task received, resuming processing")
+                is_idle = False
+            
+            self._process_tasks(tasks)
+
+    def _dequeue_tasks(self) -> List[Dict[str, Any]]:
+        """
+        Pull the next tasks, using batch dequeue with long polling when the
+        service offers it and single-task dequeue otherwise.
+        """
+        if self._batch_dequeue_supported:
+            try:
+                return self.queue_client.dequeue_tasks(
+                    self.queue_id,
+                    max_tasks=self.dequeue_batch_size,
+                    wait_ms=self.dequeue_wait_ms,
+                )
+            except UnsupportedEndpointError:
+                logger.info(
+                    "%s: batch dequeue unavailable, polling one task at a time",
+                    self.worker_id,
+                )
+                self._batch_dequeue_supported = False
+
+        task = self.queue_client.dequeue_task(self.queue_id)
+        return [task] if task is not None else []
 
     # ------------------------------------------------------------------
     # Task handling
     # ------------------------------------------------------------------
+    def _process_tasks(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Handle a batch of tasks pulled in one dequeue.
+
+        Pages are sent to the LLM together via
+        :meth:`LLMService.generate_quiz_from_images_batched`, which packs
+        several page images into each request. The call reports an outcome per
+        page, so only pages that failed go back through the usual per-task
+        path with its own retries and the answered pages are not paid for
+        twice. If the batched call itself raises, every page takes that path.
+        Pages may be processed in a different order than they were dequeued.
+        """
+        if len(tasks) == 1:
+            self._process_task(tasks[0])
+            return
+
+        pages = [page for page in map(self._parse_task, tasks) if page is not None]
+        if not pages:
+            return
+        # Consecutive pages share a multi-page request, so ordering by image
+        # size groups pages of similar cost and keeps a dense diagram page
+        # from holding back a request full of light text pages.
+        pages.sort(key=lambda page: _image_size(page[3]))
+
+        logger.info(
+            "[%s] Processing %d pages in one batch: %s",
+            self.worker_id,
+            len(pages),
+            ", ".join(str(page_num) for _, _, page_num, _ in pages),
+        )
+        try:
+            results = self.llm_service.generate_quiz_from_images_batched(
+                [(page_path, page_num) for _, _, page_num, page_path in pages],
+                return_exceptions=True,
+            )
+        except Exception as exc:
+            logger.warning(
+                "[%s] Batched generation failed, retrying %d pages individually: %s",
+                self.worker_id,
+                len(pages),
+                exc,
+            )
+            results = [None] * len(pages)
+
+        for page, outcome in zip(pages, results):
+            if isinstance(outcome, Exception):
+                logger.warning(
+                    "[%s] Batched generation failed for task %s (page %s), "
+                    "retrying individually: %s",
+                    self.worker_id,
+                    page[0],
+                    page[2],
+                    outcome,
+                )
+                outcome = None
+            self._run_task(*page, questions=outcome)
+
     def _process_task(self, task: Dict[str, Any]) -> None:
         """
         Handle a single task from the queue.
@@ -134,19 +272,31 @@ class QuizWorker:
             {
               "id": "<task-uuid>",
               "params": "{\"job\":\"generate_quiz\",\"pdf_id\":\"...\",\"page_num\":1,"
-                        "\"page_path\":\"storage/pages/...png\",\"pdf_name\":\"...\"}",
+                        "\"page_path\":\"storage/pages/...jpg\"}",
               "priority": 1,
               "status": "IN_PROGRESS"
             }
         """
+        page = self._parse_task(task)
+        if page is not None:
+            self._run_task(*page)
+
+    def _parse_task(self, task: Dict[str, Any]) -> Optional[Tuple[str, str, int, str]]:
+        """
+        Validate a task and extract ``(task_id, pdf_id, page_num, page_path)``.
+
+        Malformed tasks are logged and, where they have an ID, marked as
+        FAILURE from the submission pool so the consumer moves straight on;
+        ``None`` is returned for them.
+        """
         task_id = task.get("id")
         raw_params = task.get("params")
         if not task_id or raw_params is None:
             logger.error("%s received malformed task: %s", self.worker_id, task)
-            return
+            return None
 
         try:
-            params = json.loads(raw_params)
+            params = fast_json.loads(raw_params)
         except json.JSONDecodeError:
             logger.error(
                 "%s could not decode task params for task %s: %s",
@@ -155,8 +305,17 @@ class QuizWorker:
                 raw_params,
             )
             # Attempt to mark as failure with a simple message.
-            self._submit_failure(task_id, "Invalid task params JSON")
-            return
+            self._submit_pool.submit(self._submit_failure, task_id, "Invalid task params JSON")
+            return None
+        if not isinstance(params, dict):
+            logger.error(
+                "%s task %s params are not a JSON object: %s",
+                self.worker_id,
+                task_id,
+                raw_params,
+            )
+            self._submit_pool.submit(self._submit_failure, task_id, "Invalid task params JSON")
+            return None
 
         pdf_id = params.get("pdf_id")
         page_num = params.get("page_num")
@@ -171,10 +330,26 @@ class QuizWorker:
                 page_num,
                 page_path,
             )
-            self._submit_failure(task_id, "Missing required task parameters")
-            return
+            self._submit_pool.submit(
+                self._submit_failure, task_id, "Missing required task parameters"
+            )
+            return None
 
-        logger.info(
+        return task_id, pdf_id, page_num, page_path
+
+    def _run_task(
+        self,
+        task_id: str,
+        pdf_id: str,
+        page_num: int,
+        page_path: str,
+        questions: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """
+        Generate (unless ``questions`` is given) and save one page, then hand
+        its SUCCESS result to the background submission pool.
+        """
+        logger.debug(
             "[%s] Processing task=%s pdf_id=%s page_num=%s image=%s",
             self.worker_id,
             task_id,
@@ -183,66 +358,90 @@ class QuizWorker:
             os.path.basename(page_path),
         )
 
-        # Retry logic for transient failures (e.g., network, temporary LLM issues)
+        try:
+            if questions is None:
+                questions = self.llm_service.generate_quiz_from_image(page_path, page_num)
+            result_path = self._save_result_to_file(pdf_id, page_num, questions)
+        except (LLMServiceError, FileNotFoundError) as exc:
+            # Consider these non-transient for now – mark task as FAILURE.
+            logger.error(
+                "[%s] Non-retryable error processing task=%s: %s",
+                self.worker_id,
+                task_id,
+                exc,
+            )
+            self._submit_failure(task_id, str(exc))
+            return
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception(
+                "[%s] Unexpected error processing task=%s: %s",
+                self.worker_id,
+                task_id,
+                exc,
+            )
+            self._submit_failure(task_id, f"Unexpected worker error: {exc}")
+            return
+
+        logger.info(
+            "[%s] Completed task=%s page=%s; saved %d questions to %s",
+            self.worker_id,
+            task_id,
+            page_num,
+            len(questions),
+            result_path,
+        )
+
+        # Report the result in the background so the next LLM call is not
+        # held up by the HTTP round-trip (or by submission retries).
+        self._submit_pool.submit(self._submit_success, task_id, page_num, result_path)
+
+    def _submit_success(self, task_id: str, page_num: int, result_path: Path) -> None:
+        """
+        Submit a SUCCESS result, retrying transient queue service errors.
+
+        Runs on the submission pool. After ``max_retries`` failed attempts
+        the task is reported as FAILURE instead.
+        """
+        # Retry logic for transient failures (e.g., network, temporary service issues)
         attempt = 0
         while True:
             attempt += 1
             try:
-                questions = self.llm_service.generate_quiz_from_image(page_path, page_num)
-                result_path = self._save_result_to_file(pdf_id, page_num, questions)
-
-                logger.info(
-                    "[%s] Completed task=%s page=%s; saved %d questions to %s",
-                    self.worker_id,
-                    task_id,
-                    page_num,
-                    len(questions),
-                    result_path,
-                )
-
                 self.queue_client.submit_result(
                     queue_id=self.queue_id,
                     task_id=task_id,
                     output=str(result_path),
                     status="SUCCESS",
                 )
-                break
-            except (LLMServiceError, FileNotFoundError) as exc:
-                # Consider these non-transient for now – mark task as FAILURE.
-                logger.error(
-                    "[%s] Non-retryable error processing task=%s: %s",
-                    self.worker_id,
-                    task_id,
-                    exc,
-                )
-                self._submit_failure(task_id, str(exc))
-                break
+                return
             except QueueClientError as exc:
                 # Network / service issues – apply retry policy.
                 logger.warning(
                     "[%s] QueueClient error while submitting result for task=%s "
-                    "(attempt %d/%d): %s",
+                    "page=%s (attempt %d/%d): %s",
                     self.worker_id,
                     task_id,
+                    page_num,
                     attempt,
                     self.max_retries,
                     exc,
                 )
                 if attempt > self.max_retries:
                     self._submit_failure(task_id, f"Failed to submit result: {exc}")
-                    break
-                sleep_for = self.retry_backoff * attempt
+                    return
+                # Exponential backoff with jitter so workers that hit the same
+                # service blip do not all retry in lockstep.
+                sleep_for = self.retry_backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
                 logger.info("[%s] Retrying in %.1fs", self.worker_id, sleep_for)
                 time.sleep(sleep_for)
             except Exception as exc:  # pragma: no cover - defensive
                 logger.exception(
-                    "[%s] Unexpected error processing task=%s: %s",
+                    "[%s] Unexpected error submitting result for task=%s: %s",
                     self.worker_id,
                     task_id,
                     exc,
                 )
-                self._submit_failure(task_id, f"Unexpected worker error: {exc}")
-                break
+                return
 
     def _save_result_to_file(
         self,
@@ -264,8 +463,18 @@ class QuizWorker:
             "questions": questions,
         }
 
-        with out_path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        # Serialized in one pass (orjson when installed), written to a
+        # temporary file and renamed into place so a crash mid-write never
+        # leaves a truncated result for the aggregator to read.
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(fast_json.dumps(payload, indent=True))
+            os.replace(tmp_path, out_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         return out_path
 
@@ -292,6 +501,15 @@ class QuizWorker:
             )
 
 
+def _image_size(path: str) -> int:
+    """Size of a page image in bytes, a cheap proxy for its token cost."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        # Missing images are reported when the page itself is processed.
+        return 0
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     """Create the CLI argument parser for the worker script."""
     parser = argparse.ArgumentParser(
@@ -308,33 +526,59 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         default="config.yaml",
         help="Path to configuration file (default: config.yaml)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of consumer threads polling the queue (default: 1)",
+    )
     return parser
 
 
+def _configure_logging() -> logging.handlers.QueueListener:
+    """
+    Send log records through an in-memory queue drained by a listener
+    thread, so consumer threads never block on writes to stderr.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    )
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 def main() -> None:
     """
     CLI entry point.
 
     Usage:
-        python -m src.worker <queue_id> [--config CONFIG_PATH]
+        python -m src.worker <queue_id> [--config CONFIG_PATH] [--concurrency N]
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    )
+    listener = _configure_logging()
 
     parser = _build_arg_parser()
-    args = parser.parse_args()
-
     try:
+        args = parser.parse_args()
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+
         worker = QuizWorker(queue_id=args.queue_id, config_path=args.config)
-        worker.run()
+        worker.run(concurrency=args.concurrency)
     except FileNotFoundError as exc:
         logger.error("Configuration or required file not found: %s", exc)
         sys.exit(1)
     except Exception as exc:  # pragma: no cover - defensive
         logger.exception("Worker failed with unexpected error: %s", exc)
         sys.exit(1)
+    finally:
+        # Flush any queued records before the process exits.
+        listener.stop()
 
 
 if __name__ == "__main__":
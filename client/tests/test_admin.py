@@ -5,7 +5,7 @@ Tests the administrative CLI operations including status checking and clearing q
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from io import StringIO
 import sys
 
@@ -218,6 +218,53 @@ class TestAdminCLI:
         assert "█" in captured.out  # Filled portion
         assert "░" in captured.out  # Unfilled portion
 
+    def test_check_statuses_multiple_queues(self, admin_cli, mock_queue_client, capsys):
+        """Test that multiple queues are rendered as one row each."""
+        statuses = {
+            'q1': {'pendingTaskCount': 0, 'completedResultCount': 4, 'hasPendingTasks': False},
+            'q2': {'pendingTaskCount': 2, 'completedResultCount': 2, 'hasPendingTasks': True},
+        }
+        mock_queue_client.get_queue_status.side_effect = lambda queue_id: statuses[queue_id]
+
+        admin_cli.check_statuses(queue_ids=['q1', 'q2'])
+
+        captured = capsys.readouterr()
+        rows = [line for line in captured.out.splitlines() if line.startswith('q')]
+        assert len(rows) == 2
+        assert "Complete" in rows[0] and "100.0%" in rows[0]
+        assert "In Progress" in rows[1] and "50.0%" in rows[1]
+        assert "Queue Status:" not in captured.out
+
+    def test_check_statuses_partial_failure(self, admin_cli, mock_queue_client, capsys):
+        """Test that a failing queue is reported and the command exits with 1."""
+        def get_status(queue_id):
+            if queue_id == 'missing':
+                raise QueueNotFoundError("Queue not found: missing")
+            return {'pendingTaskCount': 1, 'completedResultCount': 0, 'hasPendingTasks': True}
+        mock_queue_client.get_queue_status.side_effect = get_status
+
+        with pytest.raises(SystemExit) as exc_info:
+            admin_cli.check_statuses(queue_ids=['q1', 'missing'])
+
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert "❌ Error: Queue not found: missing" in captured.out
+        assert "In Progress" in captured.out
+
+    def test_check_status_single_write(self, admin_cli, mock_queue_client):
+        """Test that the status report is emitted with one stdout write."""
+        mock_queue_client.get_queue_status.return_value = {
+            'pendingTaskCount': 5,
+            'completedResultCount': 5,
+            'hasPendingTasks': True
+        }
+
+        with patch('sys.stdout') as mock_stdout:
+            admin_cli.check_status(queue_id="test-queue")
+
+        mock_stdout.write.assert_called_once()
+        assert "Queue Status: test-queue" in mock_stdout.write.call_args[0][0]
+
     # ========================================================================
     # Argument Parser Tests
     # ========================================================================
@@ -228,7 +275,7 @@ class TestAdminCLI:
         args = parser.parse_args(['status', 'test-queue-id'])
 
         assert args.command == 'status'
-        assert args.queue_id == 'test-queue-id'
+        assert args.queue_ids == ['test-queue-id']
         assert args.config == 'config.yaml'  # Default
 
     def test_arg_parser_status_with_custom_config(self):
@@ -237,9 +284,16 @@ class TestAdminCLI:
         args = parser.parse_args(['status', 'queue-123', '--config', 'custom.yaml'])
 
         assert args.command == 'status'
-        assert args.queue_id == 'queue-123'
+        assert args.queue_ids == ['queue-123']
         assert args.config == 'custom.yaml'
 
+    def test_arg_parser_status_multiple_queues(self):
+        """Test status command accepts several queue IDs."""
+        parser = _build_arg_parser()
+        args = parser.parse_args(['status', 'q1', 'q2', 'q3'])
+
+        assert args.queue_ids == ['q1', 'q2', 'q3']
+
     def test_arg_parser_clear_command(self):
         """Test argument parser for clear command."""
         parser = _build_arg_parser()
@@ -300,6 +354,21 @@ class TestAdminCLI:
         # Verify AdminCLI was called correctly
         mock_admin.check_status.assert_called_once_with(queue_id='test-queue-123')
 
+    @patch('src.admin.AdminCLI')
+    def test_main_status_command_multiple_queues(self, mock_admin_class):
+        """Test main dispatches multiple queue IDs to the batched status check."""
+        mock_admin = Mock()
+        mock_admin_class.return_value = mock_admin
+
+        test_args = ['admin.py', 'status', 'q1', 'q2']
+        with patch.object(sys, 'argv', test_args):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+
+        assert exc_info.value.code == 0
+        mock_admin.check_statuses.assert_called_once_with(queue_ids=['q1', 'q2'])
+        mock_admin.check_status.assert_not_called()
+
     @patch('src.admin.AdminCLI')
     def test_main_clear_command(self, mock_admin_class):
         """Test main function with clear command."""
@@ -0,0 +1,226 @@
+"""
+Unit Tests for Aggregator Module
+
+Tests the QuizAggregator class with a real Config and a spec'd QueueClient
+mock (no HTTP calls).
+
+Test Coverage:
+- Fast deck writer output matches csv.writer
+- The --safe-csv option
+- Resolving a queue ID through _index.json, and the metadata scan fallback
+"""
+
+import csv
+import io
+import json
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+import src.aggregator as aggregator_module
+from src.aggregator import QuizAggregator, _DeckRowWriter, _csv_field, main
+from src.config import Config, QueueServiceConfig, StorageConfig, LLMConfig, WorkerConfig, AnkiConfig
+from src.queue_client import QueueClient
+
+
+# Fields that exercise every QUOTE_MINIMAL rule, plus ones that must pass through.
+TRICKY_FIELDS = [
+    "",
+    "plain",
+    'say "hi"',
+    '"',
+    "a,b",
+    "line\nbreak",
+    "carriage\rreturn",
+    "crlf\r\nend",
+    " leading",
+    "trailing ",
+    "  both  ",
+    "tab\there",
+    'all, of "it"\r\n ',
+    "unicode – é ✓",
+]
+
+
+# ===== Test Fixtures =====
+
+@pytest.fixture
+def config(tmp_path):
+    """Real Config whose metadata and output directories are under tmp_path"""
+    return Config(
+        queue_service=QueueServiceConfig(base_url="http://localhost:8080"),
+        storage=StorageConfig(
+            pdf_dir="storage/pdfs",
+            pages_dir="storage/pages",
+            results_dir="storage/results",
+            metadata_dir=str(tmp_path / "metadata"),
+        ),
+        llm=LLMConfig(provider="mock", api_key=None, model="mock-model", max_questions_per_page=5),
+        worker=WorkerConfig(poll_interval=2.0, max_retries=3, retry_backoff=2.0),
+        anki=AnkiConfig(deck_name="Test Deck", output_dir=str(tmp_path / "output")),
+    )
+
+
+def make_aggregator(config, safe_csv=False):
+    """QuizAggregator built from ``config`` with a spec'd QueueClient"""
+    with patch.object(aggregator_module, "load_config", return_value=config), \
+         patch.object(aggregator_module, "QueueClient", return_value=Mock(spec=QueueClient)):
+        return QuizAggregator(safe_csv=safe_csv)
+
+
+def csv_writer_output(rows):
+    """What the stdlib csv.writer writes for ``rows``."""
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+# ===== Tests for _csv_field / _DeckRowWriter =====
+
+@pytest.mark.parametrize("value", TRICKY_FIELDS)
+def test_csv_field_matches_csv_writer(value):
+    """Test each field is quoted exactly as csv.writer quotes it"""
+    # Compared inside a row: csv.writer special-cases a lone empty field.
+    assert f"{_csv_field(value)},x,y\r\n" == csv_writer_output([[value, "x", "y"]])
+
+
+def test_deck_row_writer_matches_csv_writer():
+    """Test whole rows, including all-empty ones, are byte-identical"""
+    rows = [
+        (question, answer, "page_1")
+        for question in TRICKY_FIELDS
+        for answer in TRICKY_FIELDS
+    ]
+    rows.append(("", "", ""))
+
+    buffer = io.StringIO(newline="")
+    writer = _DeckRowWriter(buffer)
+    writer.writerow(["Question", "Answer", "Tags"])
+    writer.writerows(rows)
+
+    assert buffer.getvalue() == csv_writer_output([("Question", "Answer", "Tags"), *rows])
+
+
+def test_deck_round_trips_through_csv_reader():
+    """Test the fast writer's output reads back to the original rows"""
+    rows = [(field, field, "tag") for field in TRICKY_FIELDS]
+    buffer = io.StringIO(newline="")
+    _DeckRowWriter(buffer).writerows(rows)
+
+    assert [tuple(row) for row in csv.reader(io.StringIO(buffer.getvalue(), newline=""))] == rows
+
+
+# ===== Tests for --safe-csv =====
+
+@pytest.mark.parametrize("safe_csv", [False, True])
+def test_open_deck_writer_output(config, safe_csv):
+    """Test both deck writers produce the same file"""
+    rows = [(field, "answer", "page_1") for field in TRICKY_FIELDS]
+    aggregator = make_aggregator(config, safe_csv=safe_csv)
+
+    with aggregator._open_deck_writer("pdf-1") as (writer, deck_path):
+        assert isinstance(writer, _DeckRowWriter) is not safe_csv
+        writer.writerows(rows)
+
+    assert deck_path.read_bytes().decode("utf-8") == csv_writer_output(
+        [("Question", "Answer", "Tags"), *rows]
+    )
+
+
+@pytest.mark.parametrize("argv, safe_csv", [([], False), (["--safe-csv"], True)])
+def test_main_passes_safe_csv(argv, safe_csv):
+    """Test --safe-csv reaches QuizAggregator"""
+    with patch.object(sys, "argv", ["aggregator", "--pdf-id", "pdf-1", *argv]), \
+         patch.object(aggregator_module, "QuizAggregator") as mock_aggregator:
+        main()
+
+    mock_aggregator.assert_called_once_with(config_path="config.yaml", safe_csv=safe_csv)
+    mock_aggregator.return_value.aggregate.assert_called_once_with(queue_id=None, pdf_id="pdf-1")
+
+
+# ===== Tests for _find_metadata_for_queue =====
+
+def write_metadata(metadata_dir, pdf_id, queue_id):
+    """Write a producer-style metadata file for ``pdf_id``."""
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+    metadata = {"pdf_id": pdf_id, "queue_id": queue_id, "task_ids": ["t1"], "total_pages": 1}
+    (metadata_dir / f"{pdf_id}_metadata.json").write_text(json.dumps(metadata))
+    return metadata
+
+
+@pytest.fixture
+def aggregator(config):
+    """Aggregator with two jobs on disk: pdf-a on queue-a, pdf-b on queue-b"""
+    aggregator = make_aggregator(config)
+    write_metadata(aggregator.metadata_dir, "pdf-a", "queue-a")
+    write_metadata(aggregator.metadata_dir, "pdf-b", "queue-b")
+    return aggregator
+
+
+def find_metadata(aggregator, queue_id):
+    """Resolve ``queue_id``, returning ``(pdf_id, files_read)``."""
+    with patch.object(aggregator, "_read_metadata_safe",
+                      wraps=QuizAggregator._read_metadata_safe) as read:
+        data, pdf_id = aggregator._find_metadata_for_queue(queue_id)
+    assert data["queue_id"] == queue_id and data["pdf_id"] == pdf_id
+    return pdf_id, {c.args[0].name for c in read.call_args_list}
+
+
+def test_index_hit_skips_scan(aggregator):
+    """Test an indexed queue is resolved without reading other metadata"""
+    aggregator._index_path.write_text(json.dumps({"queue-a": "pdf-a", "queue-b": "pdf-b"}))
+
+    pdf_id, files_read = find_metadata(aggregator, "queue-b")
+
+    assert pdf_id == "pdf-b"
+    assert files_read == {"_index.json"}
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        {},
+        {"queue-a": "pdf-a"},
+        # Stale: pdf-a was re-run onto a new queue
+        {"queue-b": "pdf-a"},
+        # Dangling: the metadata file was deleted
+        {"queue-b": "pdf-gone"},
+    ],
+    ids=["empty", "missing-entry", "stale-entry", "dangling-entry"],
+)
+def test_unusable_index_entry_falls_back_to_scan(aggregator, index):
+    """Test a queue the index cannot resolve is found by scanning"""
+    aggregator._index_path.write_text(json.dumps(index))
+
+    pdf_id, files_read = find_metadata(aggregator, "queue-b")
+
+    assert pdf_id == "pdf-b"
+    assert "pdf-b_metadata.json" in files_read
+
+
+@pytest.mark.parametrize("contents", ["{not json", "", '["queue-b", "pdf-b"]'])
+def test_corrupt_index_falls_back_to_scan(aggregator, contents):
+    """Test an unreadable or non-object _index.json is ignored"""
+    aggregator._index_path.write_text(contents)
+
+    pdf_id, _ = find_metadata(aggregator, "queue-b")
+
+    assert pdf_id == "pdf-b"
+
+
+def test_missing_index_falls_back_to_scan(aggregator):
+    """Test metadata written before the index existed is still found"""
+    assert not aggregator._index_path.exists()
+
+    pdf_id, _ = find_metadata(aggregator, "queue-a")
+
+    assert pdf_id == "pdf-a"
+
+
+def test_unknown_queue_raises(aggregator):
+    """Test a queue referenced by no metadata file is reported"""
+    aggregator._index_path.write_text(json.dumps({"queue-a": "pdf-a"}))
+
+    with pytest.raises(FileNotFoundError, match="queue_id=queue-z"):
+        aggregator._find_metadata_for_queue("queue-z")
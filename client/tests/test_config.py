@@ -0,0 +1,99 @@
+"""
+Unit Tests for Config Module
+
+Test Coverage:
+- load_config caching, and its invalidation on file edits and on changes
+  to the environment variables the file references
+"""
+
+import pytest
+
+from src.config import load_config
+
+
+CONFIG_YAML = """\
+queue_service:
+  base_url: "http://${QUIZ_TEST_HOST}:8080"
+storage:
+  pdf_dir: "storage/pdfs"
+  pages_dir: "storage/pages"
+  results_dir: "storage/results"
+  metadata_dir: "storage/metadata"
+llm:
+  provider: "mock"
+  api_key: ${QUIZ_TEST_API_KEY}
+  model: "mock-model"
+  max_questions_per_page: %d
+worker:
+  poll_interval: 2.0
+  max_retries: 3
+  retry_backoff: 2.0
+anki:
+  deck_name: "Test Deck"
+  output_dir: "output"
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """A config file referencing QUIZ_TEST_HOST and QUIZ_TEST_API_KEY"""
+    monkeypatch.setenv("QUIZ_TEST_HOST", "localhost")
+    monkeypatch.setenv("QUIZ_TEST_API_KEY", "key-1")
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG_YAML % 5)
+    return str(path)
+
+
+def test_load_config_substitutes_env_vars(config_path):
+    """Test whole and embedded ${VAR} references are expanded"""
+    config = load_config(config_path)
+
+    assert config.queue_service.base_url == "http://localhost:8080"
+    assert config.llm.api_key == "key-1"
+
+
+def test_load_config_is_cached(config_path):
+    """Test an unchanged file and environment reuse the same Config"""
+    assert load_config(config_path) is load_config(config_path)
+
+
+def test_load_config_sees_env_changes(config_path, monkeypatch):
+    """Test changing or unsetting a referenced variable rebuilds the Config"""
+    first = load_config(config_path)
+
+    monkeypatch.setenv("QUIZ_TEST_API_KEY", "key-2")
+    monkeypatch.setenv("QUIZ_TEST_HOST", "queue")
+    second = load_config(config_path)
+    assert second.llm.api_key == "key-2"
+    assert second.queue_service.base_url == "http://queue:8080"
+
+    monkeypatch.delenv("QUIZ_TEST_API_KEY")
+    assert load_config(config_path).llm.api_key is None
+    assert first.llm.api_key == "key-1"
+
+
+def test_load_config_ignores_unreferenced_env_changes(config_path, monkeypatch):
+    """Test variables the file does not use leave the cache intact"""
+    first = load_config(config_path)
+    monkeypatch.setenv("QUIZ_TEST_UNUSED", "x")
+
+    assert load_config(config_path) is first
+
+
+def test_load_config_sees_file_edits(config_path, tmp_path):
+    """Test rewriting the file invalidates the cached Config"""
+    assert load_config(config_path).llm.max_questions_per_page == 5
+
+    (tmp_path / "config.yaml").write_text(CONFIG_YAML % 10)
+
+    assert load_config(config_path).llm.max_questions_per_page == 10
+
+
+@pytest.mark.parametrize("contents", ["", "queue_service: [unclosed"])
+def test_load_config_rejects_empty_or_invalid_yaml(tmp_path, contents):
+    """Test unusable files raise ValueError"""
+    path = tmp_path / "config.yaml"
+    path.write_text(contents)
+
+    with pytest.raises(ValueError):
+        load_config(str(path))
@@ -0,0 +1,333 @@
+"""
+Unit Tests for LLMService
+
+Test Coverage:
+- Defensive parsing of fenced, bare and prose-wrapped JSON replies
+- Per-page outcomes from batched generation (return_exceptions)
+- Response cache hits, misses, invalidation, expiry and corrupt or malformed entries
+- Matching batched replies to pages, with per-page fallback
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+
+import src.llm_service as llm_module
+from src.llm_service import LLMService, LLMServiceError, _parse_qa_pairs_from_json
+
+
+QA = [{"question": "q", "answer": "a"}]
+
+
+def openrouter_reply(content, status_code=200):
+    """Build a real chat completions response whose message text is ``content``."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+    return response
+
+
+# ===== Tests for _parse_qa_pairs_from_json =====
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[{"question": "q", "answer": "a"}]',
+        '```json\n[{"question": "q", "answer": "a"}]\n```',
+        '```\n{"qa_pairs": [{"question": "q", "answer": "a"}]}\n```',
+        '  {"question": "q", "answer": "a"}  ',
+    ],
+)
+def test_parse_fenced_and_bare_replies(text):
+    """Test plain JSON and Markdown-fenced replies decode to the pairs"""
+    assert _parse_qa_pairs_from_json(text) == QA
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'Here you go: [{"question": "q", "answer": "a"}]',
+        'Here you go: [{"question": "q", "answer": "a"}]. Hope {this} helps!',
+        'Sure {friend}: [{"question": "q", "answer": "a"}] done.',
+        'Result: {"questions": [{"question": "q", "answer": "a"}]} - enjoy',
+    ],
+)
+def test_parse_prose_wrapped_replies(text):
+    """Test JSON surrounded by prose, including prose with its own braces"""
+    assert _parse_qa_pairs_from_json(text) == QA
+
+
+def test_parse_drops_malformed_items():
+    """Test items without string question/answer fields are skipped"""
+    text = '[{"question": "q", "answer": "a"}, {"question": 1}, "junk"]'
+    assert _parse_qa_pairs_from_json(text) == QA
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "no json here",
+        "Broken: [{\"question\": \"q\", ]",
+        '[{"foo": "bar"}]',
+    ],
+)
+def test_parse_invalid_replies_raise(text):
+    """Test undecodable or pair-less replies raise LLMServiceError"""
+    with pytest.raises(LLMServiceError):
+        _parse_qa_pairs_from_json(text)
+
+
+# ===== Tests for generate_quiz_from_images_batched =====
+
+@pytest.fixture
+def openrouter_service():
+    """Service that takes the batched OpenRouter path (no HTTP is made)"""
+    return LLMService(provider="openrouter", api_key="test-key", model="test-model")
+
+
+@pytest.fixture
+def page_images(tmp_path):
+    """Three page images on disk as ``(image_path, page_num)`` pairs"""
+    pages = []
+    for page_num in (1, 2, 3):
+        path = tmp_path / f"page_{page_num}.jpg"
+        path.write_bytes(b"image %d" % page_num)
+        pages.append((str(path), page_num))
+    return pages
+
+
+def test_batched_returns_exception_for_failed_page_only(openrouter_service, page_images):
+    """Test a page failing its fallback keeps its exception; others keep answers"""
+    error = LLMServiceError("page 2 failed")
+    with patch.object(openrouter_service, "_call_openrouter_batch", return_value={1: QA, 3: QA}), \
+         patch.object(openrouter_service, "generate_quiz_from_image", side_effect=error) as single:
+        results = openrouter_service.generate_quiz_from_images_batched(
+            page_images, return_exceptions=True
+        )
+
+    assert results == [QA, error, QA]
+    single.assert_called_once_with(page_images[1][0], 2)
+
+
+def test_batched_raises_without_return_exceptions(openrouter_service, page_images):
+    """Test a failed page still raises by default"""
+    with patch.object(openrouter_service, "_call_openrouter_batch", return_value={1: QA, 3: QA}), \
+         patch.object(openrouter_service, "generate_quiz_from_image",
+                      side_effect=LLMServiceError("page 2 failed")):
+        with pytest.raises(LLMServiceError):
+            openrouter_service.generate_quiz_from_images_batched(page_images)
+
+
+def test_batched_missing_image_is_kept_out_of_request(openrouter_service, page_images):
+    """Test a missing image fails only its own page and is not sent"""
+    missing = (page_images[1][0] + ".gone", 2)
+    pages = [page_images[0], missing, page_images[2]]
+    with patch.object(openrouter_service, "_call_openrouter_batch",
+                      return_value={1: QA, 3: QA}) as batch:
+        results = openrouter_service.generate_quiz_from_images_batched(
+            pages, return_exceptions=True
+        )
+
+    assert [page_num for _, page_num in batch.call_args.args[0]] == [1, 3]
+    assert results[0] == QA and results[2] == QA
+    assert isinstance(results[1], FileNotFoundError)
+
+
+def test_unbatched_returns_exception_for_failed_page_only(page_images):
+    """Test the per-page path reports outcomes per page as well"""
+    service = LLMService(provider="mock")
+    error = LLMServiceError("page 2 failed")
+    with patch.object(service, "generate_quiz_from_image",
+                      side_effect=[QA, error, QA]):
+        results = service.generate_quiz_from_images_batched(
+            page_images, return_exceptions=True, max_workers=1
+        )
+
+    assert results == [QA, error, QA]
+
+
+# ===== Tests for the response cache =====
+
+@pytest.fixture
+def cached_service(tmp_path):
+    """OpenRouter service caching responses under tmp_path (no HTTP is made)"""
+    service = LLMService(
+        provider="openrouter", api_key="test-key", model="test-model",
+        cache_dir=str(tmp_path / "cache"),
+    )
+    with patch.object(service._session, "post",
+                      return_value=openrouter_reply(json.dumps(QA))):
+        yield service
+
+
+@pytest.fixture
+def image(tmp_path):
+    """A page image on disk"""
+    path = tmp_path / "page_1.jpg"
+    path.write_bytes(b"page one")
+    return path
+
+
+def cache_files(service):
+    """Every entry currently in ``service``'s response cache."""
+    return sorted(Path(service._cache_dir).rglob("*.json"))
+
+
+def test_cache_miss_then_hit(cached_service, image):
+    """Test the first call is sent and stored; the second is served from disk"""
+    assert cached_service.generate_quiz_from_image(str(image), 1) == QA
+    assert len(cache_files(cached_service)) == 1
+
+    assert cached_service.generate_quiz_from_image(str(image), 1) == QA
+    assert cached_service._session.post.call_count == 1
+
+
+def test_cache_key_covers_image_and_prompt(cached_service, image):
+    """Test the key changes with the image bytes, the page and the model"""
+    key = cached_service._response_cache_key(image, cached_service._create_prompt(1))
+    assert key != cached_service._response_cache_key(image, cached_service._create_prompt(2))
+
+    other_model = LLMService(provider="openrouter", api_key="k", model="other-model")
+    assert key != other_model._response_cache_key(image, cached_service._create_prompt(1))
+
+    image.write_bytes(b"page one, edited")
+    assert key != cached_service._response_cache_key(image, cached_service._create_prompt(1))
+
+
+def test_changed_image_is_not_served_from_cache(cached_service, image):
+    """Test editing a page image sends a fresh request"""
+    cached_service.generate_quiz_from_image(str(image), 1)
+    image.write_bytes(b"page one, edited")
+
+    cached_service.generate_quiz_from_image(str(image), 1)
+
+    assert cached_service._session.post.call_count == 2
+    assert len(cache_files(cached_service)) == 2
+
+
+def test_cache_entry_expires_after_ttl(cached_service, image):
+    """Test an entry older than the TTL is a miss and is refreshed"""
+    cached_service.generate_quiz_from_image(str(image), 1)
+    (entry,) = cache_files(cached_service)
+    stale = time.time() - llm_module._RESPONSE_CACHE_TTL_SECONDS - 60
+    os.utime(entry, (stale, stale))
+
+    cached_service.generate_quiz_from_image(str(image), 1)
+
+    assert cached_service._session.post.call_count == 2
+    assert entry.stat().st_mtime > stale
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        b"{not json",
+        b"",
+        b'{"questions": [{"question": "q", "answer": "a"}]}',
+        b'[{"q": 1}]',
+        b'[{"question": "q", "answer": 2}]',
+        b'["q"]',
+    ],
+)
+def test_corrupt_cache_entry_is_ignored(cached_service, image, contents):
+    """Test an unreadable or malformed entry is treated as a miss and overwritten"""
+    key = cached_service._response_cache_key(image, cached_service._create_prompt(1))
+    entry = cached_service._response_cache_path(key)
+    entry.parent.mkdir(parents=True)
+    entry.write_bytes(contents)
+
+    assert cached_service._load_cached_response(key) is None
+    assert cached_service.generate_quiz_from_image(str(image), 1) == QA
+    assert cached_service._session.post.call_count == 1
+    assert json.loads(entry.read_bytes()) == QA
+
+
+def test_failed_request_is_not_cached(cached_service, image):
+    """Test error replies leave no cache entry behind"""
+    cached_service._session.post.return_value = openrouter_reply("", status_code=500)
+
+    with pytest.raises(LLMServiceError):
+        cached_service.generate_quiz_from_image(str(image), 1)
+
+    assert cache_files(cached_service) == []
+
+
+# ===== Tests for _generate_batch / _call_openrouter_batch =====
+
+SINGLE_QA = [{"question": "single", "answer": "page"}]
+
+
+def batch_reply(*page_nums):
+    """A batched reply with one pair per page in ``page_nums``."""
+    items = [
+        {"page": page_num, "question": f"q{page_num}", "answer": f"a{page_num}"}
+        for page_num in page_nums
+    ]
+    return openrouter_reply(json.dumps(items))
+
+
+def page_qa(page_num):
+    """The pairs :func:`batch_reply` gives ``page_num``."""
+    return [{"question": f"q{page_num}", "answer": f"a{page_num}"}]
+
+
+def run_batch(service, pages, reply):
+    """Generate ``pages`` with ``reply`` as the batched answer.
+
+    Returns ``(results, pages_retried_individually)``.
+    """
+    with patch.object(service._session, "post", return_value=reply) as post, \
+         patch.object(service, "generate_quiz_from_image", return_value=SINGLE_QA) as single:
+        results = service.generate_quiz_from_images_batched(pages)
+    assert post.call_count == 1
+    return results, [c.args[1] for c in single.call_args_list]
+
+
+def test_batch_answers_every_page(openrouter_service, page_images):
+    """Test a complete reply is split by page with no extra requests"""
+    results, retried = run_batch(openrouter_service, page_images, batch_reply(1, 2, 3))
+
+    assert results == [page_qa(1), page_qa(2), page_qa(3)]
+    assert retried == []
+
+
+def test_batch_reply_missing_a_page(openrouter_service, page_images):
+    """Test a page absent from the reply is the only one retried"""
+    results, retried = run_batch(openrouter_service, page_images, batch_reply(1, 3))
+
+    assert results == [page_qa(1), SINGLE_QA, page_qa(3)]
+    assert retried == [2]
+
+
+def test_batch_reply_with_unknown_page(openrouter_service, page_images):
+    """Test pairs for a page that was not sent are dropped"""
+    results, retried = run_batch(openrouter_service, page_images, batch_reply(1, 2, 9))
+
+    assert results == [page_qa(1), page_qa(2), SINGLE_QA]
+    assert retried == [3]
+
+
+def test_batch_request_failure_retries_each_page(openrouter_service, page_images):
+    """Test a failed batched request falls back page by page"""
+    results, retried = run_batch(
+        openrouter_service, page_images, openrouter_reply("", status_code=500)
+    )
+
+    assert results == [SINGLE_QA] * 3
+    assert retried == [1, 2, 3]
+
+
+def test_batch_request_labels_each_page(openrouter_service, page_images):
+    """Test every image is preceded by its page label"""
+    with patch.object(openrouter_service._session, "post",
+                      return_value=batch_reply(1, 2, 3)) as post:
+        openrouter_service._call_openrouter_batch([(Path(p), n) for p, n in page_images])
+
+    content = json.loads(post.call_args.kwargs["data"])["messages"][-1]["content"]
+    labels = [part["text"] for part in content if part["type"] == "text"][1:]
+    assert labels == ["Page 1:", "Page 2:", "Page 3:"]
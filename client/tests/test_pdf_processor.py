@@ -1,6 +1,7 @@
 from pathlib import Path
+from unittest.mock import patch
 from pypdf import PdfWriter
-from src.pdf_processor import PDFProcessor
+from src.pdf_processor import PDFProcessor, _page_long_sides
 
 def test_validate_pdf_true(tmp_path):
     pdf_path = Path("tests/resources/valid_test.pdf")
@@ -20,3 +21,60 @@ def test_split_pdf_to_images(tmp_path):
     assert len(output) > 0
     for path in output:
         assert Path(path).exists()
+
+def test_validate_pdf_false(tmp_path):
+    bad_file = tmp_path / "not_a.pdf"
+    bad_file.write_bytes(b"plain text, not a pdf")
+    processor = PDFProcessor(pages_output_dir=tmp_path / "pages")
+    assert processor.validate_pdf(str(bad_file)) is False
+
+def test_page_long_sides_from_pdf(tmp_path):
+    processor = PDFProcessor(pages_output_dir=tmp_path)
+    sides = processor._page_long_sides("tests/resources/valid_test.pdf")
+    # valid_test.pdf is 24 A4 pages (595 x 842 pt)
+    assert sides == (842.0,) * 24
+
+def test_page_long_sides_parses_pdfinfo():
+    info = {
+        "Pages": 2,
+        "Page    1 size": "612 x 792 pts (letter)",
+        "Page    1 rot": "0",
+        "Page    2 size": "842 x 595.5 pts",
+    }
+    with patch("src.pdf_processor.pdfinfo_from_path", return_value=info):
+        assert _page_long_sides("pdfinfo-test.pdf", 1, 1) == (792.0, 842.0)
+
+def test_scale_to_only_shrinks_large_pages(tmp_path):
+    processor = PDFProcessor(pages_output_dir=tmp_path, dpi=150, max_image_edge=1024)
+    # A4 at 150 DPI is 1754 px tall, so it is capped
+    assert processor._scale_to(842.0) == 1024
+    # 400 pt at 150 DPI is 833 px, so it keeps the DPI instead of upscaling
+    assert processor._scale_to(400.0) is None
+    unlimited = PDFProcessor(pages_output_dir=tmp_path, max_image_edge=None)
+    assert unlimited._scale_to(842.0) is None
+
+def test_iter_pdf_pages_caps_only_large_pages(tmp_path):
+    processor = PDFProcessor(pages_output_dir=tmp_path, dpi=150, max_image_edge=1024)
+    with patch.object(processor, "get_pdf_page_count", return_value=2), \
+         patch.object(processor, "_page_long_sides", return_value=(842.0, 400.0)), \
+         patch("src.pdf_processor.convert_from_path") as mock_convert:
+        pages = list(processor.iter_pdf_pages("doc.pdf", "test"))
+
+    assert [page_num for page_num, _ in pages] == [1, 2]
+    sizes = {
+        call.kwargs["first_page"]: call.kwargs["size"] for call in mock_convert.call_args_list
+    }
+    assert sizes == {1: 1024, 2: None}
+    assert all(call.kwargs["dpi"] == 150 for call in mock_convert.call_args_list)
+
+
+def test_iter_pdf_pages_skips_page_sizes_without_cap(tmp_path):
+    processor = PDFProcessor(pages_output_dir=tmp_path, dpi=150, max_image_edge=None)
+    with patch.object(processor, "get_pdf_page_count", return_value=2), \
+         patch.object(processor, "_page_long_sides") as mock_long_sides, \
+         patch("src.pdf_processor.convert_from_path") as mock_convert:
+        pages = list(processor.iter_pdf_pages("doc.pdf", "test"))
+
+    assert [page_num for page_num, _ in pages] == [1, 2]
+    mock_long_sides.assert_not_called()
+    assert all(call.kwargs["size"] is None for call in mock_convert.call_args_list)
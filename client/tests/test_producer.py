@@ -16,14 +16,18 @@ Test Coverage:
 """
 
 import json
+import sys
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from datetime import datetime
 
-from src.producer import PDFProducer
+import src.producer as producer_module
+from src.producer import PDFProducer, main
 from src.config import Config, QueueServiceConfig, StorageConfig, LLMConfig, WorkerConfig, AnkiConfig
-from src.queue_client import QueueClient
+from src.queue_client import QueueClient, UnsupportedEndpointError
 from src.pdf_processor import PDFProcessor
 
 
@@ -43,9 +47,14 @@ def create_mock_image_files(tmp_path, image_paths):
         file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text("fake image data")
 
+
+def as_pages(image_paths):
+    """Shape a list of image paths like PDFProcessor.iter_pdf_pages output."""
+    return list(enumerate(image_paths, start=1))
+
 # ===== Test Fixtures =====
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_config():
     """
     Real Config object with test data - better than pure mocks!
@@ -54,6 +63,9 @@ def mock_config():
     1. Config is just data - no external dependencies
     2. If Config structure changes, these tests will catch it
     3. Ensures our test data matches real Config validation
+    
+    Config is frozen, so one instance is built and shared by the whole
+    session; tests take per-test copies through the ``config`` fixture.
     """
     return Config(
         queue_service=QueueServiceConfig(
@@ -84,7 +96,28 @@ def mock_config():
 
 
 @pytest.fixture
-def mock_queue_client():
+def config(mock_config, tmp_path):
+    """Copy of the shared config whose metadata_dir is under this test's tmp_path"""
+    return replace(
+        mock_config,
+        storage=replace(mock_config.storage, metadata_dir=str(tmp_path / "metadata")),
+    )
+
+
+@pytest.fixture(scope="session")
+def _queue_client_template():
+    """Spec'd QueueClient mock, built once; mock_queue_client resets it per test"""
+    return Mock(spec=QueueClient)
+
+
+@pytest.fixture(scope="session")
+def _pdf_processor_template():
+    """Spec'd PDFProcessor mock, built once; mock_pdf_processor resets it per test"""
+    return Mock(spec=PDFProcessor)
+
+
+@pytest.fixture
+def mock_queue_client(_queue_client_template):
     """
     Mock QueueClient with spec - prevents mocking non-existent methods
     
@@ -92,43 +125,48 @@ def mock_queue_client():
     1. Prevents typos: mock_client.creete_queue() would raise AttributeError
     2. Catches API changes: if QueueClient.create_queue is renamed, tests fail
     3. IDE autocomplete works correctly
+    
+    Building a spec'd mock walks the whole class, so the session template
+    is reset (calls, return values and side effects) instead of rebuilt.
     """
-    client = Mock(spec=QueueClient)
+    client = _queue_client_template
+    client.reset_mock(return_value=True, side_effect=True)
     # create_queue returns just the ID string (not dict)
     client.create_queue.return_value = "test-queue-id-1234"
     # enqueue_task returns just the task ID string (not dict)
     client.enqueue_task.return_value = "test-task-id-5678"
+    # Default to a service without the bulk endpoint so tests exercise the
+    # per-task path; bulk tests override this
+    client.enqueue_tasks_bulk.side_effect = UnsupportedEndpointError("no bulk endpoint")
     return client
 
 
 @pytest.fixture
-def mock_pdf_processor():
+def mock_pdf_processor(_pdf_processor_template):
     """Mock PDFProcessor with spec - prevents mocking non-existent methods"""
-    processor = Mock(spec=PDFProcessor)
+    processor = _pdf_processor_template
+    processor.reset_mock(return_value=True, side_effect=True)
     processor.validate_pdf.return_value = True
     processor.get_pdf_page_count.return_value = 3
-    processor.split_pdf_to_images.return_value = [
+    processor.iter_pdf_pages.return_value = as_pages([
         "storage/pages/test-pdf_page_1.png",
         "storage/pages/test-pdf_page_2.png",
         "storage/pages/test-pdf_page_3.png"
-    ]
+    ])
     return processor
 
 
 @pytest.fixture
-def producer(tmp_path, mock_config):
+def producer(tmp_path, config):
     """
     Create a PDFProducer instance with mocked dependencies
     
     We use tmp_path for the metadata directory to avoid
     writing to the actual filesystem during tests.
     """
-    # Update config to use temporary directory
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
-    
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient'), \
-         patch('src.producer.PDFProcessor'):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient'), \
+         patch.object(producer_module, 'PDFProcessor'):
         
         producer = PDFProducer()
         producer.metadata_dir = Path(tmp_path / "metadata")
@@ -137,16 +175,32 @@ def producer(tmp_path, mock_config):
         return producer
 
 
+@pytest.fixture
+def producer_with_mocks(config, mock_queue_client, mock_pdf_processor):
+    """PDFProducer built against the test config and the spec'd mocks"""
+    with patch.multiple(
+        producer_module,
+        load_config=Mock(return_value=config),
+        QueueClient=Mock(return_value=mock_queue_client),
+        PDFProcessor=Mock(return_value=mock_pdf_processor),
+    ):
+        yield PDFProducer()
+
+
+@pytest.fixture(scope="module")
+def dummy_pdf(tmp_path_factory):
+    """Placeholder PDF shared by the module; tests only read its path"""
+    pdf_file = tmp_path_factory.mktemp("pdfs") / "test.pdf"
+    pdf_file.write_text("dummy pdf")
+    return pdf_file
+
+
 # ===== Tests for _validate_pdf_path =====
 
-def test_validate_pdf_path_success(producer, tmp_path):
+def test_validate_pdf_path_success(producer, dummy_pdf):
     """Test validating a valid PDF path"""
-    # Create a dummy PDF file
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf content")
-    
     # Should return Path object without raising
-    result = producer._validate_pdf_path(str(pdf_file))
+    result = producer._validate_pdf_path(str(dummy_pdf))
     assert isinstance(result, Path)
     assert result.name == "test.pdf"
 
@@ -159,13 +213,11 @@ def test_validate_pdf_path_file_not_found(producer):
     assert "not found" in str(exc_info.value).lower()
 
 
-def test_validate_pdf_path_not_a_file(producer, tmp_path):
+def test_validate_pdf_path_not_a_file(producer, dummy_pdf):
     """Test validation fails when path is a directory"""
-    directory = tmp_path / "not_a_file"
-    directory.mkdir()
-    
+    # The shared PDF's directory is an existing path that is not a file
     with pytest.raises(ValueError) as exc_info:
-        producer._validate_pdf_path(str(directory))
+        producer._validate_pdf_path(str(dummy_pdf.parent))
     
     assert "not a file" in str(exc_info.value).lower()
 
@@ -250,143 +302,107 @@ def test_save_metadata_overwrites_existing(producer, tmp_path):
     assert len(metadata["task_ids"]) == 2
 
 
-# ===== Tests for process_pdf (with mocks) =====
 
-def test_process_pdf_workflow(tmp_path, mock_config, mock_queue_client, mock_pdf_processor):
-    """Test the complete process_pdf workflow with mocked dependencies"""
-    # Create a dummy PDF file
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+def test_save_metadata_updates_index(producer):
+    """Test that each saved job is recorded in the queue_id -> pdf_id index"""
+    producer._save_metadata("pdf-a", "queue-a", ["t1"], 1, "a.pdf")
+    producer._save_metadata("pdf-b", "queue-b", ["t2"], 1, "b.pdf")
     
-    # Set up metadata directory
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    with open(producer.metadata_dir / "_index.json", 'r') as f:
+        index = json.load(f)
     
-    # NEW: Create mock image files that validation will check
-    mock_image_paths = [
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_1.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_2.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_3.png"),
-    ]
-    create_mock_image_files(tmp_path, mock_image_paths)
+    assert index == {"queue-a": "pdf-a", "queue-b": "pdf-b"}
+    # No temporary files are left behind
+    assert not list(producer.metadata_dir.glob(".index-*"))
+    # Readable like the metadata files, not mkstemp's 0600
+    assert (producer.metadata_dir / "_index.json").stat().st_mode & 0o777 == 0o644
+
+
+def test_concurrent_index_updates_keep_every_entry(producer):
+    """Test producers finishing together do not drop each other's index entries"""
+    producer.metadata_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda n: producer._update_metadata_index(f"queue-{n}", f"pdf-{n}"), range(64)
+        ))
     
-    # Update mock to return paths that point to tmp_path
-    mock_pdf_processor.split_pdf_to_images.return_value = mock_image_paths
+    with open(producer.metadata_dir / "_index.json", 'r') as f:
+        index = json.load(f)
     
-    # Create producer with mocked dependencies
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
-        
-        producer = PDFProducer()
-        
-        # Execute process_pdf
-        queue_id = producer.process_pdf(
-            pdf_path=str(pdf_file),
-            queue_name="test-queue"
-        )
-        
-        # Verify queue was created
-        mock_queue_client.create_queue.assert_called_once_with("test-queue")
-        
-        # Verify PDF was validated
-        mock_pdf_processor.validate_pdf.assert_called_once()
-        
-        # Verify page count was retrieved
-        mock_pdf_processor.get_pdf_page_count.assert_called_once()
-        
-        # Verify PDF was split into images
-        mock_pdf_processor.split_pdf_to_images.assert_called_once()
-        
-        # Verify tasks were enqueued (3 pages = 3 tasks)
-        assert mock_queue_client.enqueue_task.call_count == 3
-        
-        # Verify queue_id was returned
-        assert queue_id == "test-queue-id-1234"
-        
-        # Verify metadata file was created
-        metadata_files = list((tmp_path / "metadata").glob("*_metadata.json"))
-        assert len(metadata_files) == 1
+    assert index == {f"queue-{n}": f"pdf-{n}" for n in range(64)}
 
+# ===== Tests for process_pdf (with mocks) =====
 
-def test_process_pdf_uses_generated_queue_name_when_none_provided(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+def test_process_pdf_workflow(
+    tmp_path, dummy_pdf, producer_with_mocks, mock_queue_client, mock_pdf_processor
 ):
-    """Test that a queue name is generated when none is provided"""
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    """
+    Test the complete process_pdf workflow with mocked dependencies.
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    process_pdf runs once; the queue calls, task params, priorities and
+    the metadata written for the run are all checked against it.
+    """
+    pdf_file = dummy_pdf
     
-    # NEW: Create mock image files
+    # Create mock image files that validation will check
     mock_image_paths = [
         str(tmp_path / "storage" / "pages" / "test-pdf_page_1.png"),
         str(tmp_path / "storage" / "pages" / "test-pdf_page_2.png"),
         str(tmp_path / "storage" / "pages" / "test-pdf_page_3.png"),
     ]
     create_mock_image_files(tmp_path, mock_image_paths)
-    mock_pdf_processor.split_pdf_to_images.return_value = mock_image_paths
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(mock_image_paths)
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
-        
-        producer = PDFProducer()
-        queue_id = producer.process_pdf(pdf_path=str(pdf_file))
-        
-        # Verify create_queue was called with a generated name (starts with "pdf-")
-        call_args = mock_queue_client.create_queue.call_args[0]
-        assert call_args[0].startswith("pdf-")
-
-
-def test_process_pdf_task_params_structure(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
-):
-    """Test that task parameters have the correct structure"""
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    # Return a different task ID per page; requests run concurrently, so
+    # the ID is keyed on the page rather than call order
+    task_ids = ["task-001", "task-002", "task-003"]
+    mock_queue_client.enqueue_task.side_effect = (
+        lambda queue_id, params, priority: task_ids[priority - 1]
+    )
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    queue_id = producer_with_mocks.process_pdf(
+        pdf_path=str(pdf_file),
+        queue_name="test-queue"
+    )
     
-    # NEW: Create mock image files
-    mock_image_paths = [
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_1.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_2.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_3.png"),
-    ]
-    create_mock_image_files(tmp_path, mock_image_paths)
-    mock_pdf_processor.split_pdf_to_images.return_value = mock_image_paths
+    # Queue was created and its ID returned
+    mock_queue_client.create_queue.assert_called_once_with("test-queue")
+    assert queue_id == "test-queue-id-1234"
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
-        
-        producer = PDFProducer()
-        producer.process_pdf(pdf_path=str(pdf_file))
-        
-        # Get the first task that was enqueued
-        first_call = mock_queue_client.enqueue_task.call_args_list[0]
-        
-        # Extract the params argument
-        params = first_call.kwargs['params']
-        
-        # Verify params structure
-        assert "job" in params
+    # PDF was validated, counted and rendered into page images
+    mock_pdf_processor.validate_pdf.assert_called_once()
+    mock_pdf_processor.get_pdf_page_count.assert_called_once()
+    mock_pdf_processor.iter_pdf_pages.assert_called_once()
+    
+    # One task per page (3 pages = 3 tasks)
+    enqueue_calls = mock_queue_client.enqueue_task.call_args_list
+    assert len(enqueue_calls) == 3
+    
+    for call in enqueue_calls:
+        params = call.kwargs['params']
         assert params["job"] == "generate_quiz"
         assert "pdf_id" in params
         assert "page_num" in params
         assert "page_path" in params
-        assert "pdf_name" in params
-        assert params["pdf_name"] == "test.pdf"
+        # The PDF name lives in the job metadata, not in every task
+        assert "pdf_name" not in params
+        # Priority matches the (1-indexed) page number
+        assert call.kwargs['priority'] == params['page_num']
+    assert sorted(call.kwargs['priority'] for call in enqueue_calls) == [1, 2, 3]
+    
+    # Metadata records the task IDs returned by enqueue_task, in page order
+    metadata_files = list((tmp_path / "metadata").glob("*_metadata.json"))
+    assert len(metadata_files) == 1
+    with open(metadata_files[0], 'r') as f:
+        metadata = json.load(f)
+    assert metadata["task_ids"] == task_ids
 
 
-def test_process_pdf_priority_ordering(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+def test_process_pdf_uses_generated_queue_name_when_none_provided(
+    tmp_path, dummy_pdf, producer_with_mocks, mock_queue_client, mock_pdf_processor
 ):
-    """Test that tasks are submitted with priority based on page number"""
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
-    
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    """Test that a queue name is generated when none is provided"""
+    pdf_file = dummy_pdf
     
     # NEW: Create mock image files
     mock_image_paths = [
@@ -395,26 +411,19 @@ def test_process_pdf_priority_ordering(
         str(tmp_path / "storage" / "pages" / "test-pdf_page_3.png"),
     ]
     create_mock_image_files(tmp_path, mock_image_paths)
-    mock_pdf_processor.split_pdf_to_images.return_value = mock_image_paths
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(mock_image_paths)
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
-        
-        producer = PDFProducer()
-        producer.process_pdf(pdf_path=str(pdf_file))
-        
-        # Check priorities of all enqueued tasks
-        for i, call in enumerate(mock_queue_client.enqueue_task.call_args_list):
-            priority = call.kwargs['priority']
-            # Priority should match page number (1-indexed)
-            assert priority == i + 1
+    queue_id = producer_with_mocks.process_pdf(pdf_path=str(pdf_file))
+    
+    # Verify create_queue was called with a generated name (starts with "pdf-")
+    call_args = mock_queue_client.create_queue.call_args[0]
+    assert call_args[0].startswith("pdf-")
 
 
 # ===== Tests for Error Handling =====
 
 def test_process_pdf_invalid_pdf_raises_error(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, config, mock_queue_client, mock_pdf_processor
 ):
     """Test that process_pdf raises ValueError for invalid PDFs"""
     pdf_file = tmp_path / "invalid.pdf"
@@ -423,11 +432,9 @@ def test_process_pdf_invalid_pdf_raises_error(
     # Mock validate_pdf to return False (invalid PDF)
     mock_pdf_processor.validate_pdf.return_value = False
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
-    
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -439,20 +446,17 @@ def test_process_pdf_invalid_pdf_raises_error(
 
 
 def test_process_pdf_conversion_failure_raises_error(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
 ):
     """Test that process_pdf handles PDF conversion failures"""
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
-    
-    # Mock split_pdf_to_images to raise an exception
-    mock_pdf_processor.split_pdf_to_images.side_effect = Exception("Conversion failed")
+    pdf_file = dummy_pdf
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    # Mock iter_pdf_pages to raise an exception
+    mock_pdf_processor.iter_pdf_pages.side_effect = Exception("Conversion failed")
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -465,7 +469,7 @@ def test_process_pdf_conversion_failure_raises_error(
 # Add these tests in the "Error Handling" section (after line 409)
 
 def test_process_pdf_incomplete_conversion_raises_error(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, config, mock_queue_client, mock_pdf_processor
 ):
     """
     Test that process_pdf fails when PDF conversion returns fewer images than expected.
@@ -480,19 +484,16 @@ def test_process_pdf_incomplete_conversion_raises_error(
     mock_pdf_processor.get_pdf_page_count.return_value = 10
     
     # Mock: But conversion only creates 5 images (incomplete!)
-    mock_pdf_processor.split_pdf_to_images.return_value = [
-        "storage/pages/test-pdf_page_1.png",
-        "storage/pages/test-pdf_page_2.png",
-        "storage/pages/test-pdf_page_3.png",
-        "storage/pages/test-pdf_page_4.png",
-        "storage/pages/test-pdf_page_5.png",
+    image_paths = [
+        str(tmp_path / "storage" / "pages" / f"test-pdf_page_{n}.png")
+        for n in range(1, 6)
     ]
+    create_mock_image_files(tmp_path, image_paths)
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(image_paths)
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
-    
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -506,38 +507,37 @@ def test_process_pdf_incomplete_conversion_raises_error(
         assert "10" in str(exc_info.value)  # Expected pages
         assert "5" in str(exc_info.value)   # Actual images
         
-        # Verify NO tasks were submitted (fail fast)
+        # Verify NO tasks were submitted: the 5 rendered pages were still
+        # buffered for a bulk submission when the shortfall was detected
         assert mock_queue_client.enqueue_task.call_count == 0
+        assert mock_queue_client.enqueue_tasks_bulk.call_count == 0
 
 
 def test_process_pdf_missing_image_files_raises_error(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
 ):
     """
     Test that process_pdf fails when image paths are returned but files don't exist.
     
-    This simulates the case where split_pdf_to_images returns paths,
+    This simulates the case where iter_pdf_pages yields paths,
     but the actual image files weren't created on disk.
     """
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    pdf_file = dummy_pdf
     
     # Mock: PDF has 3 pages
     mock_pdf_processor.get_pdf_page_count.return_value = 3
     
     # Mock: Conversion returns 3 paths (correct count)
     # BUT these files don't actually exist!
-    mock_pdf_processor.split_pdf_to_images.return_value = [
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages([
         "storage/pages/nonexistent_page_1.png",  # This file doesn't exist
         "storage/pages/nonexistent_page_2.png",  # This file doesn't exist
         "storage/pages/nonexistent_page_3.png",  # This file doesn't exist
-    ]
-    
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    ])
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -548,14 +548,14 @@ def test_process_pdf_missing_image_files_raises_error(
         # Verify error message mentions validation failure
         error_msg = str(exc_info.value).lower()
         assert "validation failed" in error_msg or "missing" in error_msg
-        assert "3" in str(exc_info.value)  # Should mention 3 pages missing
+        assert "page 1" in error_msg  # Should stop at the first missing page
         
         # Verify NO tasks were submitted (fail fast)
         assert mock_queue_client.enqueue_task.call_count == 0
 
 
 def test_process_pdf_partial_missing_images_raises_error(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
 ):
     """
     Test that process_pdf fails when only SOME image files are missing.
@@ -563,8 +563,7 @@ def test_process_pdf_partial_missing_images_raises_error(
     This tests the edge case where conversion creates some files but not all.
     Example: Pages 1-2 exist, but page 3 is missing.
     """
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    pdf_file = dummy_pdf
     
     # Create temporary storage directory
     storage_dir = tmp_path / "storage" / "pages"
@@ -581,17 +580,15 @@ def test_process_pdf_partial_missing_images_raises_error(
     mock_pdf_processor.get_pdf_page_count.return_value = 3
     
     # Mock: Conversion returns 3 paths
-    mock_pdf_processor.split_pdf_to_images.return_value = [
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages([
         str(page1),  # EXISTS
         str(page2),  # EXISTS
         str(storage_dir / "test-pdf_page_3.png"),  # DOES NOT EXIST
-    ]
-    
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    ])
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -602,22 +599,23 @@ def test_process_pdf_partial_missing_images_raises_error(
         # Verify error message mentions validation failure
         error_msg = str(exc_info.value).lower()
         assert "validation failed" in error_msg or "missing" in error_msg
-        assert "1" in str(exc_info.value)  # Should mention 1 page missing
+        assert "page 3" in error_msg  # Should mention the missing page
         
-        # Verify NO tasks were submitted (fail fast)
+        # Verify NO tasks were submitted: pages 1-2 were still buffered for a
+        # bulk submission when page 3 turned out to be missing
         assert mock_queue_client.enqueue_task.call_count == 0
+        assert mock_queue_client.enqueue_tasks_bulk.call_count == 0
 
 
 def test_process_pdf_validation_succeeds_when_all_images_exist(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
 ):
     """
     Test that validation passes when all image files exist.
     
     This is the happy path for the new validation logic.
     """
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    pdf_file = dummy_pdf
     
     # Create temporary storage directory
     storage_dir = tmp_path / "storage" / "pages"
@@ -635,17 +633,15 @@ def test_process_pdf_validation_succeeds_when_all_images_exist(
     mock_pdf_processor.get_pdf_page_count.return_value = 3
     
     # Mock: Conversion returns 3 paths that ALL EXIST
-    mock_pdf_processor.split_pdf_to_images.return_value = [
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages([
         str(page1),
         str(page2),
         str(page3),
-    ]
-    
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    ])
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -662,7 +658,7 @@ def test_process_pdf_validation_succeeds_when_all_images_exist(
 
 
 def test_process_pdf_task_submission_fails_after_validation(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
 ):
     """
     Test that task submission failure raises error (not just warning).
@@ -670,8 +666,7 @@ def test_process_pdf_task_submission_fails_after_validation(
     After validation passes, if task submission fails, the entire job should fail.
     This tests the updated error handling in the task submission loop.
     """
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    pdf_file = dummy_pdf
     
     # Create temporary storage directory with all images
     storage_dir = tmp_path / "storage" / "pages"
@@ -688,23 +683,23 @@ def test_process_pdf_task_submission_fails_after_validation(
     mock_pdf_processor.get_pdf_page_count.return_value = 3
     
     # Mock: Conversion returns 3 valid paths
-    mock_pdf_processor.split_pdf_to_images.return_value = [
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages([
         str(page1),
         str(page2),
         str(page3),
-    ]
+    ])
     
-    # Mock: Task submission succeeds for first task, then fails
-    mock_queue_client.enqueue_task.side_effect = [
-        "task-001",  # First task succeeds
-        Exception("Network error"),  # Second task fails
-    ]
+    # Mock: Task submission succeeds for every page except page 2
+    def enqueue(queue_id, params, priority):
+        if priority == 2:
+            raise Exception("Network error")
+        return f"task-{priority:03d}"
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    mock_queue_client.enqueue_task.side_effect = enqueue
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         
@@ -717,80 +712,162 @@ def test_process_pdf_task_submission_fails_after_validation(
         assert "failed to submit task" in error_msg
         assert "page 2" in error_msg  # Should mention which page failed
         
-        # Verify only 1 task was submitted before failure
-        assert mock_queue_client.enqueue_task.call_count == 2  # Called twice, failed on second
-
+        # Page 1 is reported as submitted; page 3 may already be in flight
+        assert "submitted 1/3 tasks" in error_msg
+        assert mock_queue_client.enqueue_task.call_count >= 2
+        
+        # Partial metadata lists page 1, plus page 3 if it was already sent
+        (metadata_file,) = (tmp_path / "metadata").glob("*_metadata.json")
+        task_ids = json.loads(metadata_file.read_text())["task_ids"]
+        assert task_ids[0] == "task-001"
+        assert "task-002" not in task_ids
 
-# ===== Integration-Style Test (less mocking) =====
 
-def test_process_pdf_metadata_matches_tasks(
-    tmp_path, mock_config, mock_queue_client, mock_pdf_processor
+def test_process_pdf_render_failure_saves_partial_metadata(
+    tmp_path, dummy_pdf, producer_with_mocks, mock_queue_client, mock_pdf_processor
 ):
-    """
-    Test that metadata file contains correct task IDs.
-    This is a more integration-style test.
-    """
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    """Test tasks enqueued before a mid-stream render failure are recorded"""
+    image_paths = [str(tmp_path / "pages" / f"page_{n}.png") for n in range(1, 21)]
+    create_mock_image_files(tmp_path, image_paths)
+    
+    def render_then_fail(pdf_path, pdf_id):
+        yield from as_pages(image_paths)
+        raise OSError("pdftoppm crashed")
+    
+    mock_pdf_processor.get_pdf_page_count.return_value = 30
+    mock_pdf_processor.iter_pdf_pages.side_effect = render_then_fail
+    mock_queue_client.enqueue_tasks_bulk.side_effect = (
+        lambda queue_id, tasks: [f"task-{priority}" for _, priority in tasks]
+    )
     
-    mock_config.storage.metadata_dir = str(tmp_path / "metadata")
+    with pytest.raises(RuntimeError, match="Failed to convert PDF"):
+        producer_with_mocks.process_pdf(pdf_path=str(dummy_pdf))
     
-    # NEW: Create mock image files
-    mock_image_paths = [
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_1.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_2.png"),
-        str(tmp_path / "storage" / "pages" / "test-pdf_page_3.png"),
+    # The first bulk chunk was enqueued before rendering failed
+    (metadata_file,) = producer_with_mocks.metadata_dir.glob("*_metadata.json")
+    metadata = json.loads(metadata_file.read_text())
+    assert metadata["queue_id"] == "test-queue-id-1234"
+    assert metadata["task_ids"] == [f"task-{n}" for n in range(1, 17)]
+    assert metadata["total_pages"] == 30
+    assert metadata["complete"] is False
+    
+    index = json.loads((producer_with_mocks.metadata_dir / "_index.json").read_text())
+    assert index["test-queue-id-1234"] == metadata["pdf_id"]
+
+
+def test_process_pdf_enqueue_failure_saves_partial_metadata(
+    tmp_path, dummy_pdf, producer_with_mocks, mock_queue_client, mock_pdf_processor
+):
+    """Test a failed bulk chunk leaves metadata for the earlier chunks"""
+    image_paths = [str(tmp_path / "pages" / f"page_{n}.png") for n in range(1, 21)]
+    create_mock_image_files(tmp_path, image_paths)
+    mock_pdf_processor.get_pdf_page_count.return_value = 20
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(image_paths)
+    mock_queue_client.enqueue_tasks_bulk.side_effect = [
+        [f"task-{n}" for n in range(1, 17)],
+        Exception("Network error"),
     ]
-    create_mock_image_files(tmp_path, mock_image_paths)
-    mock_pdf_processor.split_pdf_to_images.return_value = mock_image_paths
     
-    # Mock enqueue_task to return different task IDs
-    task_ids = ["task-001", "task-002", "task-003"]
-    mock_queue_client.enqueue_task.side_effect = task_ids
+    with pytest.raises(RuntimeError, match="Successfully submitted 16/20"):
+        producer_with_mocks.process_pdf(pdf_path=str(dummy_pdf))
+    
+    (metadata_file,) = producer_with_mocks.metadata_dir.glob("*_metadata.json")
+    metadata = json.loads(metadata_file.read_text())
+    assert metadata["task_ids"] == [f"task-{n}" for n in range(1, 17)]
+    assert metadata["complete"] is False
+
+
+def test_process_pdf_failure_before_any_task_saves_no_metadata(
+    dummy_pdf, producer_with_mocks, mock_pdf_processor
+):
+    """Test nothing is recorded when no task reached the queue"""
+    mock_pdf_processor.iter_pdf_pages.side_effect = Exception("Conversion failed")
+    
+    with pytest.raises(RuntimeError):
+        producer_with_mocks.process_pdf(pdf_path=str(dummy_pdf))
     
-    with patch('src.producer.load_config', return_value=mock_config), \
-         patch('src.producer.QueueClient', return_value=mock_queue_client), \
-         patch('src.producer.PDFProcessor', return_value=mock_pdf_processor):
+    assert not list(producer_with_mocks.metadata_dir.glob("*_metadata.json"))
+
+
+def test_process_pdf_uses_bulk_enqueue_when_available(
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
+):
+    """Test that rendered pages are submitted through the bulk endpoint."""
+    pdf_file = dummy_pdf
+    
+    image_paths = [
+        str(tmp_path / "storage" / "pages" / f"test-pdf_page_{n}.png")
+        for n in range(1, 4)
+    ]
+    create_mock_image_files(tmp_path, image_paths)
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(image_paths)
+    mock_queue_client.enqueue_tasks_bulk.side_effect = None
+    mock_queue_client.enqueue_tasks_bulk.return_value = ["task-001", "task-002", "task-003"]
+    
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
         producer = PDFProducer()
         producer.process_pdf(pdf_path=str(pdf_file))
         
-        # Load metadata file
-        metadata_files = list((tmp_path / "metadata").glob("*_metadata.json"))
-        assert len(metadata_files) == 1
+        # All 3 pages fit in one batch: one bulk call, no per-task calls
+        mock_queue_client.enqueue_tasks_bulk.assert_called_once()
+        mock_queue_client.enqueue_task.assert_not_called()
+        queue_id, tasks = mock_queue_client.enqueue_tasks_bulk.call_args.args
+        assert queue_id == "test-queue-id-1234"
+        assert [priority for _, priority in tasks] == [1, 2, 3]
+        assert [params["page_path"] for params, _ in tasks] == image_paths
         
+        metadata_files = list((tmp_path / "metadata").glob("*_metadata.json"))
         with open(metadata_files[0], 'r') as f:
-            metadata = json.load(f)
+            assert json.load(f)["task_ids"] == ["task-001", "task-002", "task-003"]
+
+
+def test_process_pdf_falls_back_to_single_enqueue(
+    tmp_path, dummy_pdf, config, mock_queue_client, mock_pdf_processor
+):
+    """Test that a service without bulk enqueue is only asked once."""
+    pdf_file = dummy_pdf
+    
+    image_paths = [
+        str(tmp_path / "storage" / "pages" / f"test-pdf_page_{n}.png")
+        for n in range(1, 4)
+    ]
+    create_mock_image_files(tmp_path, image_paths)
+    mock_pdf_processor.iter_pdf_pages.return_value = as_pages(image_paths)
+    
+    with patch.object(producer_module, 'load_config', return_value=config), \
+         patch.object(producer_module, 'QueueClient', return_value=mock_queue_client), \
+         patch.object(producer_module, 'PDFProcessor', return_value=mock_pdf_processor):
         
-        # Verify task IDs match what was returned by enqueue_task
-        assert metadata["task_ids"] == task_ids
-        assert len(metadata["task_ids"]) == 3
+        producer = PDFProducer()
+        producer.process_pdf(pdf_path=str(pdf_file))
+        
+        assert mock_queue_client.enqueue_tasks_bulk.call_count == 1
+        assert mock_queue_client.enqueue_task.call_count == 3
 
 
 # ===== Testing CLI Main Function =====
 
-def test_main_function_success(tmp_path, monkeypatch):
+def test_main_function_success(dummy_pdf, monkeypatch):
     """Test the CLI entry point works correctly"""
-    # Create a test PDF
-    pdf_file = tmp_path / "test.pdf"
-    pdf_file.write_text("dummy pdf")
+    pdf_file = dummy_pdf
     
     # Mock sys.argv to simulate command line
-    import sys
     monkeypatch.setattr(sys, 'argv', [
         'producer.py',
         str(pdf_file),
         '--queue-name', 'test-queue'
     ])
     
-    with patch('src.producer.PDFProducer') as mock_producer_class:
+    with patch.object(producer_module, 'PDFProducer') as mock_producer_class:
         mock_instance = Mock()
         mock_instance.process_pdf.return_value = "queue-123"
         mock_producer_class.return_value = mock_instance
         
         # Should exit with 0 (success)
         with pytest.raises(SystemExit) as exc_info:
-            from src.producer import main
             main()
         
         assert exc_info.value.code == 0
@@ -799,19 +876,17 @@ def test_main_function_success(tmp_path, monkeypatch):
 
 def test_main_function_handles_file_not_found(monkeypatch, capsys):
     """Test CLI handles missing files gracefully"""
-    import sys
     monkeypatch.setattr(sys, 'argv', [
         'producer.py',
         'nonexistent.pdf'
     ])
     
-    with patch('src.producer.PDFProducer') as mock_producer_class:
+    with patch.object(producer_module, 'PDFProducer') as mock_producer_class:
         mock_instance = Mock()
         mock_instance.process_pdf.side_effect = FileNotFoundError("File not found: nonexistent.pdf")
         mock_producer_class.return_value = mock_instance
         
         with pytest.raises(SystemExit) as exc_info:
-            from src.producer import main
             main()
         
         assert exc_info.value.code == 1
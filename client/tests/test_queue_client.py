@@ -4,18 +4,48 @@ Unit Tests for QueueClient
 AI assistance used for: Coverage checking, preliminary structure, looking for logic holes.
 """
 
+import gzip
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import json
 import requests
-from src.queue_client import QueueClient, QueueClientError, QueueNotFoundError, InvalidRequestError
+from src.queue_client import (
+    QueueClient, QueueClientError, QueueNotFoundError, InvalidRequestError, UnsupportedEndpointError
+)
+
+def json_response(status_code, body=None):
+    """Build a real (and much cheaper than Mock) response with ``body`` as its JSON content."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"" if body is None else json.dumps(body).encode()
+    return response
+
 
 class TestQueueClient(unittest.TestCase):
+    base_url = "http://localhost:8080"
+    queue_id = "a3b5c7d9-1234-5678-90ab-cdef12345678"
+    task_id = "b4c6d8e0-2345-6789-01bc-def123456789"
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch the session's HTTP verbs once for the class; setUp resets
+        # the mocks so every test still starts from a clean slate.
+        cls._patchers = [patch('requests.Session.get'), patch('requests.Session.post')]
+        cls.mock_get, cls.mock_post = (patcher.start() for patcher in cls._patchers)
+        # The default client keeps no state between calls (status caching is
+        # off), so one instance serves every test; tests that need other
+        # settings build their own.
+        cls.client = QueueClient(cls.base_url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+        for patcher in cls._patchers:
+            patcher.stop()
+
     def setUp(self):
-        self.base_url = "http://localhost:8080"
-        self.client = QueueClient(self.base_url)
-        self.queue_id = "a3b5c7d9-1234-5678-90ab-cdef12345678"
-        self.task_id = "b4c6d8e0-2345-6789-01bc-def123456789"
+        self.mock_get.reset_mock(return_value=True, side_effect=True)
+        self.mock_post.reset_mock(return_value=True, side_effect=True)
 
     def test_init_valid(self):
         """Test initialization with valid URL."""
@@ -27,144 +57,266 @@ class TestQueueClient(unittest.TestCase):
         client = QueueClient("http://localhost:8080/")
         self.assertEqual(client.base_url, "http://localhost:8080")
 
+    def test_context_manager_closes_session(self):
+        """Test leaving a with block closes the pooled session."""
+        with QueueClient(self.base_url) as client:
+            client._session = Mock()
+        client._session.close.assert_called_once()
+
     def test_init_empty_raises(self):
         """Test empty URL raises error."""
         with self.assertRaises(ValueError):
             QueueClient("")
 
-    @patch('requests.post')
-    def test_create_queue_success(self, mock_post):
+    def test_requests_reuse_session(self):
+        """Test calls go through the client's pooled session."""
+        self.mock_get.return_value = json_response(204)
+        self.client.dequeue_task(self.queue_id)
+        self.client.dequeue_task(self.queue_id)
+        self.assertEqual(self.mock_get.call_count, 2)
+        adapter = self.client._session.get_adapter(self.base_url)
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+    def test_retry_policies(self):
+        """Test sent requests are never retried blindly; dequeues only on connect errors."""
+        retries = self.client._session.get_adapter(self.base_url).max_retries
+        self.assertEqual(retries.read, 0)
+        self.assertNotIn("POST", retries.allowed_methods)
+        dequeue_retries = self.client._dequeue_session.get_adapter(self.base_url).max_retries
+        self.assertEqual((dequeue_retries.read, dequeue_retries.status), (0, 0))
+        self.assertEqual(dequeue_retries.total, 3)
+
+    def test_dequeue_calls_use_dequeue_session(self):
+        """Test dequeue requests go through the session without status retries."""
+        self.mock_get.return_value = json_response(200, [])
+        with patch.object(self.client._session, 'get') as shared_get:
+            self.client.dequeue_tasks(self.queue_id)
+            self.mock_get.return_value = json_response(204)
+            self.client.dequeue_task(self.queue_id)
+        shared_get.assert_not_called()
+        self.assertEqual(self.mock_get.call_count, 2)
+
+    def test_close_closes_session(self):
+        """Test close() releases the pooled session."""
+        with patch.object(self.client._session, 'close') as mock_close:
+            self.client.close()
+        mock_close.assert_called_once()
+
+    def test_create_queue_success(self):
         """Test successful queue creation."""
-        mock_post.return_value = Mock(status_code=200, json=lambda: {"id": self.queue_id})
+        self.mock_post.return_value = json_response(200, {"id": self.queue_id})
         queue_id = self.client.create_queue("test")
         self.assertEqual(queue_id, self.queue_id)
 
-    @patch('requests.post')
-    def test_create_queue_invalid(self, mock_post):
-        """Test invalid queue name."""
-        mock_post.return_value = Mock(status_code=400, json=lambda: {"message": "Invalid"})
-        with self.assertRaises(InvalidRequestError):
-            self.client.create_queue("")
+    def test_http_error_mapping(self):
+        """Test error statuses map to the matching client exception."""
+        cases = [
+            (self.mock_post, "create_queue", ("",), 400, InvalidRequestError),
+            (self.mock_post, "enqueue_task", ("invalid", {}, 1), 404, QueueNotFoundError),
+            (self.mock_post, "enqueue_task", ("bad-uuid", {}, 1), 400, InvalidRequestError),
+            (self.mock_get, "dequeue_task", ("invalid",), 404, QueueNotFoundError),
+            (self.mock_post, "submit_result", (self.queue_id, self.task_id, "", "BAD"), 400,
+             InvalidRequestError),
+            (self.mock_get, "get_queue_status", ("invalid",), 404, QueueNotFoundError),
+            (self.mock_get, "dequeue_tasks", (self.queue_id,), 405, UnsupportedEndpointError),
+            (self.mock_post, "enqueue_tasks_bulk", (self.queue_id, [({"page_num": 1}, 1)]), 405,
+             UnsupportedEndpointError),
+            (self.mock_post, "get_results_batch", (self.queue_id, ["t1"]), 404,
+             UnsupportedEndpointError),
+        ]
+        for mock_verb, method, args, status, exc in cases:
+            with self.subTest(method=method, status=status):
+                mock_verb.return_value = json_response(status, {"message": "Invalid"})
+                with self.assertRaises(exc):
+                    getattr(self.client, method)(*args)
 
-    @patch('requests.post')
-    def test_enqueue_success(self, mock_post):
+    def test_enqueue_success(self):
         """Test successful task enqueue."""
-        mock_post.return_value = Mock(status_code=200, json=lambda: {"id": self.task_id})
+        self.mock_post.return_value = json_response(200, {"id": self.task_id})
         task_id = self.client.enqueue_task(self.queue_id, {"test": "data"}, 1)
         self.assertEqual(task_id, self.task_id)
+        kwargs = self.mock_post.call_args.kwargs
+        self.assertEqual(kwargs['headers']['Content-Type'], "application/json")
+        body = json.loads(kwargs['data'])
+        self.assertEqual(json.loads(body["params"]), {"test": "data"})
+        self.assertEqual(body["priority"], 1)
 
-    @patch('requests.post')
-    def test_enqueue_not_found(self, mock_post):
-        """Test enqueue on missing queue."""
-        mock_post.return_value = Mock(status_code=404)
-        with self.assertRaises(QueueNotFoundError):
-            self.client.enqueue_task("invalid", {}, 1)
-
-    @patch('requests.post')
-    def test_enqueue_invalid(self, mock_post):
-        """Test enqueue with invalid params."""
-        mock_post.return_value = Mock(status_code=400, json=lambda: {"message": "Invalid"})
-        with self.assertRaises(InvalidRequestError):
-            self.client.enqueue_task("bad-uuid", {}, 1)
-
-    @patch('requests.get')
-    def test_dequeue_success(self, mock_get):
+    def test_dequeue_success(self):
         """Test successful dequeue."""
         task = {"id": self.task_id, "params": "{}", "priority": 1}
-        mock_get.return_value = Mock(status_code=200, json=lambda: task)
+        self.mock_get.return_value = json_response(200, task)
         result = self.client.dequeue_task(self.queue_id)
         self.assertEqual(result['id'], self.task_id)
 
-    @patch('requests.get')
-    def test_dequeue_empty(self, mock_get):
+    def test_dequeue_empty(self):
         """Test dequeue from empty queue."""
-        mock_get.return_value = Mock(status_code=204)
+        self.mock_get.return_value = json_response(204)
         result = self.client.dequeue_task(self.queue_id)
         self.assertIsNone(result)
 
-    @patch('requests.get')
-    def test_dequeue_not_found(self, mock_get):
-        """Test dequeue from missing queue."""
-        mock_get.return_value = Mock(status_code=404)
-        with self.assertRaises(QueueNotFoundError):
-            self.client.dequeue_task("invalid")
-
-    @patch('requests.post')
-    def test_submit_result_success(self, mock_post):
+    def test_submit_result_success(self):
         """Test successful result submission."""
-        mock_post.return_value = Mock(status_code=200)
+        self.mock_post.return_value = json_response(200)
         self.client.submit_result(self.queue_id, self.task_id, "output", "SUCCESS")
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
 
-    @patch('requests.post')
-    def test_submit_result_invalid(self, mock_post):
-        """Test submit with invalid status."""
-        mock_post.return_value = Mock(status_code=400, json=lambda: {"message": "Invalid"})
-        with self.assertRaises(InvalidRequestError):
-            self.client.submit_result(self.queue_id, self.task_id, "", "BAD")
-
-    @patch('requests.get')
-    def test_get_result_success(self, mock_get):
+    def test_get_result_success(self):
         """Test successful result retrieval."""
         result = {"taskId": self.task_id, "output": "test", "status": "SUCCESS"}
-        mock_get.return_value = Mock(status_code=200, json=lambda: result)
+        self.mock_get.return_value = json_response(200, result)
         resp = self.client.get_result(self.queue_id, self.task_id)
         self.assertEqual(resp['taskId'], self.task_id)
 
-    @patch('requests.get')
-    def test_get_result_not_found(self, mock_get):
+    def test_get_result_not_found(self):
         """Test get missing result."""
-        mock_get.return_value = Mock(status_code=404)
+        self.mock_get.return_value = json_response(404)
         result = self.client.get_result(self.queue_id, self.task_id)
         self.assertIsNone(result)
 
-    @patch('requests.get')
-    def test_get_status_success(self, mock_get):
+    def test_enqueue_tasks_bulk_chunks_requests(self):
+        """Test bulk enqueue splits tasks into chunks and returns IDs in order."""
+        self.mock_post.side_effect = [
+            json_response(201, {"taskIds": ["t1", "t2"]}),
+            json_response(201, {"taskIds": ["t3"]}),
+        ]
+        tasks = [({"page_num": n}, n) for n in (1, 2, 3)]
+        task_ids = self.client.enqueue_tasks_bulk(self.queue_id, tasks, chunk_size=2)
+        self.assertEqual(task_ids, ["t1", "t2", "t3"])
+        self.assertTrue(self.mock_post.call_args.args[0].endswith("/tasks:batch"))
+        body = json.loads(self.mock_post.call_args_list[1].kwargs['data'])
+        self.assertEqual(len(body["tasks"]), 1)
+        self.assertEqual(json.loads(body["tasks"][0]["params"]), {"page_num": 3})
+        self.assertEqual(body["tasks"][0]["priority"], 3)
+
+    def test_dequeue_tasks_long_poll(self):
+        """Test batch dequeue sends limits and outlasts the server-side wait."""
+        tasks = [{"id": "t1"}, {"id": "t2"}]
+        self.mock_get.return_value = json_response(200, tasks)
+        result = self.client.dequeue_tasks(self.queue_id, max_tasks=2, wait_ms=5000)
+        self.assertEqual(result, tasks)
+        kwargs = self.mock_get.call_args.kwargs
+        self.assertEqual(kwargs['params'], {"max": 2, "waitMs": 5000})
+        self.assertGreater(kwargs['timeout'][1], 5)
+
+    def test_compress_requests_gzips_large_bodies(self):
+        """Test large bodies are gzipped when compression is enabled and small ones are not."""
+        client = QueueClient(self.base_url, compress_requests=True)
+        self.mock_post.return_value = json_response(201, {"taskIds": ["t"] * 100})
+        tasks = [({"page_path": f"storage/pages/page_{n:04d}.jpg"}, n) for n in range(100)]
+        client.enqueue_tasks_bulk(self.queue_id, tasks)
+        kwargs = self.mock_post.call_args.kwargs
+        self.assertEqual(kwargs['headers']['Content-Encoding'], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(kwargs['data']))["tasks"]), 100)
+
+        self.mock_post.return_value = json_response(200, {"id": self.task_id})
+        client.enqueue_task(self.queue_id, {"page_num": 1}, 1)
+        self.assertNotIn('Content-Encoding', self.mock_post.call_args.kwargs['headers'])
+
+    def test_get_results_batch_pages_requests(self):
+        """Test batch fetch splits task IDs into pages and merges responses."""
+        self.mock_post.side_effect = [
+            json_response(200, {"results": [{"taskId": "t1"}], "missing": ["t2"]}),
+            json_response(200, {"results": [{"taskId": "t3"}], "missing": []}),
+        ]
+        batch = self.client.get_results_batch(self.queue_id, ["t1", "t2", "t3"], page_size=2)
+        self.assertEqual([r['taskId'] for r in batch['results']], ["t1", "t3"])
+        self.assertEqual(batch['missing'], ["t2"])
+        self.assertEqual(
+            json.loads(self.mock_post.call_args_list[1].kwargs['data']), {"taskIds": ["t3"]}
+        )
+
+    def test_get_status_success(self):
         """Test queue status retrieval."""
         status = {"id": self.queue_id, "pendingTaskCount": 5, "completedResultCount": 3}
-        mock_get.return_value = Mock(status_code=200, json=lambda: status)
+        self.mock_get.return_value = json_response(200, status)
         resp = self.client.get_queue_status(self.queue_id)
         self.assertEqual(resp['pendingTaskCount'], 5)
 
-    @patch('requests.get')
-    def test_get_status_not_found(self, mock_get):
-        """Test status for missing queue."""
-        mock_get.return_value = Mock(status_code=404)
-        with self.assertRaises(QueueNotFoundError):
-            self.client.get_queue_status("invalid")
+    def test_get_status_cached_within_ttl(self):
+        """Test status responses are reused within the TTL when caching is enabled."""
+        client = QueueClient(self.base_url, status_ttl_ms=60000)
+        self.mock_get.return_value = json_response(200, {"pendingTaskCount": 5})
+        client.get_queue_status(self.queue_id)
+        resp = client.get_queue_status(self.queue_id)
+        self.assertEqual(resp['pendingTaskCount'], 5)
+        self.mock_get.assert_called_once()
+
+    def test_get_status_uncached_by_default(self):
+        """Test every status call hits the service when caching is off."""
+        self.mock_get.return_value = json_response(200, {"pendingTaskCount": 5})
+        self.client.get_queue_status(self.queue_id)
+        self.client.get_queue_status(self.queue_id)
+        self.assertEqual(self.mock_get.call_count, 2)
 
-    @patch('requests.get')
-    def test_get_status_complete(self, mock_get):
+    def test_get_status_complete(self):
         """Test status when all complete."""
         status = {"pendingTaskCount": 0, "completedResultCount": 10, "hasPendingTasks": False}
-        mock_get.return_value = Mock(status_code=200, json=lambda: status)
+        self.mock_get.return_value = json_response(200, status)
         resp = self.client.get_queue_status(self.queue_id)
         self.assertFalse(resp['hasPendingTasks'])
 
-    def test_extract_error_json(self):
-        """Test error extraction from JSON."""
-        mock_resp = Mock(json=lambda: {"message": "Error"}, text="fallback")
-        msg = self.client._extract_error(mock_resp)
-        self.assertEqual(msg, "Error")
-
-    def test_extract_error_text(self):
-        """Test error extraction from text."""
-        mock_resp = Mock(text="Error text", reason="Reason")
-        mock_resp.json.side_effect = json.JSONDecodeError("", "", 0)
-        msg = self.client._extract_error(mock_resp)
-        self.assertEqual(msg, "Error text")
-
-    @patch('requests.post')
-    def test_timeout(self, mock_post):
+    def test_stream_completion_yields_events(self):
+        """Test SSE status events are parsed into dicts."""
+        lines = [
+            "event:status", 'data:{"pendingTaskCount": 1, "completedResultCount": 0}', "",
+            ":keep-alive", "",
+            "event:status", 'data:{"pendingTaskCount": 0, "completedResultCount": 1}', "",
+        ]
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = iter(lines)
+        self.mock_get.return_value = response
+        events = list(self.client.stream_completion(self.queue_id))
+        self.assertEqual([e['completedResultCount'] for e in events], [0, 1])
+        self.assertTrue(self.mock_get.call_args.kwargs['stream'])
+
+    def test_stream_completion_unsupported(self):
+        """Test missing events endpoint raises UnsupportedEndpointError."""
+        response = MagicMock(status_code=404)
+        response.__enter__.return_value = response
+        self.mock_get.return_value = response
+        with self.assertRaises(UnsupportedEndpointError):
+            next(self.client.stream_completion(self.queue_id))
+
+    def test_extract_error(self):
+        """Test error extraction from JSON, plain text and an empty body."""
+        cases = [
+            (Mock(content=b'{"message": "Error"}', text="fallback"), "Error"),
+            (Mock(content=b'{"error": "Bad"}', text="fallback"), "Bad"),
+            (Mock(content=b"Error text", text="Error text", reason="Reason"), "Error text"),
+            (Mock(content=b"", text="", reason="Reason"), "Reason"),
+        ]
+        for response, expected in cases:
+            with self.subTest(content=response.content):
+                self.assertEqual(self.client._extract_error(response), expected)
+
+    def test_non_json_body_raises_client_error(self):
+        """Test a 200 response whose body is not JSON raises QueueClientError."""
+        html = requests.Response()
+        html.status_code = 200
+        html._content = b"<html><body>Bad Gateway</body></html>"
+        cases = [
+            (self.mock_get, "get_queue_status", (self.queue_id,)),
+            (self.mock_get, "dequeue_task", (self.queue_id,)),
+            (self.mock_get, "dequeue_tasks", (self.queue_id,)),
+            (self.mock_post, "create_queue", ("test",)),
+            (self.mock_post, "get_results_batch", (self.queue_id, ["t1"])),
+        ]
+        for mock_verb, method, args in cases:
+            with self.subTest(method=method):
+                mock_verb.return_value = html
+                with self.assertRaises(QueueClientError):
+                    getattr(self.client, method)(*args)
+
+    def test_timeout(self):
         """Test timeout handling."""
-        mock_post.side_effect = requests.Timeout("Timeout")
+        self.mock_post.side_effect = requests.Timeout("Timeout")
         with self.assertRaises(QueueClientError):
             self.client.create_queue("test")
 
-    @patch('requests.get')
-    def test_connection_error(self, mock_get):
+    def test_connection_error(self):
         """Test connection error handling."""
-        mock_get.side_effect = requests.ConnectionError("Failed")
+        self.mock_get.side_effect = requests.ConnectionError("Failed")
         with self.assertRaises(QueueClientError):
             self.client.dequeue_task(self.queue_id)
 
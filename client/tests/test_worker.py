@@ -0,0 +1,206 @@
+"""
+Unit Tests for Worker Module
+
+Tests the QuizWorker class with a real Config and spec'd mocks for
+QueueClient and LLMService (no HTTP calls or LLM requests).
+
+Test Coverage:
+- Batched page generation and background SUCCESS submission
+- Per-page fallback when only some pages of a batch fail
+- Whole-batch fallback when the batched call raises
+- Consumer threads started by run(concurrency=N)
+- The --concurrency CLI option
+"""
+
+import json
+import logging
+import sys
+import threading
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+import src.worker as worker_module
+from src.config import Config, QueueServiceConfig, StorageConfig, LLMConfig, WorkerConfig, AnkiConfig
+from src.llm_service import LLMService, LLMServiceError
+from src.queue_client import QueueClient
+from src.worker import QuizWorker, main
+
+
+QA = [{"question": "q", "answer": "a"}]
+
+
+# ===== Test Fixtures =====
+
+@pytest.fixture
+def config(tmp_path):
+    """Real Config whose results directory is under this test's tmp_path"""
+    return Config(
+        queue_service=QueueServiceConfig(base_url="http://localhost:8080"),
+        storage=StorageConfig(
+            pdf_dir="storage/pdfs",
+            pages_dir="storage/pages",
+            results_dir=str(tmp_path / "results"),
+            metadata_dir="storage/metadata",
+        ),
+        llm=LLMConfig(provider="mock", api_key=None, model="mock-model", max_questions_per_page=5),
+        worker=WorkerConfig(poll_interval=0.01, max_retries=1, retry_backoff=0.01),
+        anki=AnkiConfig(deck_name="Test Deck", output_dir="output"),
+    )
+
+
+@pytest.fixture
+def worker(config):
+    """QuizWorker wired to a spec'd QueueClient and LLMService"""
+    with patch.object(worker_module, "load_config", return_value=config), \
+         patch.object(worker_module, "QueueClient", return_value=Mock(spec=QueueClient)), \
+         patch.object(worker_module.LLMService, "get_instance", return_value=Mock(spec=LLMService)):
+        quiz_worker = QuizWorker(queue_id="queue-1")
+    yield quiz_worker
+    quiz_worker._submit_pool.shutdown(wait=True)
+
+
+def make_tasks(tmp_path, count):
+    """Queue tasks for ``count`` pages whose images exist under tmp_path."""
+    tasks = []
+    for page_num in range(1, count + 1):
+        page_path = tmp_path / f"page_{page_num}.jpg"
+        page_path.write_bytes(b"x" * page_num)
+        params = {"job": "generate_quiz", "pdf_id": "pdf-1", "page_num": page_num,
+                  "page_path": str(page_path)}
+        tasks.append({"id": f"task-{page_num}", "params": json.dumps(params)})
+    return tasks
+
+
+def submitted(worker):
+    """Wait for the submission pool and return ``{task_id: status}``."""
+    worker._submit_pool.shutdown(wait=True)
+    return {
+        c.kwargs["task_id"]: c.kwargs["status"]
+        for c in worker.queue_client.submit_result.call_args_list
+    }
+
+
+# ===== Tests for _process_tasks =====
+
+def test_process_tasks_batches_pages(worker, tmp_path):
+    """Test every page of a successful batch is saved and reported SUCCESS"""
+    worker.llm_service.generate_quiz_from_images_batched.return_value = [QA, QA]
+
+    worker._process_tasks(make_tasks(tmp_path, 2))
+
+    worker.llm_service.generate_quiz_from_image.assert_not_called()
+    assert submitted(worker) == {"task-1": "SUCCESS", "task-2": "SUCCESS"}
+    for page_num in (1, 2):
+        result = json.loads((worker.results_dir / f"pdf-1_page_{page_num}_result.json").read_text())
+        assert result["questions"] == QA
+
+
+def test_process_tasks_retries_only_failed_pages(worker, tmp_path):
+    """Test a page that failed inside the batch is the only one regenerated"""
+    worker.llm_service.generate_quiz_from_images_batched.return_value = [
+        QA, LLMServiceError("bad page"), QA,
+    ]
+    worker.llm_service.generate_quiz_from_image.return_value = QA
+
+    worker._process_tasks(make_tasks(tmp_path, 3))
+
+    worker.llm_service.generate_quiz_from_image.assert_called_once_with(
+        str(tmp_path / "page_2.jpg"), 2
+    )
+    assert submitted(worker) == {"task-1": "SUCCESS", "task-2": "SUCCESS", "task-3": "SUCCESS"}
+
+
+def test_process_tasks_reports_failure_when_retry_fails(worker, tmp_path):
+    """Test a page failing its individual retry is reported FAILURE alone"""
+    worker.llm_service.generate_quiz_from_images_batched.return_value = [
+        LLMServiceError("bad page"), QA,
+    ]
+    worker.llm_service.generate_quiz_from_image.side_effect = LLMServiceError("still bad")
+
+    worker._process_tasks(make_tasks(tmp_path, 2))
+
+    assert submitted(worker) == {"task-1": "FAILURE", "task-2": "SUCCESS"}
+
+
+def test_process_tasks_falls_back_when_batch_call_raises(worker, tmp_path):
+    """Test every page goes through the per-task path if the batched call raises"""
+    worker.llm_service.generate_quiz_from_images_batched.side_effect = RuntimeError("boom")
+    worker.llm_service.generate_quiz_from_image.return_value = QA
+
+    worker._process_tasks(make_tasks(tmp_path, 2))
+
+    assert worker.llm_service.generate_quiz_from_image.call_args_list == [
+        call(str(tmp_path / "page_1.jpg"), 1),
+        call(str(tmp_path / "page_2.jpg"), 2),
+    ]
+    assert submitted(worker) == {"task-1": "SUCCESS", "task-2": "SUCCESS"}
+
+
+def test_process_tasks_single_task_skips_batching(worker, tmp_path):
+    """Test a lone task is generated directly rather than batched"""
+    worker.llm_service.generate_quiz_from_image.return_value = QA
+
+    worker._process_tasks(make_tasks(tmp_path, 1))
+
+    worker.llm_service.generate_quiz_from_images_batched.assert_not_called()
+    assert submitted(worker) == {"task-1": "SUCCESS"}
+
+
+def test_process_tasks_logs_completion_at_info(worker, tmp_path, caplog):
+    """Test each completed task still gets an INFO line"""
+    worker.llm_service.generate_quiz_from_images_batched.return_value = [QA, QA]
+
+    with caplog.at_level(logging.INFO, logger=worker_module.logger.name):
+        worker._process_tasks(make_tasks(tmp_path, 2))
+
+    completed = [r for r in caplog.records if "Completed task=" in r.getMessage()]
+    assert [r.levelno for r in completed] == [logging.INFO, logging.INFO]
+
+
+# ===== Tests for run / --concurrency =====
+
+def test_run_starts_one_consumer_per_thread(worker):
+    """Test run(concurrency=N) polls from N threads and shuts down cleanly"""
+    names = []
+    lock = threading.Lock()
+    started = threading.Barrier(3)
+
+    def consume():
+        with lock:
+            names.append(threading.current_thread().name)
+        started.wait(timeout=5)
+        # The extra consumers run until the main thread's loop returns.
+        if threading.current_thread() is not threading.main_thread():
+            worker._stop.wait()
+
+    with patch.object(worker, "_consume", side_effect=consume):
+        worker.run(concurrency=3)
+
+    assert len(names) == 3
+    assert f"{worker.worker_id}-1" in names and f"{worker.worker_id}-2" in names
+    assert worker._stop.is_set()
+    worker.queue_client.close.assert_called_once()
+
+
+@pytest.mark.parametrize("argv, concurrency", [([], 1), (["--concurrency", "4"], 4)])
+def test_main_passes_concurrency(argv, concurrency):
+    """Test --concurrency reaches QuizWorker.run"""
+    with patch.object(sys, "argv", ["worker", "queue-1", *argv]), \
+         patch.object(worker_module, "_configure_logging"), \
+         patch.object(worker_module, "QuizWorker") as mock_worker:
+        main()
+
+    mock_worker.assert_called_once_with(queue_id="queue-1", config_path="config.yaml")
+    mock_worker.return_value.run.assert_called_once_with(concurrency=concurrency)
+
+
+def test_main_rejects_zero_concurrency():
+    """Test --concurrency below 1 is a usage error"""
+    with patch.object(sys, "argv", ["worker", "queue-1", "--concurrency", "0"]), \
+         patch.object(worker_module, "_configure_logging"), \
+         patch.object(worker_module, "QuizWorker") as mock_worker:
+        with pytest.raises(SystemExit):
+            main()
+
+    mock_worker.assert_not_called()
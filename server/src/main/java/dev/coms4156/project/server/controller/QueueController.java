@@ -4,10 +4,22 @@ import dev.coms4156.project.server.model.Queue;
 import dev.coms4156.project.server.model.Result;
 import dev.coms4156.project.server.model.Task;
 import dev.coms4156.project.server.service.QueueService;
+import jakarta.annotation.PreDestroy;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
 import java.util.UUID;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
 import org.slf4j.Logger;
 import org.slf4j.LoggerFactory;
 import org.springframework.http.HttpStatus;
+import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.DeleteMapping;
 import org.springframework.web.bind.annotation.ExceptionHandler;
@@ -16,7 +28,9 @@ import org.springframework.web.bind.annotation.PathVariable;
 import org.springframework.web.bind.annotation.PostMapping;
 import org.springframework.web.bind.annotation.RequestBody;
 import org.springframework.web.bind.annotation.RequestMapping;
+import org.springframework.web.bind.annotation.RequestParam;
 import org.springframework.web.bind.annotation.RestController;
+import org.springframework.web.servlet.mvc.method.annotation.SseEmitter;
 
 /**
  * REST controller for managing task queues.
@@ -29,6 +43,28 @@ public class QueueController {
 
   private final QueueService queueService;
   private static final Logger log = LoggerFactory.getLogger(QueueController.class);
+  private static final long EVENT_STREAM_TIMEOUT_MS = 30L * 60L * 1000L;
+  /**
+   * Well under the client's 120 s read timeout, so idle streams stay open.
+   */
+  private static final long EVENT_HEARTBEAT_INTERVAL_MS = 15L * 1000L;
+
+  /**
+   * Open status event streams keyed by queue ID.
+   */
+  private final Map<UUID, List<SseEmitter>> eventSubscribers = new ConcurrentHashMap<>();
+
+  /**
+   * Single thread that sends every status event and heartbeat. Snapshots are
+   * taken on this thread when they are sent, so each stream sees them in
+   * order and a completed status is never followed by an older one.
+   */
+  private final ScheduledExecutorService eventExecutor =
+      Executors.newSingleThreadScheduledExecutor(runnable -> {
+        Thread thread = new Thread(runnable, "queue-events");
+        thread.setDaemon(true);
+        return thread;
+      });
 
   /**
    * Constructs a new QueueController with the specified QueueService.
@@ -37,6 +73,16 @@ public class QueueController {
    */
   public QueueController(QueueService queueService) {
     this.queueService = queueService;
+    eventExecutor.scheduleAtFixedRate(this::sendHeartbeats,
+        EVENT_HEARTBEAT_INTERVAL_MS, EVENT_HEARTBEAT_INTERVAL_MS, TimeUnit.MILLISECONDS);
+  }
+
+  /**
+   * Stops the event thread when the application shuts down.
+   */
+  @PreDestroy
+  public void shutdownEvents() {
+    eventExecutor.shutdownNow();
   }
 
   /**
@@ -73,6 +119,40 @@ public class QueueController {
     return ResponseEntity.status(HttpStatus.CREATED).body(task);
   }
 
+  /**
+   * Enqueues several tasks to the specified queue in a single request.
+   * Either every task is enqueued or, on error, none are.
+   *
+   * @param queueId the ID of the queue
+   * @param request the request containing the tasks to enqueue
+   * @return the IDs of the created tasks, in request order
+   */
+  @PostMapping("/{queueId}/tasks:batch")
+  public ResponseEntity<BatchEnqueueTasksResponse> batchEnqueueTasks(
+      @PathVariable("queueId") UUID queueId,
+      @RequestBody BatchEnqueueTasksRequest request) {
+    List<EnqueueTaskRequest> requested = request.getTasks();
+    if (log.isInfoEnabled()) {
+      log.info("batchEnqueueTasks queueId={} count={}",
+          queueId, requested == null ? 0 : requested.size());
+    }
+    if (requested == null) {
+      throw new IllegalArgumentException("Tasks cannot be null");
+    }
+    List<Task> tasks = new ArrayList<>(requested.size());
+    List<UUID> taskIds = new ArrayList<>(requested.size());
+    for (EnqueueTaskRequest taskRequest : requested) {
+      if (taskRequest == null) {
+        throw new IllegalArgumentException("Tasks cannot be null");
+      }
+      Task task = new Task(taskRequest.getParams(), taskRequest.getPriority());
+      tasks.add(task);
+      taskIds.add(task.getId());
+    }
+    queueService.enqueueTasks(queueId, tasks);
+    return ResponseEntity.status(HttpStatus.CREATED).body(new BatchEnqueueTasksResponse(taskIds));
+  }
+
   /**
    * Dequeues the highest priority task from the specified queue.
    *
@@ -91,6 +171,27 @@ public class QueueController {
     return ResponseEntity.ok(task);
   }
 
+  /**
+   * Dequeues up to {@code max} tasks from the specified queue in one request.
+   * If the queue is empty, waits up to {@code waitMs} milliseconds for a task
+   * to arrive before returning, so idle workers can long-poll.
+   *
+   * @param queueId the ID of the queue
+   * @param max the maximum number of tasks to return
+   * @param waitMs how long to wait for a task if the queue is empty
+   * @return the dequeued tasks in priority order, empty if none arrived in time
+   */
+  @GetMapping("/{queueId}/tasks")
+  public ResponseEntity<List<Task>> dequeueTasks(
+      @PathVariable("queueId") UUID queueId,
+      @RequestParam(name = "max", defaultValue = "1") int max,
+      @RequestParam(name = "waitMs", defaultValue = "0") long waitMs) {
+    if (log.isInfoEnabled()) {
+      log.info("dequeueTasks queueId={} max={} waitMs={}", queueId, max, waitMs);
+    }
+    return ResponseEntity.ok(queueService.dequeueTasks(queueId, max, waitMs));
+  }
+
   /**
    * Submits a result for a completed task.
    *
@@ -108,6 +209,7 @@ public class QueueController {
     }
     Result result = new Result(request.getTaskId(), request.getOutput(), request.getStatus());
     queueService.submitResult(queueId, result);
+    publishStatus(queueId);
     return ResponseEntity.status(HttpStatus.CREATED).body(result);
   }
 
@@ -132,6 +234,34 @@ public class QueueController {
     return ResponseEntity.ok(result);
   }
 
+  /**
+   * Retrieves the results for several tasks in a single request.
+   * Task IDs with no stored result are reported in the {@code missing} list.
+   *
+   * @param queueId the ID of the queue
+   * @param request the request containing the task IDs to look up
+   * @return the found results and the IDs that had none
+   */
+  @PostMapping("/{queueId}/results:batchGet")
+  public ResponseEntity<BatchGetResultsResponse> batchGetResults(
+      @PathVariable("queueId") UUID queueId,
+      @RequestBody BatchGetResultsRequest request) {
+    List<UUID> taskIds = request.getTaskIds();
+    if (log.isInfoEnabled()) {
+      log.info("batchGetResults queueId={} count={}",
+          queueId, taskIds == null ? 0 : taskIds.size());
+    }
+    Map<UUID, Result> found = queueService.getResults(queueId, taskIds);
+    List<UUID> missing = new ArrayList<>();
+    for (UUID taskId : taskIds) {
+      if (!found.containsKey(taskId)) {
+        missing.add(taskId);
+      }
+    }
+    return ResponseEntity.ok(
+        new BatchGetResultsResponse(new ArrayList<>(found.values()), missing));
+  }
+
   /**
    * Gets the status of a queue including task and result counts.
    * This endpoint is used by aggregators to poll for completion status.
@@ -147,16 +277,42 @@ public class QueueController {
     if (queue == null) {
       return ResponseEntity.status(HttpStatus.NOT_FOUND).build();
     }
-    
-    QueueStatusResponse status = new QueueStatusResponse(
-        queue.getId(),
-        queue.getName(),
-        queue.getTaskCount(),
-        queue.getResultCount(),
-        queue.hasPendingTasks()
-    );
-    
-    return ResponseEntity.ok(status);
+    return ResponseEntity.ok(toStatusResponse(queue));
+  }
+
+  /**
+   * Opens a server-sent event stream of queue status updates.
+   * The current status is sent immediately on subscribe, and a new "status"
+   * event is pushed every time a result is submitted to the queue. This lets
+   * aggregators wait for completion without polling the status endpoint.
+   *
+   * @param queueId the ID of the queue
+   * @return an SSE emitter streaming {@link QueueStatusResponse} events
+   */
+  @GetMapping(path = "/{queueId}/events", produces = MediaType.TEXT_EVENT_STREAM_VALUE)
+  public SseEmitter streamQueueEvents(@PathVariable("queueId") UUID queueId) {
+    log.info("streamQueueEvents queueId={}", queueId);
+    Queue queue = queueService.getQueue(queueId);
+    if (queue == null) {
+      throw new IllegalStateException("Queue with ID '" + queueId + "' does not exist");
+    }
+
+    SseEmitter emitter = new SseEmitter(EVENT_STREAM_TIMEOUT_MS);
+    // Added inside compute so a concurrent unsubscribe cannot drop the list
+    // from the map between creating it and adding this emitter.
+    eventSubscribers.compute(queueId, (id, subscribers) -> {
+      List<SseEmitter> list = subscribers != null ? subscribers : new CopyOnWriteArrayList<>();
+      list.add(emitter);
+      return list;
+    });
+    emitter.onCompletion(() -> unsubscribe(queueId, emitter));
+    emitter.onTimeout(() -> unsubscribe(queueId, emitter));
+    emitter.onError(ex -> unsubscribe(queueId, emitter));
+
+    // Sent from the event thread as well, so a status published for this
+    // stream can never be overtaken by this (older) initial snapshot.
+    CompletableFuture.runAsync(() -> sendStatus(emitter, queue), eventExecutor).join();
+    return emitter;
   }
 
   /**
@@ -173,6 +329,10 @@ public class QueueController {
     log.warn("clearAllQueues - Administrative clear requested");
     int queueCount = queueService.getAllQueueCount();
     queueService.clearAll();
+    for (List<SseEmitter> subscribers : eventSubscribers.values()) {
+      subscribers.forEach(SseEmitter::complete);
+    }
+    eventSubscribers.clear();
     log.info("clearAllQueues - Cleared {} queues", queueCount);
     
     ClearAllResponse response = new ClearAllResponse(
@@ -183,6 +343,92 @@ public class QueueController {
     return ResponseEntity.ok(response);
   }
 
+  /**
+   * Removes a closed event stream, dropping the queue's entry once it has none left.
+   *
+   * @param queueId the ID of the queue the emitter was subscribed to
+   * @param emitter the emitter to remove
+   */
+  private void unsubscribe(UUID queueId, SseEmitter emitter) {
+    eventSubscribers.computeIfPresent(queueId, (id, subscribers) -> {
+      subscribers.remove(emitter);
+      return subscribers.isEmpty() ? null : subscribers;
+    });
+  }
+
+  /**
+   * Pushes the latest status of a queue to all of its open event streams.
+   * The events are sent from the event thread, not the calling request thread.
+   *
+   * @param queueId the ID of the queue whose subscribers should be notified
+   */
+  private void publishStatus(UUID queueId) {
+    if (!eventSubscribers.containsKey(queueId)) {
+      return;
+    }
+    eventExecutor.execute(() -> {
+      List<SseEmitter> subscribers = eventSubscribers.get(queueId);
+      Queue queue = queueService.getQueue(queueId);
+      if (subscribers == null || queue == null) {
+        return;
+      }
+      for (SseEmitter emitter : subscribers) {
+        sendStatus(emitter, queue);
+      }
+    });
+  }
+
+  /**
+   * Sends a comment line on every open event stream so that idle streams are
+   * not closed by client or proxy read timeouts.
+   */
+  private void sendHeartbeats() {
+    for (List<SseEmitter> subscribers : eventSubscribers.values()) {
+      for (SseEmitter emitter : subscribers) {
+        try {
+          emitter.send(SseEmitter.event().comment("keepalive"));
+        } catch (IOException | IllegalStateException ex) {
+          emitter.completeWithError(ex);
+        }
+      }
+    }
+  }
+
+  /**
+   * Sends a single status event, closing the emitter if the client has gone away.
+   *
+   * @param emitter the emitter to send to
+   * @param queue the queue whose status should be sent
+   */
+  private void sendStatus(SseEmitter emitter, Queue queue) {
+    try {
+      emitter.send(SseEmitter.event()
+          .name("status")
+          .data(toStatusResponse(queue), MediaType.APPLICATION_JSON));
+    } catch (IOException | IllegalStateException ex) {
+      if (log.isDebugEnabled()) {
+        log.debug("dropping event subscriber queueId={} error={}", queue.getId(), ex.getMessage());
+      }
+      emitter.completeWithError(ex);
+    }
+  }
+
+  /**
+   * Builds the status DTO for a queue.
+   *
+   * @param queue the queue to describe
+   * @return the queue status with task counts and completion information
+   */
+  private static QueueStatusResponse toStatusResponse(Queue queue) {
+    return new QueueStatusResponse(
+        queue.getId(),
+        queue.getName(),
+        queue.getTaskCount(),
+        queue.getResultCount(),
+        queue.hasPendingTasks()
+    );
+  }
+
   /**
    * Handles IllegalArgumentException by returning a BAD_REQUEST response.
    *
@@ -280,6 +526,65 @@ public class QueueController {
     }
   }
 
+  /**
+   * Request DTO for enqueuing several tasks at once.
+   */
+  public static class BatchEnqueueTasksRequest {
+    private List<EnqueueTaskRequest> tasks;
+
+    /**
+     * Gets the tasks to enqueue.
+     *
+     * @return the tasks
+     */
+    public List<EnqueueTaskRequest> getTasks() {
+      return tasks;
+    }
+
+    /**
+     * Sets the tasks to enqueue.
+     *
+     * @param tasks the tasks
+     */
+    public void setTasks(List<EnqueueTaskRequest> tasks) {
+      this.tasks = tasks;
+    }
+  }
+
+  /**
+   * Response DTO for a batch enqueue.
+   */
+  public static class BatchEnqueueTasksResponse {
+    private List<UUID> taskIds;
+
+    /**
+     * Constructor with fields.
+     *
+     * @param taskIds the IDs of the created tasks, in request order
+     */
+    public BatchEnqueueTasksResponse(List<UUID> taskIds) {
+      this.taskIds = taskIds;
+    }
+
+    /**
+     * Gets the IDs of the created tasks.
+     *
+     * @return the task IDs
+     */
+    public List<UUID> getTaskIds() {
+      return taskIds;
+    }
+
+    /**
+     * Sets the IDs of the created tasks.
+     *
+     * @param taskIds the task IDs
+     */
+    public void setTaskIds(List<UUID> taskIds) {
+      this.taskIds = taskIds;
+    }
+  }
+
   /**
    * Request DTO for submitting a task result.
    */
@@ -343,6 +648,86 @@ public class QueueController {
     }
   }
 
+  /**
+   * Request DTO for fetching several results at once.
+   */
+  public static class BatchGetResultsRequest {
+    private List<UUID> taskIds;
+
+    /**
+     * Gets the task IDs to look up.
+     *
+     * @return the task IDs
+     */
+    public List<UUID> getTaskIds() {
+      return taskIds;
+    }
+
+    /**
+     * Sets the task IDs to look up.
+     *
+     * @param taskIds the task IDs
+     */
+    public void setTaskIds(List<UUID> taskIds) {
+      this.taskIds = taskIds;
+    }
+  }
+
+  /**
+   * Response DTO for a batch result lookup.
+   */
+  public static class BatchGetResultsResponse {
+    private List<Result> results;
+    private List<UUID> missing;
+
+    /**
+     * Constructor with fields.
+     *
+     * @param results the results that were found
+     * @param missing the task IDs that have no result
+     */
+    public BatchGetResultsResponse(List<Result> results, List<UUID> missing) {
+      this.results = results;
+      this.missing = missing;
+    }
+
+    /**
+     * Gets the results that were found.
+     *
+     * @return the results
+     */
+    public List<Result> getResults() {
+      return results;
+    }
+
+    /**
+     * Sets the results that were found.
+     *
+     * @param results the results
+     */
+    public void setResults(List<Result> results) {
+      this.results = results;
+    }
+
+    /**
+     * Gets the task IDs that have no result.
+     *
+     * @return the missing task IDs
+     */
+    public List<UUID> getMissing() {
+      return missing;
+    }
+
+    /**
+     * Sets the task IDs that have no result.
+     *
+     * @param missing the missing task IDs
+     */
+    public void setMissing(List<UUID> missing) {
+      this.missing = missing;
+    }
+  }
+
   /**
    * Response DTO for clear all operation.
    */
@@ -0,0 +1,191 @@
+package dev.coms4156.project.server.filter;
+
+import jakarta.servlet.FilterChain;
+import jakarta.servlet.ReadListener;
+import jakarta.servlet.ServletException;
+import jakarta.servlet.ServletInputStream;
+import jakarta.servlet.http.HttpServletRequest;
+import jakarta.servlet.http.HttpServletRequestWrapper;
+import jakarta.servlet.http.HttpServletResponse;
+import java.io.BufferedReader;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.nio.charset.Charset;
+import java.nio.charset.StandardCharsets;
+import java.util.Collections;
+import java.util.Enumeration;
+import java.util.zip.GZIPInputStream;
+import java.util.zip.ZipException;
+import org.springframework.stereotype.Component;
+import org.springframework.web.filter.OncePerRequestFilter;
+
+/**
+ * Transparently decompresses request bodies sent with {@code Content-Encoding: gzip}.
+ *
+ * <p>Clients may gzip large JSON bodies, such as batch enqueue requests, to
+ * cut bytes on the wire. Controllers always see the plain JSON body.
+ * Requests without that header pass through untouched.
+ *
+ * <p>The body is inflated up front, at most {@link #MAX_DECOMPRESSED_BYTES}
+ * of it, so a small gzip bomb cannot inflate without bound. Larger bodies are
+ * rejected with 413 and invalid gzip data with 400.
+ */
+@Component
+public class GzipRequestFilter extends OncePerRequestFilter {
+
+  /**
+   * Largest decompressed body accepted, far above any real batch request.
+   */
+  static final int MAX_DECOMPRESSED_BYTES = 16 * 1024 * 1024;
+
+  private static final String CONTENT_ENCODING = "Content-Encoding";
+  private static final String GZIP = "gzip";
+
+  @Override
+  protected void doFilterInternal(
+      HttpServletRequest request, HttpServletResponse response, FilterChain chain)
+      throws ServletException, IOException {
+    if (!GZIP.equalsIgnoreCase(request.getHeader(CONTENT_ENCODING))) {
+      chain.doFilter(request, response);
+      return;
+    }
+
+    byte[] body;
+    try {
+      body = inflate(request.getInputStream());
+    } catch (ZipException | EOFException ex) {
+      response.sendError(HttpServletResponse.SC_BAD_REQUEST, "Invalid gzip request body");
+      return;
+    }
+    if (body.length > MAX_DECOMPRESSED_BYTES) {
+      response.sendError(HttpServletResponse.SC_REQUEST_ENTITY_TOO_LARGE,
+          "Decompressed request body exceeds " + MAX_DECOMPRESSED_BYTES + " bytes");
+      return;
+    }
+    chain.doFilter(new GzipRequestWrapper(request, body), response);
+  }
+
+  /**
+   * Decompresses a gzip stream, stopping one byte past the size limit.
+   *
+   * @param compressed the gzip-encoded request body
+   * @return the decompressed bytes, longer than the limit if it was exceeded
+   * @throws IOException if the body cannot be read or is not valid gzip
+   */
+  private static byte[] inflate(InputStream compressed) throws IOException {
+    ByteArrayOutputStream out = new ByteArrayOutputStream();
+    byte[] buf = new byte[8192];
+    try (GZIPInputStream gzip = new GZIPInputStream(compressed)) {
+      for (int n = gzip.read(buf); n != -1; n = gzip.read(buf)) {
+        out.write(buf, 0, n);
+        if (out.size() > MAX_DECOMPRESSED_BYTES) {
+          break;
+        }
+      }
+    }
+    return out.toByteArray();
+  }
+
+  /**
+   * Request wrapper that exposes the decompressed body and hides the
+   * original encoding header. The body stream and reader are created once,
+   * like the container's own.
+   */
+  private static final class GzipRequestWrapper extends HttpServletRequestWrapper {
+
+    private final byte[] body;
+    private ServletInputStream inputStream;
+    private BufferedReader reader;
+
+    GzipRequestWrapper(HttpServletRequest request, byte[] body) {
+      super(request);
+      this.body = body;
+    }
+
+    @Override
+    public ServletInputStream getInputStream() {
+      if (inputStream == null) {
+        inputStream = new BodyInputStream(new ByteArrayInputStream(body));
+      }
+      return inputStream;
+    }
+
+    @Override
+    public BufferedReader getReader() {
+      if (reader == null) {
+        String encoding = getCharacterEncoding();
+        reader = new BufferedReader(new InputStreamReader(
+            getInputStream(),
+            encoding != null ? Charset.forName(encoding) : StandardCharsets.UTF_8));
+      }
+      return reader;
+    }
+
+    @Override
+    public String getHeader(String name) {
+      if (CONTENT_ENCODING.equalsIgnoreCase(name)) {
+        return null;
+      }
+      return super.getHeader(name);
+    }
+
+    @Override
+    public Enumeration<String> getHeaders(String name) {
+      if (CONTENT_ENCODING.equalsIgnoreCase(name)) {
+        return Collections.emptyEnumeration();
+      }
+      return super.getHeaders(name);
+    }
+
+    @Override
+    public int getContentLength() {
+      return body.length;
+    }
+
+    @Override
+    public long getContentLengthLong() {
+      return body.length;
+    }
+  }
+
+  /**
+   * Servlet stream over the already decompressed body.
+   */
+  private static final class BodyInputStream extends ServletInputStream {
+
+    private final ByteArrayInputStream in;
+
+    BodyInputStream(ByteArrayInputStream in) {
+      this.in = in;
+    }
+
+    @Override
+    public int read() {
+      return in.read();
+    }
+
+    @Override
+    public int read(byte[] buf, int off, int len) {
+      return in.read(buf, off, len);
+    }
+
+    @Override
+    public boolean isFinished() {
+      return in.available() == 0;
+    }
+
+    @Override
+    public boolean isReady() {
+      return true;
+    }
+
+    @Override
+    public void setReadListener(ReadListener listener) {
+      throw new UnsupportedOperationException("Async reads are not supported");
+    }
+  }
+}
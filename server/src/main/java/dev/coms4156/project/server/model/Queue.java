@@ -1,12 +1,16 @@
 package dev.coms4156.project.server.model;
 
 import java.util.ArrayList;
+import java.util.Collection;
 import java.util.HashMap;
+import java.util.LinkedHashMap;
 import java.util.List;
 import java.util.Map;
+import java.util.Objects;
 import java.util.UUID;
 import java.util.concurrent.BlockingQueue;
 import java.util.concurrent.PriorityBlockingQueue;
+import java.util.concurrent.TimeUnit;
 
 
 /**
@@ -79,6 +83,22 @@ public class Queue {
     return task != null && tasks.add(task);
   }
 
+  /**
+   * Adds several tasks to the queue under a single lock.
+   * Either every task is added or, if the collection is {@code null} or
+   * contains a {@code null} task, none are.
+   *
+   * @param newTasks the tasks to enqueue
+   * @return {@code true} if all tasks were added, {@code false} otherwise
+   */
+  public synchronized boolean enqueueAll(Collection<Task> newTasks) {
+    if (newTasks == null || newTasks.stream().anyMatch(Objects::isNull)) {
+      return false;
+    }
+    tasks.addAll(newTasks);
+    return true;
+  }
+
 
   /**
    * Retrieves and removes the highest-priority task from the queue.
@@ -90,6 +110,26 @@ public class Queue {
     return tasks.poll();
   }
 
+  /**
+   * Retrieves and removes up to {@code maxTasks} tasks in priority order.
+   * If the queue is empty, waits up to {@code waitMillis} for a task to arrive.
+   * The queue's lock is not held while waiting, so tasks can still be enqueued.
+   *
+   * @param maxTasks the maximum number of tasks to return
+   * @param waitMillis how long to wait for the first task, in milliseconds
+   * @return the dequeued tasks, empty if none arrived in time
+   * @throws InterruptedException if interrupted while waiting
+   */
+  public List<Task> dequeue(int maxTasks, long waitMillis) throws InterruptedException {
+    List<Task> batch = new ArrayList<>(maxTasks);
+    Task first = tasks.poll(waitMillis, TimeUnit.MILLISECONDS);
+    if (first != null) {
+      batch.add(first);
+      tasks.drainTo(batch, maxTasks - 1);
+    }
+    return batch;
+  }
+
 
   /**
   * Attempts to add a result from a completed task.
@@ -117,6 +157,24 @@ public class Queue {
     return results.get(taskId);
   }
 
+  /**
+   * Retrieves the stored results for several task IDs under a single lock.
+   * Task IDs without a result are omitted from the returned map.
+   *
+   * @param taskIds the task IDs to look up
+   * @return results keyed by task ID, in the order the IDs were given
+   */
+  public synchronized Map<UUID, Result> getResults(Collection<UUID> taskIds) {
+    Map<UUID, Result> found = new LinkedHashMap<>();
+    for (UUID taskId : taskIds) {
+      Result result = results.get(taskId);
+      if (result != null) {
+        found.put(taskId, result);
+      }
+    }
+    return found;
+  }
+
 
   /**
   * Returns whether the queue currently has pending tasks.
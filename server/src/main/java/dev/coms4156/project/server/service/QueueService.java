@@ -4,6 +4,9 @@ import dev.coms4156.project.server.model.Queue;
 import dev.coms4156.project.server.model.QueueStore;
 import dev.coms4156.project.server.model.Result;
 import dev.coms4156.project.server.model.Task;
+import java.util.List;
+import java.util.Map;
+import java.util.Objects;
 import java.util.UUID;
 import org.springframework.stereotype.Service;
 
@@ -14,6 +17,17 @@ import org.springframework.stereotype.Service;
 @Service
 public class QueueService {
 
+  /**
+   * Maximum number of task IDs accepted by a single batch lookup, and of
+   * tasks accepted by a single batch enqueue.
+   */
+  public static final int MAX_BATCH_SIZE = 500;
+
+  /**
+   * Longest time a batch dequeue may wait for a task to arrive, in milliseconds.
+   */
+  public static final long MAX_DEQUEUE_WAIT_MS = 30_000;
+
   private final QueueStore queueStore;
 
   /**
@@ -72,6 +86,37 @@ public class QueueService {
     }
   }
 
+  /**
+   * Adds several tasks to the specified queue in one call.
+   * Either all tasks are enqueued or none are.
+   *
+   * @param queueId the ID of the queue to add the tasks to
+   * @param tasks the tasks to enqueue
+   * @throws IllegalArgumentException if queueId or tasks is null, tasks contains a null
+   *     task, or tasks exceeds {@link #MAX_BATCH_SIZE}
+   * @throws IllegalStateException if the queue with the given ID does not exist
+   */
+  public void enqueueTasks(UUID queueId, List<Task> tasks) {
+    validateQueueId(queueId);
+    if (tasks == null || tasks.stream().anyMatch(Objects::isNull)) {
+      throw new IllegalArgumentException("Tasks cannot be null");
+    }
+    if (tasks.size() > MAX_BATCH_SIZE) {
+      throw new IllegalArgumentException(
+          "Cannot enqueue more than " + MAX_BATCH_SIZE + " tasks per request");
+    }
+
+    Queue queue = queueStore.getQueue(queueId);
+    if (queue == null) {
+      throw new IllegalStateException("Queue with ID '" + queueId + "' does not exist");
+    }
+
+    boolean success = queue.enqueueAll(tasks);
+    if (!success) {
+      throw new IllegalStateException("Failed to enqueue tasks to queue '" + queueId + "'");
+    }
+  }
+
   /**
    * Retrieves and removes the highest priority task from the specified queue.
    * This method is typically called by workers to get their next task.
@@ -96,6 +141,48 @@ public class QueueService {
     return task;
   }
 
+  /**
+   * Retrieves and removes up to {@code maxTasks} tasks from the specified queue,
+   * waiting up to {@code waitMillis} for one to arrive if the queue is empty.
+   * This lets workers long-poll and pull several tasks per request.
+   *
+   * @param queueId the ID of the queue to dequeue from
+   * @param maxTasks the maximum number of tasks to return
+   * @param waitMillis how long to wait for the first task, in milliseconds
+   * @return the dequeued tasks in priority order, empty if none arrived in time
+   * @throws IllegalArgumentException if queueId is null, maxTasks is outside
+   *     1..{@link #MAX_BATCH_SIZE}, or waitMillis is outside 0..{@link #MAX_DEQUEUE_WAIT_MS}
+   * @throws IllegalStateException if the queue with the given ID does not exist
+   */
+  public List<Task> dequeueTasks(UUID queueId, int maxTasks, long waitMillis) {
+    validateQueueId(queueId);
+    if (maxTasks < 1 || maxTasks > MAX_BATCH_SIZE) {
+      throw new IllegalArgumentException(
+          "max must be between 1 and " + MAX_BATCH_SIZE);
+    }
+    if (waitMillis < 0 || waitMillis > MAX_DEQUEUE_WAIT_MS) {
+      throw new IllegalArgumentException(
+          "waitMs must be between 0 and " + MAX_DEQUEUE_WAIT_MS);
+    }
+
+    Queue queue = queueStore.getQueue(queueId);
+    if (queue == null) {
+      throw new IllegalStateException("Queue with ID '" + queueId + "' does not exist");
+    }
+
+    List<Task> batch;
+    try {
+      batch = queue.dequeue(maxTasks, waitMillis);
+    } catch (InterruptedException e) {
+      Thread.currentThread().interrupt();
+      return List.of();
+    }
+    for (Task task : batch) {
+      task.setStatus(Task.TaskStatus.IN_PROGRESS);
+    }
+    return batch;
+  }
+
   /**
    * Submits a result for a completed task.
    *
@@ -145,6 +232,34 @@ public class QueueService {
     return queue.getResult(taskId);
   }
 
+  /**
+   * Retrieves the results for several tasks in one call.
+   *
+   * @param queueId the ID of the queue the tasks belong to
+   * @param taskIds the IDs of the tasks to get results for
+   * @return results keyed by task ID; tasks without a result are omitted
+   * @throws IllegalArgumentException if queueId or taskIds is null, contains a null ID,
+   *     or exceeds {@link #MAX_BATCH_SIZE}
+   * @throws IllegalStateException if the queue with the given ID does not exist
+   */
+  public Map<UUID, Result> getResults(UUID queueId, List<UUID> taskIds) {
+    validateQueueId(queueId);
+    if (taskIds == null || taskIds.stream().anyMatch(Objects::isNull)) {
+      throw new IllegalArgumentException("Task IDs cannot be null");
+    }
+    if (taskIds.size() > MAX_BATCH_SIZE) {
+      throw new IllegalArgumentException(
+          "Cannot fetch more than " + MAX_BATCH_SIZE + " results per request");
+    }
+
+    Queue queue = queueStore.getQueue(queueId);
+    if (queue == null) {
+      throw new IllegalStateException("Queue with ID '" + queueId + "' does not exist");
+    }
+
+    return queue.getResults(taskIds);
+  }
+
   /**
    * Retrieves a queue by its ID.
    *
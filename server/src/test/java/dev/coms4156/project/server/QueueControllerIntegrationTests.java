@@ -34,22 +34,43 @@
  * - Boundary: non-existent result -> getResultNonexistentQueueReturnsNotFound
  * - Invalid: malformed UUID -> getResultMalformedUuidReturnsBadRequest
  *
+ * <p>POST /queue/{queueId}/results:batchGet:
+ * - Valid: existing queue, mix of found/missing -> batchGetResultsReportsMissing
+ *
+ * <p>POST /queue/{queueId}/tasks:batch:
+ * - Valid: existing queue, several tasks -> batchEnqueueTasksReturnsIds
+ * - Invalid: non-existent queue -> batchEnqueueTasksNonexistentQueueReturnsNotFound
+ * - Atypical: gzip-encoded body -> batchEnqueueTasksAcceptsGzipBody
+ * - Invalid: gzip body inflating past the limit -> batchEnqueueTasksRejectsGzipBomb
+ * - Invalid: corrupt gzip body -> batchEnqueueTasksRejectsCorruptGzip
+ *
+ * <p>GET /queue/{queueId}/tasks?max&amp;waitMs:
+ * - Valid: queue with tasks -> dequeueTasksReturnsBatch
+ * - Invalid: max out of range -> dequeueTasksInvalidMaxReturnsBadRequest
+ *
  * <p>GET /queue/{queueId}/status:
  * - Valid: existing queue -> getQueueStatusEmptyQueueReturnsZeroCounts
  * - Invalid: non-existent queue -> getQueueStatusNonexistentQueueReturnsNotFound
  * - Invalid: malformed UUID -> getQueueStatusMalformedUuidReturnsBadRequest
  *
+ * <p>GET /queue/{queueId}/events:
+ * - Valid: existing queue -> streamQueueEventsSendsInitialStatus
+ * - Invalid: non-existent queue -> streamQueueEventsNonexistentQueueReturnsNotFound
+ *
  * <p>DELETE /admin/clear:
  * - Valid: any state -> (tested in demo/manual)
  */
 
 package dev.coms4156.project.server;
 
+import static org.hamcrest.Matchers.containsString;
 import static org.junit.jupiter.api.Assertions.assertTrue;
 import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.delete;
 import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.get;
 import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.post;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.content;
 import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.jsonPath;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.request;
 import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.status;
 
 import ch.qos.logback.classic.Level;
@@ -57,7 +78,10 @@ import ch.qos.logback.classic.Logger;
 import ch.qos.logback.classic.spi.ILoggingEvent;
 import ch.qos.logback.core.read.ListAppender;
 import com.fasterxml.jackson.databind.ObjectMapper;
+import java.io.ByteArrayOutputStream;
+import java.nio.charset.StandardCharsets;
 import java.util.UUID;
+import java.util.zip.GZIPOutputStream;
 import org.junit.jupiter.api.Test;
 import org.slf4j.LoggerFactory;
 import org.springframework.beans.factory.annotation.Autowired;
@@ -719,4 +743,171 @@ public class QueueControllerIntegrationTests {
           .andExpect(jsonPath("$.message").exists())
           .andExpect(jsonPath("$.queuesCleared").value(2));
   }
-}
\ No newline at end of file
+
+  // --- Queue Event Stream Tests ---
+
+  /**
+   * Tests that subscribing to a queue's event stream starts an async response
+   * and immediately pushes the current status.
+   */
+  @Test
+  void streamQueueEventsSendsInitialStatus() throws Exception {
+    UUID queueId = createQueue("EventsQueue");
+
+    mockMvc.perform(get("/queue/" + queueId + "/events").accept(MediaType.TEXT_EVENT_STREAM))
+          .andExpect(request().asyncStarted())
+          .andExpect(content().string(containsString("event:status")))
+          .andExpect(content().string(containsString("\"completedResultCount\":0")));
+  }
+
+  /**
+   * Tests that the event stream returns 404 for a non-existent queue.
+   */
+  @Test
+  void streamQueueEventsNonexistentQueueReturnsNotFound() throws Exception {
+    mockMvc.perform(get("/queue/" + UUID.randomUUID() + "/events"))
+          .andExpect(status().isNotFound());
+  }
+
+  // --- Batch Result Tests ---
+
+  /**
+   * Tests that a batch lookup returns found results and lists missing task IDs.
+   */
+  @Test
+  void batchGetResultsReportsMissing() throws Exception {
+    UUID queueId = createQueue("BatchQueue");
+    UUID taskId = UUID.randomUUID();
+    UUID missingId = UUID.randomUUID();
+    mockMvc.perform(post("/queue/" + queueId + "/result")
+          .contentType(MediaType.APPLICATION_JSON)
+          .content(String.format(
+                "{\"taskId\":\"%s\",\"output\":\"ok\",\"status\":\"SUCCESS\"}", taskId)))
+          .andExpect(status().isCreated());
+
+    mockMvc.perform(post("/queue/" + queueId + "/results:batchGet")
+          .contentType(MediaType.APPLICATION_JSON)
+          .content(String.format("{\"taskIds\":[\"%s\",\"%s\"]}", taskId, missingId)))
+          .andExpect(status().isOk())
+          .andExpect(jsonPath("$.results.length()").value(1))
+          .andExpect(jsonPath("$.results[0].taskId").value(taskId.toString()))
+          .andExpect(jsonPath("$.missing[0]").value(missingId.toString()));
+  }
+
+  @Test
+  void batchEnqueueTasksReturnsIds() throws Exception {
+    UUID queueId = createQueue("BatchEnqueueQueue");
+    mockMvc.perform(post("/queue/" + queueId + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .content("{\"tasks\":[{\"params\":\"p1\",\"priority\":1},"
+                + "{\"params\":\"p2\",\"priority\":2}]}"))
+          .andExpect(status().isCreated())
+          .andExpect(jsonPath("$.taskIds.length()").value(2));
+
+    mockMvc.perform(get("/queue/" + queueId + "/status"))
+          .andExpect(status().isOk())
+          .andExpect(jsonPath("$.pendingTaskCount").value(2));
+  }
+
+  @Test
+  void dequeueTasksReturnsBatch() throws Exception {
+    UUID queueId = createQueue("BatchDequeueQueue");
+    mockMvc.perform(post("/queue/" + queueId + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .content("{\"tasks\":[{\"params\":\"p1\",\"priority\":1},"
+                + "{\"params\":\"p2\",\"priority\":2},"
+                + "{\"params\":\"p3\",\"priority\":3}]}"))
+          .andExpect(status().isCreated());
+
+    mockMvc.perform(get("/queue/" + queueId + "/tasks").param("max", "2").param("waitMs", "0"))
+          .andExpect(status().isOk())
+          .andExpect(jsonPath("$.length()").value(2))
+          .andExpect(jsonPath("$[0].params").value("p1"))
+          .andExpect(jsonPath("$[1].params").value("p2"));
+  }
+
+  @Test
+  void dequeueTasksInvalidMaxReturnsBadRequest() throws Exception {
+    UUID queueId = createQueue("BatchDequeueQueue");
+    mockMvc.perform(get("/queue/" + queueId + "/tasks").param("max", "0"))
+          .andExpect(status().isBadRequest());
+  }
+
+  @Test
+  void batchEnqueueTasksAcceptsGzipBody() throws Exception {
+    UUID queueId = createQueue("GzipQueue");
+    String body = "{\"tasks\":[{\"params\":\"p1\",\"priority\":1}]}";
+    ByteArrayOutputStream compressed = new ByteArrayOutputStream();
+    try (GZIPOutputStream gzip = new GZIPOutputStream(compressed)) {
+      gzip.write(body.getBytes(StandardCharsets.UTF_8));
+    }
+
+    mockMvc.perform(post("/queue/" + queueId + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .header("Content-Encoding", "gzip")
+          .content(compressed.toByteArray()))
+          .andExpect(status().isCreated())
+          .andExpect(jsonPath("$.taskIds.length()").value(1));
+  }
+
+  /**
+   * Tests that a small gzip body inflating past the size limit is rejected with 413.
+   */
+  @Test
+  void batchEnqueueTasksRejectsGzipBomb() throws Exception {
+    UUID queueId = createQueue("GzipBombQueue");
+    ByteArrayOutputStream compressed = new ByteArrayOutputStream();
+    try (GZIPOutputStream gzip = new GZIPOutputStream(compressed)) {
+      byte[] zeros = new byte[1024 * 1024];
+      for (int i = 0; i < 17; i++) {
+        gzip.write(zeros);
+      }
+    }
+
+    mockMvc.perform(post("/queue/" + queueId + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .header("Content-Encoding", "gzip")
+          .content(compressed.toByteArray()))
+          .andExpect(status().isPayloadTooLarge());
+  }
+
+  /**
+   * Tests that a body declared as gzip but not gzip-encoded is rejected with 400.
+   */
+  @Test
+  void batchEnqueueTasksRejectsCorruptGzip() throws Exception {
+    UUID queueId = createQueue("CorruptGzipQueue");
+
+    mockMvc.perform(post("/queue/" + queueId + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .header("Content-Encoding", "gzip")
+          .content("{\"tasks\":[]}"))
+          .andExpect(status().isBadRequest());
+  }
+
+  @Test
+  void batchEnqueueTasksNonexistentQueueReturnsNotFound() throws Exception {
+    mockMvc.perform(post("/queue/" + UUID.randomUUID() + "/tasks:batch")
+          .contentType(MediaType.APPLICATION_JSON)
+          .content("{\"tasks\":[{\"params\":\"p1\",\"priority\":1}]}"))
+          .andExpect(status().isNotFound());
+  }
+
+  /**
+   * Creates a queue through the API and returns its ID.
+   *
+   * @param name the queue name
+   * @return the new queue ID
+   */
+  private UUID createQueue(String name) throws Exception {
+    MvcResult createRes = mockMvc
+          .perform(post("/queue")
+                .contentType(MediaType.APPLICATION_JSON)
+                .content("{\"name\":\"" + name + "\"}"))
+          .andExpect(status().isCreated())
+          .andReturn();
+    return UUID.fromString(
+          objectMapper.readTree(createRes.getResponse().getContentAsString())
+                .get("id").asText());
+  }
+}
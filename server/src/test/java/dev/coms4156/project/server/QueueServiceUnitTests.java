@@ -34,6 +34,23 @@
  * - Invalid: null taskId -> testGetResultNullTaskIdThrows
  * - Invalid: non-existent queue -> testGetResultNonexistentQueueThrows
  *
+ * <p>getResults(UUID queueId, List taskIds):
+ * - Valid: mix of completed and pending tasks -> testGetResultsReturnsOnlyFound
+ * - Invalid: too many task IDs -> testGetResultsOverBatchLimitThrows
+ * - Invalid: non-existent queue -> testGetResultsNonexistentQueueThrows
+ *
+ * <p>enqueueTasks(UUID queueId, List tasks):
+ * - Valid: existing queue, several tasks -> testEnqueueTasksAddsAll
+ * - Invalid: list containing null task -> testEnqueueTasksNullTaskThrows
+ * - Invalid: too many tasks -> testEnqueueTasksOverBatchLimitThrows
+ * - Invalid: non-existent queue -> testEnqueueTasksNonexistentQueueThrows
+ *
+ * <p>dequeueTasks(UUID queueId, int maxTasks, long waitMillis):
+ * - Valid: queue with more tasks than max -> testDequeueTasksReturnsUpToMaxInPriorityOrder
+ * - Boundary: empty queue, short wait -> testDequeueTasksEmptyQueueReturnsEmpty
+ * - Invalid: max outside 1..MAX_BATCH_SIZE -> testDequeueTasksInvalidMaxThrows
+ * - Invalid: non-existent queue -> testDequeueTasksNonexistentQueueThrows
+ *
  * <p>getQueue(UUID queueId):
  * - Valid: existing queue -> testGetQueueExists
  * - Boundary: non-existent queue -> testGetQueueNotFound
@@ -65,6 +82,9 @@ import dev.coms4156.project.server.model.Result;
 import dev.coms4156.project.server.model.Result.ResultStatus;
 import dev.coms4156.project.server.model.Task;
 import dev.coms4156.project.server.service.QueueService;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
 import java.util.UUID;
 import org.junit.jupiter.api.Assertions;
 import org.junit.jupiter.api.BeforeEach;
@@ -401,4 +421,126 @@ public class QueueServiceUnitTests {
     Assertions.assertThrows(IllegalStateException.class,
           () -> queueService.submitResult(queue.getId(), badResult));
   }
-}
\ No newline at end of file
+
+  @Test
+  void testGetResultsReturnsOnlyFound() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    UUID queueId = queue.getId();
+    Task done = new Task("done", 1);
+    Task pending = new Task("pending", 2);
+    this.queueService.enqueueTask(queueId, done);
+    this.queueService.enqueueTask(queueId, pending);
+    this.queueService.submitResult(
+          queueId, new Result(done.getId(), "ok", ResultStatus.SUCCESS));
+
+    Map<UUID, Result> found =
+          this.queueService.getResults(queueId, List.of(done.getId(), pending.getId()));
+    Assertions.assertEquals(1, found.size());
+    Assertions.assertEquals("ok", found.get(done.getId()).getOutput());
+  }
+
+  @Test
+  void testGetResultsOverBatchLimitThrows() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    List<UUID> taskIds = new ArrayList<>();
+    for (int i = 0; i <= QueueService.MAX_BATCH_SIZE; i++) {
+      taskIds.add(UUID.randomUUID());
+    }
+    Assertions.assertThrows(
+          IllegalArgumentException.class,
+          () -> this.queueService.getResults(queue.getId(), taskIds)
+    );
+  }
+
+  @Test
+  void testGetResultsNonexistentQueueThrows() {
+    Assertions.assertThrows(
+          IllegalStateException.class,
+          () -> this.queueService.getResults(UUID.randomUUID(), List.of(UUID.randomUUID()))
+    );
+  }
+
+  @Test
+  void testEnqueueTasksAddsAll() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    List<Task> tasks = List.of(new Task("p1", 1), new Task("p2", 2), new Task("p3", 3));
+    this.queueService.enqueueTasks(queue.getId(), tasks);
+    Assertions.assertEquals(3, queue.getTaskCount());
+  }
+
+  @Test
+  void testEnqueueTasksNullTaskThrows() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    List<Task> tasks = new ArrayList<>();
+    tasks.add(new Task("p1", 1));
+    tasks.add(null);
+    Assertions.assertThrows(
+          IllegalArgumentException.class,
+          () -> this.queueService.enqueueTasks(queue.getId(), tasks)
+    );
+    Assertions.assertEquals(0, queue.getTaskCount());
+  }
+
+  @Test
+  void testEnqueueTasksOverBatchLimitThrows() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    List<Task> tasks = new ArrayList<>();
+    for (int i = 0; i <= QueueService.MAX_BATCH_SIZE; i++) {
+      tasks.add(new Task("p" + i, 1));
+    }
+    Assertions.assertThrows(
+          IllegalArgumentException.class,
+          () -> this.queueService.enqueueTasks(queue.getId(), tasks)
+    );
+  }
+
+  @Test
+  void testEnqueueTasksNonexistentQueueThrows() {
+    Assertions.assertThrows(
+          IllegalStateException.class,
+          () -> this.queueService.enqueueTasks(UUID.randomUUID(), List.of(new Task("p", 1)))
+    );
+  }
+
+  @Test
+  void testDequeueTasksReturnsUpToMaxInPriorityOrder() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    UUID queueId = queue.getId();
+    Task low = new Task("low", 3);
+    Task high = new Task("high", 1);
+    Task mid = new Task("mid", 2);
+    this.queueService.enqueueTasks(queueId, List.of(low, high, mid));
+
+    List<Task> batch = this.queueService.dequeueTasks(queueId, 2, 0);
+    Assertions.assertEquals(List.of(high, mid), batch);
+    Assertions.assertEquals(Task.TaskStatus.IN_PROGRESS, batch.get(0).getStatus());
+    Assertions.assertEquals(1, queue.getTaskCount());
+  }
+
+  @Test
+  void testDequeueTasksEmptyQueueReturnsEmpty() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    Assertions.assertTrue(this.queueService.dequeueTasks(queue.getId(), 5, 10).isEmpty());
+  }
+
+  @Test
+  void testDequeueTasksInvalidMaxThrows() {
+    Queue queue = this.queueService.createQueue("Queue1");
+    Assertions.assertThrows(
+          IllegalArgumentException.class,
+          () -> this.queueService.dequeueTasks(queue.getId(), 0, 0)
+    );
+    Assertions.assertThrows(
+          IllegalArgumentException.class,
+          () -> this.queueService.dequeueTasks(queue.getId(), QueueService.MAX_BATCH_SIZE + 1, 0)
+    );
+  }
+
+  @Test
+  void testDequeueTasksNonexistentQueueThrows() {
+    Assertions.assertThrows(
+          IllegalStateException.class,
+          () -> this.queueService.dequeueTasks(UUID.randomUUID(), 1, 0)
+    );
+  }
+}